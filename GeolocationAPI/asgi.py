@@ -9,8 +9,19 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "GeolocationAPI.settings")
 
 application = get_asgi_application()
+
+# Under gunicorn.conf.py this runs in the master, before the workers fork
+if settings.PREFORK_BOOTSTRAP:
+    from GeolocationAPI.prefork import bootstrap
+
+    bootstrap()
+elif settings.WARMUP_ENABLED:
+    from GeolocationAPI.warmup import warm_up
+
+    warm_up()
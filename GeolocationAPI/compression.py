@@ -0,0 +1,180 @@
+"""
+Negotiated response compression.
+
+The first of COMPRESSION_ENCODINGS that the client accepts is used for
+responses of at least COMPRESSION_MIN_SIZE bytes. Streaming responses are
+compressed chunk by chunk and flushed after every chunk, so the client
+receives the first features as soon as they are written.
+"""
+
+import zlib
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class GzipCompressor:
+    encoding = "gzip"
+
+    def __init__(self, level: int = 6):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def write(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    encoding = "br"
+
+    # Quality 11 is meant for static files, too slow per request
+    def __init__(self, quality: int = 4):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def write(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdCompressor:
+    encoding = "zstd"
+
+    def __init__(self, level: int = 3):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def write(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+# Encodings whose library is installed
+COMPRESSORS = {
+    compressor.encoding: compressor
+    for compressor, available in (
+        (GzipCompressor, True),
+        (BrotliCompressor, brotli is not None),
+        (ZstdCompressor, zstandard is not None),
+    )
+    if available
+}
+
+
+def accepted_encodings(header: str) -> dict[str, float]:
+    """Encodings of an Accept-Encoding header with their q-values"""
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.partition(";")
+        name, params = name.strip().lower(), params.strip()
+        if not name:
+            continue
+        quality = 1.0
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """zstd, brotli or gzip compression of responses, like GZipMiddleware"""
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.encodings = [
+            name for name in settings.COMPRESSION_ENCODINGS if name in COMPRESSORS
+        ]
+        if not self.encodings:
+            raise MiddlewareNotUsed
+
+    def negotiate(self, request):
+        accepted = accepted_encodings(request.headers.get("Accept-Encoding", ""))
+        for name in self.encodings:
+            if accepted.get(name, accepted.get("*", 0)) > 0:
+                return COMPRESSORS[name]()
+        return None
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return response
+        # Events are small and must reach the client one by one
+        if response.get("Content-Type", "").startswith("text/event-stream"):
+            return response
+        if (
+            not response.streaming
+            and len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        compressor = self.negotiate(request)
+        if compressor is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self._acompress(
+                    compressor, response.streaming_content
+                )
+            else:
+                response.streaming_content = self._compress(
+                    compressor, response.streaming_content
+                )
+            del response.headers["Content-Length"]
+        else:
+            compressed = compressor.write(response.content) + compressor.finish()
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # The compressed body is not byte-identical to the original one
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = compressor.encoding
+        return response
+
+    @staticmethod
+    def _compress(compressor, chunks):
+        for chunk in chunks:
+            data = compressor.write(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+    @staticmethod
+    async def _acompress(compressor, chunks):
+        async for chunk in chunks:
+            data = compressor.write(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
@@ -0,0 +1,151 @@
+"""
+Read-replica routing.
+
+Views opt in with ReplicaReadMixin: actions listed in `replica_read_actions`,
+which must not write, read from a replica whose replication lag is below
+REPLICA_MAX_LAG_SECONDS. Everything else, including all writes, goes to
+the primary ("default"). A user who has just written is pinned to the
+primary for REPLICA_STICKY_SECONDS so they read their own writes.
+"""
+
+import logging
+import math
+import random
+import threading
+from contextvars import ContextVar
+from time import monotonic
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework import permissions
+
+logger = logging.getLogger(__name__)
+
+# Alias chosen for the reads of the current request, None means primary
+_read_alias: ContextVar[str | None] = ContextVar("read_alias", default=None)
+
+_lag_lock = threading.Lock()
+# alias -> (checked at, lag in seconds)
+_lag_cache: dict[str, tuple[float, float]] = {}
+
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+"""
+
+
+def _measure_lag(alias: str) -> float:
+    with connections[alias].cursor() as cursor:
+        cursor.execute(LAG_SQL)
+        return float(cursor.fetchone()[0])
+
+
+def replica_lag(alias: str) -> float:
+    """
+    Replication lag of the replica in seconds, re-measured at most every
+    REPLICA_LAG_CHECK_INTERVAL. Unreachable replicas report infinity.
+    """
+    now = monotonic()
+    checked_at, lag = _lag_cache.get(alias, (-math.inf, math.inf))
+    if now - checked_at < settings.REPLICA_LAG_CHECK_INTERVAL:
+        return lag
+
+    # Only one thread measures, the others keep using the previous value
+    if not _lag_lock.acquire(blocking=False):
+        return lag
+    try:
+        try:
+            lag = _measure_lag(alias)
+        except Exception:
+            logger.warning("Replica %s is unavailable", alias, exc_info=True)
+            lag = math.inf
+        _lag_cache[alias] = (now, lag)
+    finally:
+        _lag_lock.release()
+    return lag
+
+
+def choose_replica() -> str | None:
+    """A random replica that is not lagging behind, if any"""
+    healthy = [
+        alias
+        for alias in settings.DATABASE_REPLICAS
+        if replica_lag(alias) <= settings.REPLICA_MAX_LAG_SECONDS
+    ]
+    return random.choice(healthy) if healthy else None
+
+
+def _pin_key(user_pk) -> str:
+    return f"replica:primary-pin:{user_pk}"
+
+
+def pin_to_primary(user) -> None:
+    """Sends the reads of the user to the primary for REPLICA_STICKY_SECONDS"""
+    if user is not None and user.is_authenticated:
+        cache.set(_pin_key(user.pk), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def is_pinned_to_primary(user) -> bool:
+    if user is None or not user.is_authenticated:
+        return False
+    return bool(cache.get(_pin_key(user.pk)))
+
+
+class ReplicaRouter:
+    """Routes reads to the replica selected for the current request"""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaReadMixin:
+    """
+    DRF view mixin sending the reads of `replica_read_actions` to a replica.
+    Authentication and throttling run before the switch, on the primary.
+    Read-only actions receiving their parameters by POST can be listed too.
+    """
+
+    replica_read_actions = ("list", "retrieve")
+
+    def _reads_only(self) -> bool:
+        return getattr(self, "action", None) in self.replica_read_actions
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            settings.DATABASE_REPLICAS
+            and self._reads_only()
+            and not is_pinned_to_primary(request.user)
+        ):
+            alias = choose_replica()
+            if alias is not None:
+                self._replica_token = _read_alias.set(alias)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "_replica_token", None)
+        if token is not None:
+            _read_alias.reset(token)
+            self._replica_token = None
+        elif (
+            request.method not in permissions.SAFE_METHODS
+            and not self._reads_only()
+            and response.status_code < 400
+        ):
+            pin_to_primary(getattr(request, "user", None))
+        return super().finalize_response(request, response, *args, **kwargs)
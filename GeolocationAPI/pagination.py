@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+
+
+class PageSizePagination(PageNumberPagination):
+    """
+    Page number pagination with `?page_size=` up to MAX_PAGE_SIZE, or up to
+    ADMIN_MAX_PAGE_SIZE for admins.
+    """
+
+    page_size_query_param = "page_size"
+
+    def get_page_size(self, request):
+        user = getattr(request, "user", None)
+        self.max_page_size = (
+            settings.ADMIN_MAX_PAGE_SIZE
+            if getattr(user, "is_admin", False)
+            else settings.MAX_PAGE_SIZE
+        )
+        return super().get_page_size(request)
+
+    def paginate_queryset_lazily(self, queryset, request, view=None):
+        """Like paginate_queryset, but the page stays an unevaluated queryset"""
+        self.request = request
+        paginator = self.django_paginator_class(queryset, self.get_page_size(request))
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(
+                self.invalid_page_message.format(
+                    page_number=page_number, message=str(exc)
+                )
+            ) from exc
+        return self.page.object_list
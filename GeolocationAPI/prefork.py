@@ -0,0 +1,153 @@
+"""
+Read-only data shared by the workers of a preforking server.
+
+With gunicorn's `preload_app` (see gunicorn.conf.py) the application is
+loaded once in the master and the workers are forked from it. `bootstrap()`
+runs the registered builders there, closes the database connections the
+workers must not inherit and moves everything allocated so far to the
+permanent generation with `gc.freeze()`. The collector of a worker then
+never writes to the inherited objects, so their pages stay shared instead
+of being copied on write.
+
+Larger structures are not kept on the Python heap at all: builders write
+them to files in SHARED_DATA_DIR with `publish()` and processes map them
+read-only with `SharedFile`, so every worker reads the same page cache. A
+new generation is written to a temporary file and renamed over the old
+one; readers notice the new inode and remap.
+"""
+
+import gc
+import logging
+import mmap
+import os
+import tempfile
+import threading
+from collections.abc import Callable
+from contextlib import contextmanager, suppress
+from time import monotonic, perf_counter
+from typing import BinaryIO
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_builders: dict[str, Callable[[], None]] = {}
+
+
+def register(name: str, builder: Callable[[], None]) -> None:
+    """Adds a builder run by bootstrap() before the workers are forked"""
+    _builders[name] = builder
+
+
+def shared_path(name: str) -> str:
+    return os.path.join(settings.SHARED_DATA_DIR, name)
+
+
+def publish(path: str, write: Callable[[BinaryIO], None]) -> None:
+    """Writes a new generation of a shared file and swaps it in atomically"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temporary = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(temporary)
+        raise
+
+
+@contextmanager
+def file_lock(path: str):
+    """Serializes rebuilds of a shared file across processes"""
+    # Unix only, like preforking itself; imported here for Windows development
+    import fcntl
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.lock", "wb") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class SharedFile:
+    """Read-only memory map of a file replaced by publish()"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mapping: mmap.mmap | None = None
+        self._key = None
+        self._checked_at = -float("inf")
+
+    def get(self, force: bool = False) -> mmap.mmap | None:
+        """Current generation, None until the file is first published"""
+        now = monotonic()
+        if not force and now - self._checked_at < settings.SHARED_DATA_CHECK_SECONDS:
+            return self._mapping
+        with self._lock:
+            self._checked_at = now
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return self._mapping
+            key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if key != self._key and stat.st_size:
+                with open(self.path, "rb") as file:
+                    # The previous mapping is unmapped once no reader uses it
+                    self._mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._key = key
+        return self._mapping
+
+
+def close_connections() -> None:
+    """Closes connections and pools, their sockets must not be shared"""
+    for connection in connections.all(initialized_only=True):
+        connection.close()
+    for connection in connections.all():
+        close_pool = getattr(connection, "close_pool", None)
+        if close_pool is not None:
+            close_pool()
+
+
+def bootstrap() -> dict[str, float]:
+    """Builds the shared data before fork, returns the milliseconds taken"""
+    timings = {}
+    if settings.WARMUP_ENABLED:
+        from GeolocationAPI.warmup import warm_up
+
+        # Connections are opened by every worker after the fork
+        timings.update(warm_up(database=False))
+
+    for name, builder in _builders.items():
+        start = perf_counter()
+        try:
+            builder()
+        except Exception:
+            # Workers build the data themselves when it is missing
+            logger.exception("Prefork builder %s failed", name)
+        timings[name] = round((perf_counter() - start) * 1000, 1)
+
+    close_connections()
+    gc.collect()
+    gc.freeze()
+    logger.info(
+        "Prefork bootstrap done, %d objects frozen (%s)",
+        gc.get_freeze_count(),
+        ", ".join(f"{name} {ms} ms" for name, ms in timings.items()),
+    )
+    return timings
+
+
+def after_fork() -> None:
+    """Runs in every worker forked from a bootstrapped master"""
+    if settings.WARMUP_ENABLED:
+        from GeolocationAPI.warmup import warm_up_database
+
+        warm_up_database()
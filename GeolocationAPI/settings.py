@@ -14,8 +14,6 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
-from dotenv import load_dotenv
-
 if os.name == "nt":
     OSGEO4W = r"C:\OSGeo4W"
 
@@ -32,7 +30,18 @@ if os.name == "nt":
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-load_dotenv(BASE_DIR / ".env")
+# Deployments pass the environment directly, python-dotenv is only
+# imported when there is a .env file
+if (BASE_DIR / ".env").is_file():
+    from dotenv import load_dotenv
+
+    load_dotenv(BASE_DIR / ".env")
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    """Reads a boolean flag from the environment"""
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes")
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -65,9 +74,13 @@ INSTALLED_APPS = [
     # apps
     "accounts",
     "places",
+    "monitoring",
 ]
 
 MIDDLEWARE = [
+    "monitoring.middleware.RequestMetricsMiddleware",
+    "monitoring.middleware.SlowQueryMiddleware",
+    "GeolocationAPI.compression.CompressionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -101,17 +114,63 @@ WSGI_APPLICATION = "GeolocationAPI.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Connections come from a psycopg 3 pool by default. With DB_POOL_ENABLED=False
+# DB_CONN_MAX_AGE keeps connections open between requests instead
+DB_POOL_ENABLED = env_bool("DB_POOL_ENABLED", True)
+
 DATABASES = {
     "default": {
         "ENGINE": "django.contrib.gis.db.backends.postgis",
         "NAME": os.getenv("DB_NAME"),
         "USER": os.getenv("DB_USER"),
         "PASSWORD": os.getenv("DB_PASSWORD"),
-        "HOST": "localhost",
-        "PORT": "5432",
+        "HOST": os.getenv("DB_HOST", "localhost"),
+        "PORT": os.getenv("DB_PORT", "5432"),
+        # Pooling doesn't support persistent connections
+        "CONN_MAX_AGE": 0
+        if DB_POOL_ENABLED
+        else int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": env_bool("DB_CONN_HEALTH_CHECKS", True),
+        "OPTIONS": {
+            "pool": {
+                "name": "default",
+                "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+                "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+                "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+                "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+                "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", "1800")),
+            }
+        }
+        if DB_POOL_ENABLED
+        else {},
     }
 }
 
+# Read replicas as "host:port,host:port", see GeolocationAPI.db_routers
+DATABASE_REPLICAS = []
+for index, address in enumerate(
+    filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(",")), start=1
+):
+    alias = f"replica_{index}"
+    host, _, port = address.strip().partition(":")
+    options = dict(DATABASES["default"]["OPTIONS"])
+    if "pool" in options:
+        options["pool"] = {**options["pool"], "name": alias}
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "OPTIONS": options,
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["GeolocationAPI.db_routers.ReplicaRouter"]
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "2"))
+# Should be longer than the lag a replica is allowed to have
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "30"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -132,6 +191,27 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+AUTHENTICATION_BACKENDS = ["accounts.backends.OffloadedModelBackend"]
+# CustomUser.email is unique through a case-insensitive constraint instead
+# of unique=True, which the backend above looks users up by
+SILENCED_SYSTEM_CHECKS = ["auth.W004"]
+
+# Password hashing, see accounts.hashing. argon2 needs argon2-cffi installed
+PASSWORD_HASH_WORKERS = int(
+    os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv("PASSWORD_PBKDF2_ITERATIONS", "1000000"))
+PASSWORD_ARGON2_TIME_COST = int(os.getenv("PASSWORD_ARGON2_TIME_COST", "2"))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv("PASSWORD_ARGON2_MEMORY_COST", "102400"))
+PASSWORD_REHASH_ON_LOGIN = env_bool("PASSWORD_REHASH_ON_LOGIN", False)
+PASSWORD_HASHERS = [
+    "accounts.hashing.PBKDF2PasswordHasher",
+    "accounts.hashing.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+if os.getenv("PASSWORD_HASHER", "pbkdf2") == "argon2":
+    PASSWORD_HASHERS[:2] = PASSWORD_HASHERS[1::-1]
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -167,20 +247,61 @@ FILE_UPLOAD_PERMISSIONS = 0o644
 ALLOWED_IMAGE_EXTENSIONS = [".jpg", ".jpeg", ".png", ".webp"]
 MAX_IMAGE_SIZE = 5 * 1024 * 1024  # 5MB
 
+# THROTTLE_ENABLED=False is meant for load benchmarks only
+THROTTLE_ENABLED = env_bool("THROTTLE_ENABLED", True)
+
+# Throttle counters live in the cache, it must be shared between workers
+# for the rates to hold across processes
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+
+# JSON backend of the API, "orjson" or "json" for DRF's stdlib-based classes
+JSON_BACKEND = os.getenv("JSON_BACKEND", "orjson")
+JSON_RENDERER, JSON_PARSER = {
+    "orjson": (
+        "GeolocationAPI.renderers.ORJSONRenderer",
+        "GeolocationAPI.parsers.ORJSONParser",
+    ),
+    "json": (
+        "rest_framework.renderers.JSONRenderer",
+        "rest_framework.parsers.JSONParser",
+    ),
+}[JSON_BACKEND]
+
 REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": (
+        JSON_RENDERER,
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        JSON_PARSER,
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "GeolocationAPI.pagination.PageSizePagination",
     "PAGE_SIZE": 20,
+    # Stateless mode trusts role claims instead of loading the user per request
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.ClaimsJWTAuthentication"
+        if env_bool("JWT_STATELESS_AUTH", True)
+        else "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "GeolocationAPI.throttling.AnonThrottle",
+        "GeolocationAPI.throttling.UserThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "anon": "100/hour",
         "user": "1000/hour",
+        # Searches are the costly requests, limited per minute on their own
+        "search_anon": os.getenv("THROTTLE_SEARCH_ANON_RATE", "20/min"),
+        "search_user": os.getenv("THROTTLE_SEARCH_USER_RATE", "120/min"),
         "login": "5/min",
     },
 }
@@ -197,6 +318,11 @@ SPECTACULAR_SETTINGS = {
 AUTH_USER_MODEL = "accounts.CustomUser"
 
 
+# Seconds a worker trusts its cached copy of a user's claims version, see
+# accounts.claims. Role changes take up to this long to reach other workers
+# unless the cache is shared (REDIS_URL)
+JWT_CLAIMS_CACHE_SECONDS = int(os.getenv("JWT_CLAIMS_CACHE_SECONDS", "30"))
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=15),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
@@ -206,11 +332,110 @@ SIMPLE_JWT = {
     "ALGORITHM": "HS256",
     "SIGNING_KEY": SECRET_KEY,
     "AUTH_HEADER_TYPES": ("Bearer",),
+    "TOKEN_OBTAIN_SERIALIZER": "accounts.serializers.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "accounts.serializers.ClaimsTokenRefreshSerializer",
+    "TOKEN_USER_CLASS": "accounts.authentication.ClaimsUser",
 }
 
-# Logging configuration
+# Async (ASGI) read path, see places.async_db
+ASYNC_DB_POOL_MIN_SIZE = int(os.getenv("ASYNC_DB_POOL_MIN_SIZE", "2"))
+ASYNC_DB_POOL_MAX_SIZE = int(os.getenv("ASYNC_DB_POOL_MAX_SIZE", "20"))
+ASYNC_DB_POOL_TIMEOUT = float(os.getenv("ASYNC_DB_POOL_TIMEOUT", "10"))
+
+# Narrow searches to geohash cells before the geometry check, see
+# places.geohash. Off by default, compare with benchmarks.load first
+GEOHASH_PREFILTER = env_bool("GEOHASH_PREFILTER", False)
+
+# Polygon search: larger polygons are rejected, polygons above the simplify
+# limit are simplified into a prefilter for the exact database test. Up to
+# POLYGON_MAX_CANDIDATES places, about a page, are checked in Python instead
+POLYGON_MAX_VERTICES = int(os.getenv("POLYGON_MAX_VERTICES", "20000"))
+POLYGON_SIMPLIFY_VERTICES = int(os.getenv("POLYGON_SIMPLIFY_VERTICES", "500"))
+POLYGON_MAX_CANDIDATES = int(os.getenv("POLYGON_MAX_CANDIDATES", "100"))
+
+# Longest route accepted by the corridor search
+ROUTE_MAX_POINTS = int(os.getenv("ROUTE_MAX_POINTS", "10000"))
+
+# Decimals of coordinates in responses (6 is about 0.1 m), clients may ask
+# for up to COORDINATE_MAX_PRECISION with ?precision=
+COORDINATE_PRECISION = int(os.getenv("COORDINATE_PRECISION", "6"))
+COORDINATE_MAX_PRECISION = int(os.getenv("COORDINATE_MAX_PRECISION", "8"))
+
+# ?page_size= limits, admins may request larger pages for exports
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "100"))
+ADMIN_MAX_PAGE_SIZE = int(os.getenv("ADMIN_MAX_PAGE_SIZE", "10000"))
+
+# JSON pages of at least this many places are streamed from a server-side
+# cursor, fetching STREAMING_CHUNK_SIZE rows at a time
+STREAMING_MIN_PAGE_SIZE = int(os.getenv("STREAMING_MIN_PAGE_SIZE", "500"))
+STREAMING_CHUNK_SIZE = int(os.getenv("STREAMING_CHUNK_SIZE", "2000"))
+
+# Response compression in order of preference, see GeolocationAPI.compression.
+# br needs `brotli` and zstd needs `zstandard`, missing ones are skipped
+COMPRESSION_ENCODINGS = os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+# Schema, Swagger and ReDoc views, usually disabled in production
+API_DOCS_ENABLED = env_bool("API_DOCS_ENABLED", True)
+
+# Worker warm-up before serving traffic, see GeolocationAPI.warmup
+WARMUP_ENABLED = env_bool("WARMUP_ENABLED", True)
+
+# Shared read-only data built before the workers fork, see
+# GeolocationAPI.prefork. Files are mapped from SHARED_DATA_DIR and checked
+# for a new generation every SHARED_DATA_CHECK_SECONDS
+PREFORK_BOOTSTRAP = env_bool("PREFORK_BOOTSTRAP")
+SHARED_DATA_DIR = Path(os.getenv("SHARED_DATA_DIR", BASE_DIR / "var" / "shared"))
+SHARED_DATA_CHECK_SECONDS = float(os.getenv("SHARED_DATA_CHECK_SECONDS", "5"))
+
+# Place change feed, see places.changes
+PLACE_CHANGE_RETENTION_DAYS = int(os.getenv("PLACE_CHANGE_RETENTION_DAYS", "30"))
+PLACE_CHANGE_MAX_LIMIT = int(os.getenv("PLACE_CHANGE_MAX_LIMIT", "1000"))
+
+# Live place updates (server-sent events), see places.subscriptions. Every
+# ASGI worker polls the change feed once for all of its clients
+SUBSCRIPTION_POLL_SECONDS = float(os.getenv("SUBSCRIPTION_POLL_SECONDS", "1"))
+SUBSCRIPTION_BATCH_SIZE = int(os.getenv("SUBSCRIPTION_BATCH_SIZE", "500"))
+SUBSCRIPTION_CELL_PRECISION = int(os.getenv("SUBSCRIPTION_CELL_PRECISION", "4"))
+SUBSCRIPTION_MAX_CELLS = int(os.getenv("SUBSCRIPTION_MAX_CELLS", "64"))
+SUBSCRIPTION_QUEUE_SIZE = int(os.getenv("SUBSCRIPTION_QUEUE_SIZE", "100"))
+SUBSCRIPTION_HEARTBEAT_SECONDS = float(
+    os.getenv("SUBSCRIPTION_HEARTBEAT_SECONDS", "15")
+)
+SUBSCRIPTION_MAX_CLIENTS = int(os.getenv("SUBSCRIPTION_MAX_CLIENTS", "1000"))
+
+# Heatmap responses are cached by the server and by clients for this long
+HEATMAP_CACHE_SECONDS = int(os.getenv("HEATMAP_CACHE_SECONDS", "300"))
+
+# Refresh token revocation, see accounts.revocation
+TOKEN_REVOCATION_SYNC_SECONDS = float(os.getenv("TOKEN_REVOCATION_SYNC_SECONDS", "5"))
+TOKEN_REVOCATION_BLOOM_CAPACITY = int(
+    os.getenv("TOKEN_REVOCATION_BLOOM_CAPACITY", "1000000")
+)
+# Jtis revoked since the shared filter was published that a worker keeps
+# before publishing a new one (PREFORK_BOOTSTRAP only)
+TOKEN_REVOCATION_SHARED_DELTA = int(os.getenv("TOKEN_REVOCATION_SHARED_DELTA", "10000"))
+
+# Request metrics
+METRICS_ENABLED = env_bool("METRICS_ENABLED", True)
+METRICS_SERVER_TIMING = env_bool("METRICS_SERVER_TIMING")
+
+# Slow query log (plans are browsable in the admin, see `dump_slow_queries`)
+SLOW_QUERY_LOG_ENABLED = env_bool("SLOW_QUERY_LOG_ENABLED")
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(
+    os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", "0.1")
+)
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.getenv("SLOW_QUERY_EXPLAIN_TIMEOUT_MS", "5000"))
+SLOW_QUERY_CAPACITY = int(os.getenv("SLOW_QUERY_CAPACITY", "500"))
+
+# Logging configuration, LOG_TO_FILE=False logs to the console only
+# (containers, read-only filesystems)
+LOG_TO_FILE = env_bool("LOG_TO_FILE", True)
 LOGS_DIR = BASE_DIR / "logs"
-LOGS_DIR.mkdir(exist_ok=True)
+if LOG_TO_FILE:
+    LOGS_DIR.mkdir(exist_ok=True)
+LOG_HANDLERS = ["file", "console"] if LOG_TO_FILE else ["console"]
 
 LOGGING = {
     "version": 1,
@@ -225,8 +450,10 @@ LOGGING = {
         "file": {
             "level": "INFO",
             "class": "logging.FileHandler",
-            "filename": BASE_DIR / "logs" / "django.log",
+            "filename": LOGS_DIR / "django.log",
             "formatter": "verbose",
+            # Opened on the first record, not while configuring logging
+            "delay": True,
         },
         "console": {
             "level": "DEBUG",
@@ -236,20 +463,30 @@ LOGGING = {
     },
     "loggers": {
         "django": {
-            "handlers": ["file", "console"],
+            "handlers": LOG_HANDLERS,
             "level": "INFO",
             "propagate": True,
         },
         "places": {
-            "handlers": ["file", "console"],
+            "handlers": LOG_HANDLERS,
             "level": "DEBUG",
             "propagate": True,
         },
         "accounts": {
-            "handlers": ["file", "console"],
+            "handlers": LOG_HANDLERS,
             "level": "DEBUG",
             "propagate": True,
         },
+        "monitoring": {
+            "handlers": LOG_HANDLERS,
+            "level": "INFO",
+            "propagate": True,
+        },
+        "GeolocationAPI": {
+            "handlers": LOG_HANDLERS,
+            "level": "INFO",
+            "propagate": True,
+        },
     },
 }
 
@@ -0,0 +1,82 @@
+"""
+Sliding-window rate throttles.
+
+DRF's SimpleRateThrottle stores the timestamps of every request in the
+window, so each check rewrites a list of up to `num_requests` entries.
+These throttles keep one counter per fixed window instead and weight the
+previous window by the part of it still inside the sliding window. A
+check is one atomic increment and one read, the memory per client is two
+integers, and with a shared cache (REDIS_URL) the limits hold across
+worker processes.
+"""
+
+from django.conf import settings
+from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+
+
+class SlidingWindowMixin:
+    """Replaces the timestamp history of SimpleRateThrottle with counters"""
+
+    def _increment(self, key: str) -> int:
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Twice the duration keeps the counter while it is the previous one
+            if self.cache.add(key, 1, self.duration * 2):
+                return 1
+            return self.cache.incr(key)
+
+    def allow_request(self, request, view):
+        if self.rate is None or not settings.THROTTLE_ENABLED:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        position = self.timer() / self.duration
+        window = int(position)
+        self.elapsed = position - window
+        current_key = f"{self.key}:{window}"
+
+        self.previous = self.cache.get(f"{self.key}:{window - 1}", 0)
+        self.current = self._increment(current_key)
+        if self.previous * (1 - self.elapsed) + self.current > self.num_requests:
+            # Rejected requests do not use up the allowance
+            self.current = self.cache.decr(current_key)
+            return self.throttle_failure()
+        return self.throttle_success()
+
+    def throttle_success(self):
+        return True
+
+    def wait(self):
+        """Seconds until the weighted count drops below the limit"""
+        if self.current >= self.num_requests or not self.previous:
+            return (1 - self.elapsed) * self.duration
+        decayed = 1 - (self.num_requests - self.current) / self.previous
+        return max(decayed - self.elapsed, 0) * self.duration
+
+
+class AnonThrottle(SlidingWindowMixin, AnonRateThrottle):
+    pass
+
+
+class UserThrottle(SlidingWindowMixin, UserRateThrottle):
+    pass
+
+
+class SearchAnonThrottle(AnonThrottle):
+    """Separate allowance so searches do not use up the general one"""
+
+    scope = "search_anon"
+
+
+class SearchUserThrottle(UserThrottle):
+    scope = "search_user"
+
+
+class LoginThrottle(AnonThrottle):
+    """Per-address limit on password logins"""
+
+    scope = "login"
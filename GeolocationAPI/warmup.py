@@ -0,0 +1,64 @@
+"""
+Work done once per worker before it takes traffic, so that the first
+requests do not pay for it: loading GEOS, GDAL and the PROJ database,
+importing every view through the URLconf, opening database connections
+and reading the spatial indexes into shared buffers (pg_prewarm).
+"""
+
+import logging
+from time import perf_counter
+
+from django.db import DatabaseError, connections
+from django.urls import reverse
+
+logger = logging.getLogger(__name__)
+
+# GiST indexes used by the searches
+SPATIAL_INDEXES = ("places_place_location_id", "places_place_location_geog_idx")
+
+
+def warm_up_geo() -> None:
+    from django.contrib.gis.geos import Point
+
+    point = Point(19.937, 50.0613, srid=4326)
+    point.transform(3857, clone=True)
+    point.buffer(0.01).prepared.contains(point)
+
+
+def warm_up_urls() -> None:
+    # Resolving one name imports the URLconf and builds the lookup tables
+    reverse("places:place-list")
+
+
+def warm_up_database() -> None:
+    for connection in connections.all():
+        try:
+            connection.ensure_connection()
+            with connection.cursor() as cursor:
+                for index in SPATIAL_INDEXES:
+                    cursor.execute("SELECT pg_prewarm(%s::regclass)", [index])
+        except DatabaseError as exc:
+            # pg_prewarm needs `CREATE EXTENSION pg_prewarm`
+            logger.warning("Warm-up of database %s: %s", connection.alias, exc)
+        finally:
+            # Returns pooled connections, keeps persistent ones
+            connection.close_if_unusable_or_obsolete()
+
+
+def warm_up(database: bool = True) -> dict[str, float]:
+    """Runs the warm-up steps, returns the milliseconds each took"""
+    steps = [("geo", warm_up_geo), ("urls", warm_up_urls)]
+    if database:
+        steps.append(("database", warm_up_database))
+
+    timings = {}
+    for name, step in steps:
+        start = perf_counter()
+        step()
+        timings[name] = round((perf_counter() - start) * 1000, 1)
+    logger.info(
+        "Warm-up done in %.1f ms (%s)",
+        sum(timings.values()),
+        ", ".join(f"{name} {ms} ms" for name, ms in timings.items()),
+    )
+    return timings
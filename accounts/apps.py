@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "accounts"
+
+    def ready(self):
+        from accounts.revocation import publish_shared
+        from GeolocationAPI.prefork import register
+
+        register("revoked-tokens", publish_shared)
@@ -0,0 +1,58 @@
+from functools import cached_property
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from accounts.claims import claims_version
+from accounts.models import UserRole
+
+
+class ClaimsUser(TokenUser):
+    """
+    Request user backed by token claims instead of a database row.
+    Provides what permissions and serializers need: pk, role and flags.
+    """
+
+    @cached_property
+    def id(self) -> int:
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def role(self) -> str:
+        return self.token.get("role", UserRole.USER)
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == UserRole.ADMIN or self.is_superuser
+
+    @property
+    def is_moderator(self) -> bool:
+        return self.role in [UserRole.MODERATOR, UserRole.ADMIN] or self.is_superuser
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication without a user lookup per request.
+    Tokens issued before the role claims existed fall back to the database.
+    """
+
+    def get_user(self, validated_token):
+        if "role" not in validated_token:
+            return super().get_user(validated_token)
+
+        try:
+            user = ClaimsUser(validated_token)
+            user_id = user.id
+        except (KeyError, ValueError) as err:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from err
+
+        # None when the user was deleted
+        version = claims_version(user_id)
+        if version is None or validated_token.get("claims_version") != version:
+            raise InvalidToken(_("Token claims are outdated, refresh the token"))
+        return user
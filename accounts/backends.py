@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from accounts import hashing
+
+UserModel = get_user_model()
+
+
+class OffloadedModelBackend(ModelBackend):
+    """ModelBackend verifying passwords in the hashing process pool"""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash anyway so unknown emails take as long as wrong passwords
+            hashing.make_password(password)
+            return None
+
+        valid, must_update = hashing.check_password(password, user.password)
+        if not valid or not self.user_can_authenticate(user):
+            return None
+
+        if must_update and settings.PASSWORD_REHASH_ON_LOGIN:
+            user.password = hashing.make_password(password)
+            user.save(update_fields=["password"])
+        return user
@@ -0,0 +1,69 @@
+"""
+Role claims carried by JWTs and their invalidation.
+
+A role change, deactivation or deletion gives the user row a new
+`claims_version`. Access tokens carry the version they were issued with and
+are rejected once it differs from the row's. Workers compare against a copy
+of the version cached for JWT_CLAIMS_CACHE_SECONDS: with a shared cache
+(REDIS_URL) a change is seen at once, with the per-process default cache
+after at most that long. A user whose row is gone is always rejected.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Fields of CustomUser copied into token claims
+CLAIM_FIELDS = ("role", "is_staff", "is_superuser", "is_active")
+
+
+def _version_key(user_pk) -> str:
+    return f"auth:claims-version:{user_pk}"
+
+
+def new_claims_version() -> int:
+    return time.time_ns()
+
+
+def cache_claims_version(user_pk, version: int) -> None:
+    cache.set(_version_key(user_pk), version, settings.JWT_CLAIMS_CACHE_SECONDS)
+
+
+def forget_claims_version(user_pk) -> None:
+    cache.delete(_version_key(user_pk))
+
+
+def claims_version(user_pk) -> int | None:
+    """Claims version of the user's row, None if the user no longer exists"""
+    version = cache.get(_version_key(user_pk))
+    if version is None:
+        # accounts.models imports this module
+        from django.contrib.auth import get_user_model
+
+        version = (
+            get_user_model()
+            .objects.filter(pk=user_pk)
+            .values_list("claims_version", flat=True)
+            .first()
+        )
+        if version is not None:
+            cache_claims_version(user_pk, version)
+    return version
+
+
+def invalidate_user_claims(user_pk) -> None:
+    """Rejects the access tokens issued to the user until now"""
+    from django.contrib.auth import get_user_model
+
+    version = new_claims_version()
+    get_user_model().objects.filter(pk=user_pk).update(claims_version=version)
+    forget_claims_version(user_pk)
+
+
+def set_user_claims(token, user) -> None:
+    token["role"] = user.role
+    token["is_staff"] = user.is_staff
+    token["is_superuser"] = user.is_superuser
+    token["claims_version"] = user.claims_version
+    cache_claims_version(user.pk, user.claims_version)
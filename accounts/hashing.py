@@ -0,0 +1,125 @@
+"""
+Password hashing off the request thread.
+
+Hashing a password costs tens to hundreds of milliseconds of CPU by design.
+`make_password` and `check_password` run it in a process pool of
+PASSWORD_HASH_WORKERS processes, so registrations and logins do not hold
+the GIL of the serving process, and at most two jobs per worker are queued
+before callers wait. With PASSWORD_HASH_WORKERS=0 hashing runs inline.
+The pool belongs to one server process and starts its processes on the
+first hashes: gunicorn.conf.py gives every worker at least one.
+
+The hashers below read their cost from settings, so raising
+PASSWORD_PBKDF2_ITERATIONS (or the argon2 costs) marks existing hashes for
+an update, applied on the next login when PASSWORD_REHASH_ON_LOGIN is set.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+_lock = threading.Lock()
+_executor: ProcessPoolExecutor | None = None
+_executor_pid: int | None = None
+_slots: threading.BoundedSemaphore | None = None
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with PASSWORD_PBKDF2_ITERATIONS iterations"""
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2id with costs from PASSWORD_ARGON2_* settings"""
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+
+def _get_executor() -> ProcessPoolExecutor | None:
+    global _executor, _executor_pid, _slots
+    workers = settings.PASSWORD_HASH_WORKERS
+    if workers <= 0:
+        return None
+    # A pool inherited through fork belongs to the parent process
+    if _executor is None or _executor_pid != os.getpid():
+        with _lock:
+            if _executor is None or _executor_pid != os.getpid():
+                _executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    # Forking a threaded server process is not safe
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                _executor_pid = os.getpid()
+                _slots = threading.BoundedSemaphore(workers * 2)
+    return _executor
+
+
+def _reset_executor(executor) -> None:
+    global _executor
+    with _lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _run(function, *args):
+    executor = _get_executor()
+    if executor is None:
+        return function(*args)
+    with _slots:
+        try:
+            return executor.submit(function, *args).result()
+        except BrokenProcessPool:
+            # A killed worker breaks the pool, the next call starts a new one
+            _reset_executor(executor)
+            return function(*args)
+
+
+def shutdown() -> None:
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown()
+
+
+def _verify(password: str, encoded: str | None) -> tuple[bool, bool]:
+    if encoded is None or encoded.startswith(hashers.UNUSABLE_PASSWORD_PREFIX):
+        return False, False
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False, False
+    if not hasher.verify(password, encoded):
+        return False, False
+    preferred = hashers.get_hasher("default")
+    must_update = hasher.algorithm != preferred.algorithm or preferred.must_update(
+        encoded
+    )
+    return True, must_update
+
+
+def make_password(password: str | None) -> str:
+    """Hashes the password with the default hasher in the pool"""
+    if password is None:
+        return hashers.make_password(None)
+    return _run(hashers.make_password, password)
+
+
+def check_password(password: str, encoded: str | None) -> tuple[bool, bool]:
+    """(whether the password matches, whether the hash should be updated)"""
+    return _run(_verify, password, encoded)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from accounts.revocation import purge_expired
+
+
+class Command(BaseCommand):
+    help = "Deletes revoked refresh tokens that have expired (run e.g. hourly)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        deleted = purge_expired(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Purged {deleted} expired tokens"))
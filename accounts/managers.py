@@ -1,6 +1,8 @@
 from django.contrib.auth.base_user import BaseUserManager
 from django.utils.translation import gettext_lazy as _
 
+from accounts import hashing
+
 
 class CustomUserManager(BaseUserManager):
     """
@@ -16,10 +18,13 @@ class CustomUserManager(BaseUserManager):
             raise ValueError(_("The Email must be set"))
         email = self.normalize_email(email)
         user = self.model(email=email, **extra_fields)
-        user.set_password(password)
+        user.password = hashing.make_password(password)
         user.save()
         return user
 
+    def get_by_natural_key(self, username):
+        return self.get(email__lower=username.lower())
+
     def create_superuser(self, email, password, **extra_fields):
         """
         Create and save a SuperUser with the given email and password.
@@ -0,0 +1,24 @@
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0003_revokedtoken"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="customuser",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("email"),
+                name="accounts_customuser_email_ci_unique",
+                violation_error_message="User with this email already exists.",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="customuser",
+            name="email",
+            field=models.EmailField(max_length=254, verbose_name="email address"),
+        ),
+    ]
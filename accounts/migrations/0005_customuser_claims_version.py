@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0004_customuser_email_ci_unique"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="claims_version",
+            field=models.BigIntegerField(
+                default=0,
+                help_text="Access tokens carrying another version are rejected",
+            ),
+        ),
+    ]
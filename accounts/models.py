@@ -1,7 +1,14 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Lower
 from django.utils.translation import gettext_lazy as _
 
+from accounts.claims import (
+    CLAIM_FIELDS,
+    cache_claims_version,
+    forget_claims_version,
+    new_claims_version,
+)
 from accounts.managers import CustomUserManager
 
 
@@ -11,21 +18,40 @@ class UserRole(models.TextChoices):
     ADMIN = "admin", "Admin"
 
 
+# Lets `email__lower=...` lookups use the case-insensitive unique index
+models.EmailField.register_lookup(Lower)
+
+EMAIL_UNIQUE_CONSTRAINT = "accounts_customuser_email_ci_unique"
+
+
 class CustomUser(AbstractUser):
     username = None
-    email = models.EmailField(_("email address"), unique=True)
+    # Unique regardless of case, see Meta.constraints
+    email = models.EmailField(_("email address"))
     role = models.CharField(
         max_length=20,
         choices=UserRole.choices,
         default=UserRole.USER,
         help_text="User role in the system",
     )
+    claims_version = models.BigIntegerField(
+        default=0, help_text="Access tokens carrying another version are rejected"
+    )
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
 
     objects = CustomUserManager()
 
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            models.UniqueConstraint(
+                Lower("email"),
+                name=EMAIL_UNIQUE_CONSTRAINT,
+                violation_error_message=_("User with this email already exists."),
+            ),
+        ]
+
     @property
     def is_admin(self):
         return self.role == UserRole.ADMIN or self.is_superuser
@@ -34,5 +60,64 @@ class CustomUser(AbstractUser):
     def is_moderator(self):
         return self.role in [UserRole.MODERATOR, UserRole.ADMIN] or self.is_superuser
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        claims_changed = self._claims_changed(update_fields)
+        if claims_changed:
+            self.claims_version = new_claims_version()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "claims_version"}
+        super().save(*args, **kwargs)
+        if claims_changed:
+            # Until the commit, a cache miss reads the version from the row.
+            # Caching the new one only after it keeps a rollback from
+            # rejecting every valid token of the user
+            forget_claims_version(self.pk)
+            pk, version = self.pk, self.claims_version
+            transaction.on_commit(lambda: cache_claims_version(pk, version))
+
+    def delete(self, *args, **kwargs):
+        pk = self.pk
+        result = super().delete(*args, **kwargs)
+        # Tokens of a user without a row are rejected
+        forget_claims_version(pk)
+        return result
+
+    def _claims_changed(self, update_fields=None) -> bool:
+        """Whether the save changes a value carried in token claims"""
+        if self._state.adding or self.pk is None:
+            return False
+        fields = [
+            field
+            for field in CLAIM_FIELDS
+            if update_fields is None or field in update_fields
+        ]
+        if not fields:
+            return False
+        stored = type(self).objects.filter(pk=self.pk).values(*fields).first()
+        return stored is not None and any(
+            stored[field] != getattr(self, field) for field in fields
+        )
+
     def __str__(self):
         return self.email
+
+
+class RevokedToken(models.Model):
+    """Refresh token that can no longer be used: rotated or logged out"""
+
+    jti = models.CharField(max_length=255, unique=True)
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    expires_at = models.DateTimeField(
+        db_index=True, help_text="Rows past this time can be purged"
+    )
+    revoked_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.jti
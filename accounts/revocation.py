@@ -0,0 +1,234 @@
+"""
+Refresh token revocation.
+
+Rotation revokes the presented token with one INSERT on the unique jti
+index, so a replayed token is detected by the same statement. Membership
+checks (refresh without rotation) go through an in-process bloom filter
+that is synced incrementally from the table: tokens that were never
+revoked, almost all of them, are answered without a query. Expired rows
+are removed by `manage.py purge_revoked_tokens`.
+
+With PREFORK_BOOTSTRAP the filter is published to a shared file (built in
+the gunicorn master, see GeolocationAPI.prefork) and mapped read-only by
+every worker, which only keeps the jtis revoked since then in a set. A
+worker whose set outgrows TOKEN_REVOCATION_SHARED_DELTA publishes a new
+generation.
+"""
+
+import hashlib
+import math
+import struct
+import threading
+from datetime import UTC, datetime
+from time import monotonic
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from accounts.models import RevokedToken
+from GeolocationAPI.prefork import SharedFile, file_lock, publish, shared_path
+
+PK_OVERLAP = 1000
+
+# Shared file: magic, bit count, hash count, members, last pk, then the bits
+SHARED_FILE = "revoked-tokens.bloom"
+SHARED_MAGIC = b"GEOBLM01"
+SHARED_HEADER = struct.Struct("<8sQQQQ")
+
+
+class BloomFilter:
+    """Fixed-size bloom filter of strings"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.size = max(
+            64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    @classmethod
+    def from_buffer(cls, bits, size: int, hashes: int, count: int) -> "BloomFilter":
+        """Filter over existing bits, e.g. a read-only memory map"""
+        bloom = cls.__new__(cls)
+        bloom.size, bloom.hashes, bloom.bits, bloom.count = size, hashes, bits, count
+        return bloom
+
+    def _positions(self, value: str):
+        # Double hashing: k positions from one 128-bit digest
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, value: str) -> None:
+        if value in self:
+            return
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+
+class RevocationIndex:
+    """Bloom filter of revoked jtis, kept in sync with RevokedToken"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom: BloomFilter | None = None
+        self._capacity = 0
+        self._last_pk = 0
+        self._synced_at = -math.inf
+        # Shared mode: the mapped filter and the jtis revoked since
+        self._shared: SharedFile | None = None
+        self._mapping = None
+        self._recent: set[str] | None = None
+
+    def _rebuild(self) -> None:
+        """Reloads unexpired rows, dropping purged and expired jtis"""
+        queryset = RevokedToken.objects.filter(expires_at__gt=timezone.now())
+        self._capacity = max(
+            settings.TOKEN_REVOCATION_BLOOM_CAPACITY, 2 * queryset.count()
+        )
+        self._bloom = BloomFilter(self._capacity)
+        self._last_pk = 0
+        self._load(queryset)
+
+    def _load(self, queryset) -> None:
+        # Concurrent inserts may commit out of pk order, so recent rows are
+        # read again; re-adding a jti is a no-op
+        since = max(self._last_pk - PK_OVERLAP, 0)
+        rows = queryset.filter(pk__gt=since).order_by("pk")
+        for pk, jti in rows.values_list("pk", "jti").iterator(chunk_size=5000):
+            self._remember(jti)
+            self._last_pk = pk
+
+    def _remember(self, jti: str) -> None:
+        if self._recent is None:
+            self._bloom.add(jti)
+        elif jti not in self._bloom:
+            self._recent.add(jti)
+
+    def _map_shared(self, force: bool = False) -> bool:
+        """Switches to the latest published filter, False if there is none"""
+        mapping = self._shared.get(force)
+        if mapping is None:
+            return False
+        if mapping is not self._mapping:
+            magic, size, hashes, count, last_pk = SHARED_HEADER.unpack_from(mapping)
+            if magic != SHARED_MAGIC:
+                return False
+            bits = memoryview(mapping)[SHARED_HEADER.size :]
+            self._bloom = BloomFilter.from_buffer(bits, size, hashes, count)
+            self._mapping = mapping
+            self._recent = set()
+            self._last_pk = last_pk
+        return True
+
+    def _publish_shared(self) -> None:
+        """Publishes a new filter, unless another worker just did"""
+        mapping = self._mapping
+        with file_lock(self._shared.path):
+            if self._shared.get(force=True) is mapping:
+                publish_shared(self._shared.path)
+        self._map_shared(force=True)
+
+    def _sync_shared(self) -> None:
+        path = shared_path(SHARED_FILE)
+        if self._shared is None or self._shared.path != path:
+            self._shared = SharedFile(path)
+            self._mapping = None
+        if (
+            not self._map_shared()
+            or len(self._recent) > settings.TOKEN_REVOCATION_SHARED_DELTA
+        ):
+            self._publish_shared()
+        self._load(RevokedToken.objects.all())
+
+    def sync(self, force: bool = False) -> None:
+        """Loads rows inserted by other processes since the last sync"""
+        now = monotonic()
+        interval = settings.TOKEN_REVOCATION_SYNC_SECONDS
+        if not force and now - self._synced_at < interval:
+            return
+        with self._lock:
+            if settings.PREFORK_BOOTSTRAP:
+                self._sync_shared()
+            elif self._bloom is None or self._bloom.count > self._capacity:
+                self._rebuild()
+            else:
+                self._load(RevokedToken.objects.all())
+            self._synced_at = now
+
+    def add(self, jti: str) -> None:
+        with self._lock:
+            if self._bloom is not None:
+                self._remember(jti)
+
+    def might_contain(self, jti: str) -> bool:
+        self.sync()
+        if self._recent is not None and jti in self._recent:
+            return True
+        return jti in self._bloom
+
+
+index = RevocationIndex()
+
+
+def publish_shared(path: str | None = None) -> None:
+    """Writes the filter of unexpired revoked jtis for all workers"""
+    queryset = RevokedToken.objects.filter(expires_at__gt=timezone.now())
+    bloom = BloomFilter(
+        max(settings.TOKEN_REVOCATION_BLOOM_CAPACITY, 2 * queryset.count())
+    )
+    last_pk = 0
+    rows = queryset.order_by("pk").values_list("pk", "jti")
+    for pk, jti in rows.iterator(chunk_size=5000):
+        bloom.add(jti)
+        last_pk = pk
+
+    def write(file):
+        header = (SHARED_MAGIC, bloom.size, bloom.hashes, bloom.count, last_pk)
+        file.write(SHARED_HEADER.pack(*header))
+        file.write(bloom.bits)
+
+    publish(path or shared_path(SHARED_FILE), write)
+
+
+def revoke_token(token) -> bool:
+    """Revokes a refresh token, returns False if it was already revoked"""
+    jti = token[api_settings.JTI_CLAIM]
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(
+                jti=jti,
+                user_id=token.get(api_settings.USER_ID_CLAIM),
+                expires_at=datetime.fromtimestamp(token["exp"], tz=UTC),
+            )
+    except IntegrityError:
+        return False
+    index.add(jti)
+    return True
+
+
+def is_revoked(jti: str) -> bool:
+    """Bloom filter first, the unique index only for possible members"""
+    if not index.might_contain(jti):
+        return False
+    return RevokedToken.objects.filter(jti=jti).exists()
+
+
+def purge_expired(batch_size: int = 10000) -> int:
+    """Deletes rows of tokens that expired anyway, in batches"""
+    deleted = 0
+    queryset = RevokedToken.objects.filter(expires_at__lte=timezone.now())
+    while pks := list(queryset.values_list("pk", flat=True)[:batch_size]):
+        deleted += RevokedToken.objects.filter(pk__in=pks).delete()[0]
+    return deleted
@@ -1,7 +1,18 @@
 from django.contrib.auth.password_validation import validate_password
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 
-from accounts.models import CustomUser
+from accounts.claims import set_user_claims
+from accounts.models import EMAIL_UNIQUE_CONSTRAINT, CustomUser
+from accounts.revocation import is_revoked, revoke_token
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -16,16 +27,12 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         model = CustomUser
         fields = ["email", "first_name", "last_name", "password", "password_confirm"]
         extra_kwargs = {
-            "email": {"required": True},
+            # Uniqueness is checked by the insert, see create()
+            "email": {"required": True, "validators": []},
             "first_name": {"required": True},
             "last_name": {"required": True},
         }
 
-    def validate_email(self, value):
-        if CustomUser.objects.filter(email=value).exists():
-            raise serializers.ValidationError("User with this email already exists.")
-        return value
-
     def validate(self, attrs):
         if attrs.get("password") != attrs.get("password_confirm"):
             raise serializers.ValidationError(
@@ -35,8 +42,15 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data.pop("password_confirm", None)
-        user = CustomUser.objects.create_user(**validated_data)
-        return user
+        try:
+            with transaction.atomic():
+                return CustomUser.objects.create_user(**validated_data)
+        except IntegrityError as exc:
+            if EMAIL_UNIQUE_CONSTRAINT not in str(exc):
+                raise
+            raise serializers.ValidationError(
+                {"email": ["User with this email already exists."]}
+            ) from exc
 
 
 class UserPublicSerializer(serializers.ModelSerializer):
@@ -95,3 +109,56 @@ class ChangePasswordSerializer(serializers.Serializer):
                 {"new_password_confirm": "New passwords do not match!"}
             )
         return attrs
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Issues tokens carrying the role and staff/superuser flags"""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        set_user_claims(token, user)
+        return token
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Reloads the user so refreshed tokens carry current claims"""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        lookup = {api_settings.USER_ID_FIELD: user_id}
+        user = CustomUser.objects.filter(**lookup).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages["no_active_account"], "no_active_account"
+            )
+
+        if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION:
+            # The insert fails for a token that was already rotated or revoked
+            if not revoke_token(refresh):
+                raise TokenError("Token is blacklisted")
+        elif is_revoked(refresh[api_settings.JTI_CLAIM]):
+            raise TokenError("Token is blacklisted")
+
+        set_user_claims(refresh, user)
+        data = {"access": str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data["refresh"] = str(refresh)
+
+        return data
+
+
+class TokenRevokeSerializer(serializers.Serializer):
+    """Revokes a refresh token, e.g. on logout"""
+
+    refresh = serializers.CharField(write_only=True)
+
+    def validate(self, attrs):
+        revoke_token(RefreshToken(attrs["refresh"]))
+        return {}
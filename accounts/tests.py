@@ -1 +1,342 @@
-# Create your tests here.
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts import hashing
+from accounts.models import CustomUser, RevokedToken, UserRole
+from accounts.revocation import (
+    SHARED_FILE,
+    BloomFilter,
+    RevocationIndex,
+    publish_shared,
+)
+
+
+def obtain_tokens(user) -> dict:
+    response = APIClient().post(
+        "/api/token/",
+        {"email": user.email, "password": "VerySecret12345"},
+        format="json",
+    )
+    assert response.status_code == 200
+    return response.data
+
+
+def bearer_client(access: str) -> APIClient:
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+    return client
+
+
+@pytest.mark.django_db
+class TestStatelessJWTAuthentication:
+    def test_authenticated_request_does_not_load_user(self, user_factory):
+        """The request user is built from token claims"""
+        user = user_factory(role=UserRole.MODERATOR)
+        client = bearer_client(obtain_tokens(user)["access"])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get("/api/v1/places/archived/")
+
+        # Moderators are not admins, so the claims alone decide the 403
+        assert response.status_code == 403
+        assert not any("accounts_customuser" in query["sql"] for query in queries)
+
+    def test_role_change_invalidates_issued_access_tokens(self, user_factory):
+        """Old tokens are rejected after a role change, refreshed ones work"""
+        user = user_factory()
+        tokens = obtain_tokens(user)
+
+        user.role = UserRole.ADMIN
+        user.is_staff = True
+        user.save()
+
+        response = bearer_client(tokens["access"]).get("/api/v1/places/")
+        assert response.status_code == 401
+
+        refreshed = APIClient().post(
+            "/api/token/refresh/", {"refresh": tokens["refresh"]}, format="json"
+        )
+        assert refreshed.status_code == 200
+        client = bearer_client(refreshed.data["access"])
+        assert client.get("/api/v1/places/archived/").status_code == 200
+
+    def test_deactivated_user_cannot_refresh(self, user_factory):
+        """Deactivation rejects both the access and the refresh token"""
+        user = user_factory()
+        tokens = obtain_tokens(user)
+
+        user.is_active = False
+        user.save()
+
+        assert bearer_client(tokens["access"]).get("/api/v1/places/").status_code == 401
+        response = APIClient().post(
+            "/api/token/refresh/", {"refresh": tokens["refresh"]}, format="json"
+        )
+        assert response.status_code == 401
+
+    def test_outdated_tokens_are_rejected_without_the_cache(self, user_factory):
+        """The version lives on the user row, losing cached copies is safe"""
+        user = user_factory(role=UserRole.ADMIN, is_staff=True)
+        access = obtain_tokens(user)["access"]
+
+        user.role = UserRole.USER
+        user.is_staff = False
+        user.save()
+        cache.clear()
+
+        assert bearer_client(access).get("/api/v1/places/").status_code == 401
+
+    def test_rolled_back_role_change_keeps_tokens_valid(
+        self, user_factory, django_capture_on_commit_callbacks
+    ):
+        """A version the database never stored is not cached"""
+        user = user_factory()
+        access = obtain_tokens(user)["access"]
+
+        with (
+            django_capture_on_commit_callbacks(execute=True),
+            pytest.raises(RuntimeError),
+            transaction.atomic(),
+        ):
+            user.role = UserRole.ADMIN
+            user.save()
+            raise RuntimeError
+
+        assert bearer_client(access).get("/api/v1/places/").status_code == 200
+
+    def test_deleted_user_tokens_are_rejected(self, user_factory):
+        """Access tokens of a deleted user stop working"""
+        user = user_factory()
+        access = obtain_tokens(user)["access"]
+
+        user.delete()
+        cache.clear()
+
+        assert bearer_client(access).get("/api/v1/places/").status_code == 401
+
+    def test_last_login_update_keeps_tokens_valid(self, user_factory):
+        """Saves that do not touch claim fields do not invalidate tokens"""
+        user = user_factory()
+        access = obtain_tokens(user)["access"]
+        obtain_tokens(user)
+
+        assert bearer_client(access).get("/api/v1/places/").status_code == 200
+
+
+def refresh(token: str):
+    return APIClient().post("/api/token/refresh/", {"refresh": token}, format="json")
+
+
+@pytest.fixture
+def without_rotation(monkeypatch):
+    """Refresh keeps the token, revocation is checked through the filter"""
+    monkeypatch.setattr(api_settings, "ROTATE_REFRESH_TOKENS", False)
+
+
+@pytest.mark.django_db
+class TestRefreshTokenRevocation:
+    def test_rotated_refresh_token_cannot_be_replayed(self, user_factory):
+        """A refresh token is single use, the rotated one keeps working"""
+        tokens = obtain_tokens(user_factory())
+
+        first = refresh(tokens["refresh"])
+        assert first.status_code == 200
+
+        assert refresh(tokens["refresh"]).status_code == 401
+        assert refresh(first.data["refresh"]).status_code == 200
+
+    def test_revoked_token_cannot_be_refreshed(self, user_factory):
+        """Logout revokes the refresh token"""
+        tokens = obtain_tokens(user_factory())
+
+        response = APIClient().post(
+            "/api/token/revoke/", {"refresh": tokens["refresh"]}, format="json"
+        )
+
+        assert response.status_code == 200
+        assert refresh(tokens["refresh"]).status_code == 401
+
+    def test_revoked_token_is_found_without_rotation(
+        self, user_factory, without_rotation
+    ):
+        """Refresh without rotation rejects a token once it is revoked"""
+        tokens = obtain_tokens(user_factory())
+
+        first = refresh(tokens["refresh"])
+        assert first.status_code == 200
+        assert "refresh" not in first.data
+        assert refresh(tokens["refresh"]).status_code == 200
+
+        APIClient().post(
+            "/api/token/revoke/", {"refresh": tokens["refresh"]}, format="json"
+        )
+        assert refresh(tokens["refresh"]).status_code == 401
+
+    def test_purge_removes_only_expired_tokens(self, user_factory):
+        """Only revoked tokens past their expiry are purged"""
+        now = timezone.now()
+        RevokedToken.objects.create(jti="expired", expires_at=now - timedelta(hours=1))
+        RevokedToken.objects.create(jti="active", expires_at=now + timedelta(hours=1))
+
+        call_command("purge_revoked_tokens", "--batch-size", "1")
+
+        assert list(RevokedToken.objects.values_list("jti", flat=True)) == ["active"]
+
+
+class TestBloomFilter:
+    def test_added_values_are_always_found(self):
+        """Added values are always found, other values rarely"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        values = [f"jti-{i}" for i in range(1000)]
+        for value in values:
+            bloom.add(value)
+
+        assert all(value in bloom for value in values)
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+        assert false_positives < 300
+
+
+@pytest.mark.django_db
+class TestSharedRevocationIndex:
+    @pytest.fixture(autouse=True)
+    def shared(self, settings, tmp_path):
+        settings.PREFORK_BOOTSTRAP = True
+        settings.SHARED_DATA_DIR = tmp_path
+        settings.SHARED_DATA_CHECK_SECONDS = 0
+        settings.TOKEN_REVOCATION_SYNC_SECONDS = 0
+
+    def revoke(self, jti: str):
+        expires_at = timezone.now() + timedelta(hours=1)
+        RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+
+    def test_workers_map_the_published_filter(self):
+        """Jtis revoked after the snapshot are kept in the worker's delta"""
+        self.revoke("before")
+        publish_shared()
+        worker = RevocationIndex()
+        self.revoke("after")
+
+        assert worker.might_contain("before")
+        assert worker.might_contain("after")
+        assert not worker.might_contain("never")
+        assert isinstance(worker._bloom.bits, memoryview)
+        assert worker._recent == {"after"}
+
+    def test_refresh_checks_the_published_filter(
+        self, user_factory, without_rotation, tmp_path
+    ):
+        """Tokens revoked by another worker are rejected on refresh"""
+        tokens = obtain_tokens(user_factory())
+        assert refresh(tokens["refresh"]).status_code == 200
+        assert (tmp_path / SHARED_FILE).exists()
+
+        self.revoke(RefreshToken(tokens["refresh"])[api_settings.JTI_CLAIM])
+
+        assert refresh(tokens["refresh"]).status_code == 401
+
+    def test_large_delta_publishes_a_new_generation(self, settings):
+        """A worker with many recent revocations republishes the filter"""
+        settings.TOKEN_REVOCATION_SHARED_DELTA = 2
+        worker, other = RevocationIndex(), RevocationIndex()
+        worker.sync()
+        for i in range(3):
+            self.revoke(f"jti-{i}")
+
+        worker.sync()
+        worker.sync()
+
+        assert worker._recent == set()
+        other.sync()
+        assert other._recent == set()
+        assert all(other.might_contain(f"jti-{i}") for i in range(3))
+
+
+@pytest.mark.django_db
+class TestPasswordHashing:
+    def test_pool_hashes_match_inline_checks(self, settings):
+        """Hashes made in the pool verify inline"""
+        settings.PASSWORD_HASH_WORKERS = 1
+        encoded = hashing.make_password("VerySecret12345")
+        hashing.shutdown()
+
+        settings.PASSWORD_HASH_WORKERS = 0
+        assert hashing.check_password("VerySecret12345", encoded)[0]
+        assert not hashing.check_password("wrong", encoded)[0]
+
+    def test_registered_user_can_log_in(self, settings):
+        """A user registered through the manager can log in"""
+        settings.PASSWORD_HASH_WORKERS = 0
+        user = CustomUser.objects.create_user(
+            "new@example.com", "VerySecret12345", first_name="New"
+        )
+
+        assert obtain_tokens(user)["access"]
+
+    @pytest.mark.parametrize("rehash", [True, False])
+    def test_outdated_hash_is_updated_on_login_when_enabled(
+        self, settings, user_factory, rehash
+    ):
+        """Outdated hashes are upgraded on login only when enabled"""
+        settings.PASSWORD_HASH_WORKERS = 0
+        settings.PASSWORD_PBKDF2_ITERATIONS = 1000
+        user = user_factory()
+        settings.PASSWORD_PBKDF2_ITERATIONS = 2000
+        settings.PASSWORD_REHASH_ON_LOGIN = rehash
+
+        obtain_tokens(user)
+
+        user.refresh_from_db()
+        iterations = "2000" if rehash else "1000"
+        assert user.password.startswith(f"pbkdf2_sha256${iterations}$")
+
+
+@pytest.mark.django_db
+class TestCaseInsensitiveEmail:
+    def register(self, email: str):
+        payload = {
+            "email": email,
+            "first_name": "New",
+            "last_name": "User",
+            "password": "VerySecret12345",
+            "password_confirm": "VerySecret12345",
+        }
+        return APIClient().post("/api/v1/accounts/register/", payload, format="json")
+
+    def test_email_differing_in_case_is_rejected(self, settings, user_factory):
+        """Registering an email taken in another case is a 400"""
+        settings.PASSWORD_HASH_WORKERS = 0
+        user_factory(email="taken@example.com")
+
+        response = self.register("Taken@Example.com")
+
+        assert response.status_code == 400
+        assert response.data["email"] == ["User with this email already exists."]
+
+    def test_registration_does_not_query_for_existing_email(self, settings):
+        """The unique index, not a SELECT, detects taken emails"""
+        settings.PASSWORD_HASH_WORKERS = 0
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.register("new@example.com")
+
+        assert response.status_code == 201
+        selects = [q for q in queries if q["sql"].startswith("SELECT")]
+        assert selects == []
+
+    def test_login_and_admin_filter_ignore_email_case(self, user_factory, admin_client):
+        """Login and the admin email filter ignore case"""
+        user = user_factory(email="Mixed@Example.com")
+        user.email = "mixed@EXAMPLE.com"
+
+        assert obtain_tokens(user)["access"]
+        response = admin_client.get("/api/v1/accounts/users/?email=MIXED@example.com")
+        assert [row["id"] for row in response.data["results"]] == [user.pk]
@@ -3,14 +3,20 @@ from rest_framework import mixins, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.views import TokenViewBase
 
+from accounts import hashing
 from accounts.models import CustomUser
 from accounts.serializers import (
     ChangePasswordSerializer,
+    TokenRevokeSerializer,
     UserDetailSerializer,
     UserRegistrationSerializer,
     UserUpdateSerializer,
 )
+from GeolocationAPI.db_routers import ReplicaReadMixin
+from monitoring.mixins import InstrumentedViewMixin
 
 User = get_user_model()
 
@@ -24,6 +30,8 @@ class RegistrationViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
 class ProfileViewSet(viewsets.GenericViewSet):
     queryset = User.objects.none()
     permission_classes = [IsAuthenticated]
+    # Profile actions work on the full user row
+    authentication_classes = [JWTAuthentication]
 
     def get_serializer_class(self):
         action_serializers = {
@@ -51,15 +59,34 @@ class ProfileViewSet(viewsets.GenericViewSet):
         serializer.is_valid(raise_exception=True)
         user = request.user
 
-        if not user.check_password(serializer.validated_data["old_password"]):
+        valid, _ = hashing.check_password(
+            serializer.validated_data["old_password"], user.password
+        )
+        if not valid:
             return Response({"old_password": ["Wrong password."]}, status=400)
 
-        user.set_password(serializer.validated_data["new_password"])
+        user.password = hashing.make_password(serializer.validated_data["new_password"])
         user.save()
         return Response({"message": "Password changed successfully."})
 
 
-class AdminUserViewSet(viewsets.ReadOnlyModelViewSet):
+class AdminUserViewSet(
+    InstrumentedViewMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet
+):
     queryset = CustomUser.objects.all().order_by("-date_joined")
     serializer_class = UserDetailSerializer
     permission_classes = [IsAdminUser]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        email = self.request.query_params.get("email")
+        if email:
+            # Matches the expression of the case-insensitive unique index
+            queryset = queryset.filter(email__lower=email.lower())
+        return queryset
+
+
+class TokenRevokeView(TokenViewBase):
+    """Revokes a refresh token so it can no longer be used"""
+
+    serializer_class = TokenRevokeSerializer
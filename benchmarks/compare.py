@@ -0,0 +1,69 @@
+"""
+Compares two result files written by `benchmarks.load` and exits with
+status 1 when the candidate regressed beyond the threshold:
+
+    python -m benchmarks.compare benchmarks/results/main.json \\
+        benchmarks/results/my-branch.json --threshold 0.1
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path: str) -> dict[tuple[str, int], dict]:
+    with open(path) as file:
+        report = json.load(file)
+    return {
+        (result["scenario"], result["concurrency"]): result
+        for result in report["results"]
+    }
+
+
+def change(baseline: float, candidate: float) -> float:
+    if not baseline:
+        return 0.0
+    return (candidate - baseline) / baseline
+
+
+def compare(baseline, candidate, threshold: float, metric: str = "p95"):
+    """Yields one row per scenario/concurrency present in both runs"""
+    for key in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[key], candidate[key]
+        latency = change(before["latency_ms"][metric], after["latency_ms"][metric])
+        throughput = change(before["throughput_rps"], after["throughput_rps"])
+        regressed = latency > threshold or throughput < -threshold
+        yield key, before, after, latency, throughput, regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark runs")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="Allowed relative change"
+    )
+    parser.add_argument("--metric", choices=["p50", "p95", "p99"], default="p95")
+    args = parser.parse_args(argv)
+
+    rows = list(
+        compare(load(args.baseline), load(args.candidate), args.threshold, args.metric)
+    )
+    print(
+        f"{'scenario':<14}{'conc':>6}{args.metric + ' before':>14}"
+        f"{args.metric + ' after':>13}{'Δ':>9}{'rps Δ':>9}"
+    )
+    for (scenario, concurrency), before, after, latency, throughput, bad in rows:
+        print(
+            f"{scenario:<14}{concurrency:>6}"
+            f"{before['latency_ms'][args.metric]:>14.2f}"
+            f"{after['latency_ms'][args.metric]:>13.2f}"
+            f"{latency:>+9.1%}{throughput:>+9.1%}" + ("  REGRESSION" if bad else "")
+        )
+
+    if any(row[-1] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Connection handling benchmark: connection per request vs persistent vs pooled.
+
+Replays Django's request lifecycle (request_started/request_finished, which
+open and release connections) around a radius search in worker threads.
+Every mode runs in a fresh process configured through the DB_* variables:
+
+    python -m benchmarks.connections --threads 1,8,32 --requests 2000
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from benchmarks.load import percentile
+from places.seeding import random_city_point
+
+MODES = {
+    "per-request": {"DB_POOL_ENABLED": "False", "DB_CONN_MAX_AGE": "0"},
+    "persistent": {"DB_POOL_ENABLED": "False", "DB_CONN_MAX_AGE": "600"},
+    "pooled": {"DB_POOL_ENABLED": "True"},
+}
+
+
+def run_worker(threads: int, requests: int, seed: int) -> dict:
+    """Runs inside the benchmarked process"""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "GeolocationAPI.settings")
+    import django
+
+    django.setup()
+
+    from django.contrib.gis.geos import Point
+    from django.contrib.gis.measure import D
+    from django.core import signals
+
+    from places.models import Place, PlaceStatus
+
+    lock = threading.Lock()
+    latencies = []
+
+    def handle_request(rng):
+        lon, lat, _, _ = random_city_point(rng)
+        signals.request_started.send(sender=None)
+        try:
+            list(
+                Place.objects.filter(
+                    status=PlaceStatus.PUBLISHED,
+                    location__distance_lte=(Point(lon, lat, srid=4326), D(km=5)),
+                ).values_list("pk", flat=True)[:20]
+            )
+        finally:
+            signals.request_finished.send(sender=None)
+
+    def worker(worker_id):
+        rng = random.Random(seed * 1000 + worker_id)
+        local = []
+        for _ in range(requests // threads):
+            start = perf_counter()
+            handle_request(rng)
+            local.append(perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    start = perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(worker, range(threads)))
+    elapsed = perf_counter() - start
+
+    latencies.sort()
+    return {
+        "threads": threads,
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency_ms": {
+            name: round(percentile(latencies, pct) * 1000, 3)
+            for name, pct in (("p50", 50), ("p95", 95), ("p99", 99))
+        },
+    }
+
+
+def run_mode(mode: str, threads: int, args) -> dict:
+    env = os.environ | MODES[mode]
+    if mode == "pooled":
+        # Threads beyond the pool size would measure queueing, not connecting
+        env.setdefault("DB_POOL_MAX_SIZE", str(threads))
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.connections",
+            "--worker",
+            "--threads",
+            str(threads),
+            "--requests",
+            str(args.requests),
+            "--seed",
+            str(args.seed),
+        ],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return {"mode": mode} | json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--threads", default="1,8,32")
+    parser.add_argument("--requests", type=int, default=2000, help="Per level")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Path of the JSON results file")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        threads = int(args.threads)
+        print(json.dumps(run_worker(threads, args.requests, args.seed)))
+        return None
+
+    results = []
+    print(f"{'mode':<14}{'threads':>8}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for mode in args.modes.split(","):
+        for threads in (int(value) for value in args.threads.split(",")):
+            result = run_mode(mode, threads, args)
+            results.append(result)
+            latency = result["latency_ms"]
+            print(
+                f"{mode:<14}{threads:>8}{result['throughput_rps']:>10.1f}"
+                f"{latency['p50']:>10.2f}{latency['p95']:>10.2f}{latency['p99']:>10.2f}"
+            )
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Password check throughput: inline hashing vs the hashing process pool.
+
+Every level runs in a fresh process with PASSWORD_HASH_WORKERS set to the
+level and twice as many request threads, verifying a password the way a
+login does. Logins per second per core is the rate divided by the worker
+count (1 for inline):
+
+    python -m benchmarks.hashing --workers 0,1,2,4 --logins 200
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from benchmarks.load import percentile
+
+
+def run_worker(workers: int, logins: int) -> dict:
+    """Runs inside the benchmarked process"""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "GeolocationAPI.settings")
+    import django
+
+    django.setup()
+
+    from accounts import hashing
+
+    encoded = hashing.make_password("VerySecret12345")
+    # Starts the pool processes outside the measurement
+    hashing.check_password("VerySecret12345", encoded)
+
+    def login(index):
+        start = perf_counter()
+        valid, _ = hashing.check_password("VerySecret12345", encoded)
+        assert valid, index
+        return perf_counter() - start
+
+    start = perf_counter()
+    with ThreadPoolExecutor(max_workers=max(workers, 1) * 2) as executor:
+        latencies = sorted(executor.map(login, range(logins)))
+    elapsed = perf_counter() - start
+    hashing.shutdown()
+
+    rate = logins / elapsed
+    return {
+        "workers": workers,
+        "logins": logins,
+        "logins_per_second": round(rate, 2),
+        "per_core": round(rate / max(workers, 1), 2),
+        "latency_ms": {
+            name: round(percentile(latencies, pct) * 1000, 3)
+            for name, pct in (("p50", 50), ("p95", 95), ("p99", 99))
+        },
+    }
+
+
+def run_level(workers: int, args) -> dict:
+    env = os.environ | {"PASSWORD_HASH_WORKERS": str(workers)}
+    if args.iterations:
+        env["PASSWORD_PBKDF2_ITERATIONS"] = str(args.iterations)
+    if args.hasher:
+        env["PASSWORD_HASHER"] = args.hasher
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.hashing",
+            "--worker",
+            "--workers",
+            str(workers),
+            "--logins",
+            str(args.logins),
+        ],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", default="0,1,2,4")
+    parser.add_argument("--logins", type=int, default=200, help="Per level")
+    parser.add_argument("--iterations", type=int, help="PBKDF2 iterations")
+    parser.add_argument("--hasher", choices=["pbkdf2", "argon2"])
+    parser.add_argument("--output", help="Path of the JSON results file")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_worker(int(args.workers), args.logins)))
+        return None
+
+    results = []
+    print(f"{'workers':>8}{'logins/s':>10}{'per core':>10}{'p50':>10}{'p99':>10}")
+    for workers in (int(value) for value in args.workers.split(",")):
+        result = run_level(workers, args)
+        results.append(result)
+        latency = result["latency_ms"]
+        print(
+            f"{workers:>8}{result['logins_per_second']:>10.1f}"
+            f"{result['per_core']:>10.1f}{latency['p50']:>10.2f}{latency['p99']:>10.2f}"
+        )
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
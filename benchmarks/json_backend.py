@@ -0,0 +1,126 @@
+"""
+Render and parse time of place pages with DRF's JSONRenderer and orjson.
+
+Pages are synthetic FeatureCollections shaped like PlaceSerializer output,
+so no database is needed:
+
+    python -m benchmarks.json_backend --page-sizes 20,100,1000
+
+Requests per second of the running API are compared by starting the server
+once with JSON_BACKEND=json and once with the default, and running
+benchmarks.load and benchmarks.compare on the list and search scenarios.
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+from datetime import UTC, datetime, timedelta
+from functools import partial
+from time import perf_counter
+
+from benchmarks.load import percentile
+
+
+def make_page(size: int, rng: random.Random) -> dict:
+    """Paginated FeatureCollection as the list and search views return it"""
+    now = datetime.now(UTC)
+    features = []
+    for index in range(size):
+        created_at = now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+        features.append(
+            {
+                "id": index + 1,
+                "type": "Feature",
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [rng.uniform(14, 24), rng.uniform(49, 55)],
+                },
+                "properties": {
+                    "name": f"Place #{index}",
+                    "description": "Lorem ipsum dolor sit amet " * rng.randint(0, 8),
+                    "photo": None,
+                    "address": "ul. Floriańska 1",
+                    "city": "Kraków",
+                    "country": "Poland",
+                    "status": "published",
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                    "created_by": {"id": 1, "first_name": "Jan", "last_name": "K"},
+                    "distance": round(rng.uniform(0, 5000), 2),
+                },
+            }
+        )
+    return {
+        "count": size,
+        "next": None,
+        "previous": None,
+        "results": {"type": "FeatureCollection", "features": features},
+    }
+
+
+def parse_bytes(parser, body: bytes):
+    return parser.parse(io.BytesIO(body))
+
+
+def measure(function, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        function()
+        timings.append(perf_counter() - start)
+    timings.sort()
+    return {
+        "per_second": round(repeat / sum(timings), 1),
+        "p50_ms": round(percentile(timings, 50) * 1000, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--page-sizes", default="20,100,1000")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--output", help="Path of the JSON results file")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "GeolocationAPI.settings")
+    import django
+
+    django.setup()
+
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from GeolocationAPI.parsers import ORJSONParser
+    from GeolocationAPI.renderers import ORJSONRenderer
+
+    backends = {
+        "json": (JSONRenderer(), JSONParser()),
+        "orjson": (ORJSONRenderer(), ORJSONParser()),
+    }
+    results = []
+    print(f"{'page':>6}{'backend':>9}{'renders/s':>11}{'p50 ms':>9}{'parses/s':>10}")
+    for size in (int(value) for value in args.page_sizes.split(",")):
+        page = make_page(size, random.Random(size))
+        body = JSONRenderer().render(page)
+        for name, (renderer, body_parser) in backends.items():
+            render = measure(partial(renderer.render, page), args.repeat)
+            parse = measure(partial(parse_bytes, body_parser, body), args.repeat)
+            results.append(
+                {"page_size": size, "backend": name, "render": render, "parse": parse}
+            )
+            print(
+                f"{size:>6}{name:>9}{render['per_second']:>11.1f}"
+                f"{render['p50_ms']:>9.3f}{parse['per_second']:>10.1f}"
+            )
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
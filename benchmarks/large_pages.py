@@ -0,0 +1,165 @@
+"""
+Time to first byte, total time and peak RSS of large place list pages.
+
+Every variant runs in a fresh process that requests one page as an admin
+through the Django test client, so the peak RSS is that of the request:
+
+    python manage.py seed_places 100000 --truncate
+    python -m benchmarks.large_pages --email admin@example.com \\
+        --page-sizes 1000,10000 --encodings identity,gzip,br,zstd
+
+`--servers wsgi,asgi` measures both handlers. The ASGI variant reads the
+body the way an ASGI server does (`async for` over the response), which
+buffers sync iterators, so it shows whether streaming survives there.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import resource
+import subprocess
+import sys
+from time import perf_counter
+
+
+def run_worker(args) -> dict:
+    """Runs inside the benchmarked process"""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "GeolocationAPI.settings")
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+    from django.test import AsyncClient, Client
+
+    from accounts.models import CustomUser
+    from accounts.serializers import ClaimsTokenObtainPairSerializer
+
+    settings.ALLOWED_HOSTS = ["testserver"]
+    settings.THROTTLE_ENABLED = False
+    if not args.streaming:
+        settings.STREAMING_MIN_PAGE_SIZE = sys.maxsize
+
+    user = CustomUser.objects.get(email__lower=args.email.lower())
+    token = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+    headers = {"Authorization": f"Bearer {token}"}
+    if args.encodings != "identity":
+        headers["Accept-Encoding"] = args.encodings
+
+    query = {"page_size": args.page_sizes}
+
+    def get_wsgi():
+        response = Client().get("/api/v1/places/", query, headers=headers)
+        if not response.streaming:
+            return response, perf_counter(), len(response.content)
+        chunks = iter(response.streaming_content)
+        first = next(chunks, b"")
+        ttfb = perf_counter()
+        return response, ttfb, len(first) + sum(len(chunk) for chunk in chunks)
+
+    async def get_asgi():
+        response = await AsyncClient().get("/api/v1/places/", query, headers=headers)
+        if not response.streaming:
+            return response, perf_counter(), len(response.content)
+        ttfb, size = None, 0
+        # What ASGIHandler.send_response does
+        async for chunk in response:
+            ttfb = ttfb or perf_counter()
+            size += len(chunk)
+        return response, ttfb or perf_counter(), size
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = perf_counter()
+    if args.servers == "asgi":
+        response, first_byte, size = asyncio.run(get_asgi())
+    else:
+        response, first_byte, size = get_wsgi()
+    ttfb = first_byte - start
+    total = perf_counter() - start
+    assert response.status_code == 200, response.status_code
+    # ru_maxrss is in kilobytes on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return {
+        "server": args.servers,
+        "page_size": int(args.page_sizes),
+        "encoding": response.get("Content-Encoding", "identity"),
+        "streaming": response.streaming,
+        "bytes": size,
+        "ttfb_ms": round(ttfb * 1000, 2),
+        "total_ms": round(total * 1000, 2),
+        "peak_rss_mb": round(peak / 1024, 1),
+        "request_rss_mb": round((peak - baseline) / 1024, 1),
+    }
+
+
+def run_variant(
+    server: str, page_size: int, encoding: str, streaming: bool, args
+) -> dict:
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.large_pages",
+        "--worker",
+        "--email",
+        args.email,
+        "--page-sizes",
+        str(page_size),
+        "--encodings",
+        encoding,
+        "--servers",
+        server,
+    ]
+    if streaming:
+        command.append("--streaming")
+    output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--email", required=True, help="Admin user to request as")
+    parser.add_argument("--page-sizes", default="1000,10000")
+    parser.add_argument("--encodings", default="identity,gzip,br,zstd")
+    parser.add_argument("--servers", default="wsgi,asgi")
+    parser.add_argument("--output", help="Path of the JSON results file")
+    parser.add_argument("--streaming", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_worker(args)))
+        return None
+
+    results = []
+    print(
+        f"{'server':>7}{'page':>7}{'encoding':>10}{'stream':>8}{'bytes':>12}"
+        f"{'ttfb ms':>10}{'total ms':>10}{'rss MB':>9}"
+    )
+    variants = itertools.product(
+        args.servers.split(","),
+        [int(value) for value in args.page_sizes.split(",")],
+        args.encodings.split(","),
+        (False, True),
+    )
+    for server, page_size, encoding, streaming in variants:
+        result = run_variant(server, page_size, encoding, streaming, args)
+        results.append(result)
+        print(
+            f"{server:>7}{page_size:>7}{result['encoding']:>10}"
+            f"{'yes' if result['streaming'] else 'no':>8}"
+            f"{result['bytes']:>12,}{result['ttfb_ms']:>10.1f}"
+            f"{result['total_ms']:>10.1f}{result['request_rss_mb']:>9.1f}"
+        )
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
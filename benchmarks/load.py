@@ -0,0 +1,374 @@
+"""
+Load and latency benchmark for the Geolocation API.
+
+Runs every scenario at every concurrency level against a running server and
+writes machine-readable results that can be compared with `benchmarks.compare`:
+
+    python manage.py seed_places 100000 --distribution cities --truncate
+    python -m benchmarks.load --base-url http://localhost:8000 \\
+        --scenarios radius,bbox,list,detail --concurrency 1,8,32 \\
+        --duration 20 --label my-branch --output benchmarks/results/my-branch.json
+"""
+
+import argparse
+import http.client
+import io
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from time import perf_counter
+from urllib.parse import urlencode, urlsplit
+
+from places.seeding import DISTRIBUTIONS, random_city_point, random_uniform_point
+
+API = "/api/v1/places"
+AUTH_SCENARIOS = {"create", "upload"}
+
+
+@dataclass
+class Context:
+    """Data shared by all workers of a run"""
+
+    distribution: str
+    token: str | None = None
+    place_ids: list[int] = field(default_factory=list)
+    own_place_id: int | None = None
+    photo: bytes = b""
+    list_pages: int = 5
+
+    def point(self, rng: random.Random) -> tuple[float, float]:
+        if self.distribution == "cities":
+            lon, lat, _, _ = random_city_point(rng)
+        else:
+            lon, lat, _, _ = random_uniform_point(rng)
+        return round(lon, 5), round(lat, 5)
+
+    @property
+    def auth_headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"} if self.token else {}
+
+
+class Client:
+    """Keep-alive HTTP connection owned by a single worker thread"""
+
+    def __init__(self, base_url: str):
+        url = urlsplit(base_url)
+        self.prefix = url.path.rstrip("/")
+        connection_class = (
+            http.client.HTTPSConnection
+            if url.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self._connect = lambda: connection_class(url.hostname, url.port, timeout=60)
+        self.connection = self._connect()
+
+    def request(self, method, path, body=None, headers=None):
+        """Returns (status, time to first byte, total time, body size)"""
+        start = perf_counter()
+        try:
+            self.connection.request(
+                method, self.prefix + path, body=body, headers=headers or {}
+            )
+            response = self.connection.getresponse()
+            ttfb = perf_counter() - start
+            size = len(response.read())
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = self._connect()
+            return 0, 0.0, perf_counter() - start, 0
+        return response.status, ttfb, perf_counter() - start, size
+
+
+# Scenarios return (method, path, body, headers)
+
+
+def radius_request(context, rng):
+    lon, lat = context.point(rng)
+    query = urlencode({"lat": lat, "lon": lon, "radius": rng.choice([1, 5, 10])})
+    return "GET", f"{API}/search/radius/?{query}", None, {}
+
+
+def bbox_request(context, rng):
+    lon, lat = context.point(rng)
+    half = rng.choice([0.02, 0.1, 0.5])
+    bbox = (
+        max(lon - half, -180),
+        max(lat - half, -90),
+        min(lon + half, 180),
+        min(lat + half, 90),
+    )
+    query = urlencode({"in_bbox": ",".join(f"{value:.5f}" for value in bbox)})
+    return "GET", f"{API}/search/bbox/?{query}", None, {}
+
+
+def list_request(context, rng):
+    return "GET", f"{API}/?page={rng.randint(1, context.list_pages)}", None, {}
+
+
+def detail_request(context, rng):
+    return "GET", f"{API}/{rng.choice(context.place_ids)}/", None, {}
+
+
+def create_request(context, rng):
+    lon, lat = context.point(rng)
+    body = json.dumps(
+        {
+            "name": f"Benchmark place {uuid.uuid4().hex[:8]}",
+            "description": "Created by the load benchmark",
+            "location": {"type": "Point", "coordinates": [lon, lat]},
+        }
+    )
+    headers = {"Content-Type": "application/json", **context.auth_headers}
+    return "POST", f"{API}/", body, headers
+
+
+def upload_request(context, rng):
+    boundary = uuid.uuid4().hex
+    body = (
+        (
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="photo"; filename="photo.jpg"\r\n'
+            "Content-Type: image/jpeg\r\n\r\n"
+        ).encode()
+        + context.photo
+        + f"\r\n--{boundary}--\r\n".encode()
+    )
+    headers = {
+        "Content-Type": f"multipart/form-data; boundary={boundary}",
+        **context.auth_headers,
+    }
+    return "POST", f"{API}/{context.own_place_id}/upload-photo/", body, headers
+
+
+def async_variant(build):
+    """Same request against the async (ASGI) endpoints"""
+
+    def build_async(context, rng):
+        method, path, body, headers = build(context, rng)
+        return method, path.replace(API, f"{API}/async", 1), body, headers
+
+    return build_async
+
+
+SCENARIOS = {
+    "radius": radius_request,
+    "bbox": bbox_request,
+    "list": list_request,
+    "detail": detail_request,
+    "create": create_request,
+    "upload": upload_request,
+    "async-radius": async_variant(radius_request),
+    "async-bbox": async_variant(bbox_request),
+    "async-detail": async_variant(detail_request),
+}
+
+
+def make_photo() -> bytes:
+    from PIL import Image
+
+    output = io.BytesIO()
+    Image.new("RGB", (800, 600), (64, 128, 192)).save(output, format="JPEG")
+    return output.getvalue()
+
+
+def prepare(args, scenarios) -> Context:
+    """Logs in and collects the ids used by detail and upload scenarios"""
+    context = Context(distribution=args.distribution)
+    client = Client(args.base_url)
+
+    if AUTH_SCENARIOS & set(scenarios):
+        if not (args.email and args.password):
+            sys.exit("--email and --password are required for create/upload")
+        body = json.dumps({"email": args.email, "password": args.password})
+        client.connection.request(
+            "POST",
+            client.prefix + "/api/token/",
+            body=body,
+            headers={"Content-Type": "application/json"},
+        )
+        response = client.connection.getresponse()
+        if response.status != 200:
+            sys.exit(f"Login failed: {response.status} {response.read()[:200]}")
+        context.token = json.loads(response.read())["access"]
+
+    if {"detail", "async-detail"} & set(scenarios):
+        for page in range(1, context.list_pages + 1):
+            client.connection.request("GET", f"{client.prefix}{API}/?page={page}")
+            response = client.connection.getresponse()
+            if response.status != 200:
+                response.read()
+                break
+            features = json.loads(response.read())["results"]["features"]
+            context.place_ids.extend(feature["id"] for feature in features)
+        if not context.place_ids:
+            sys.exit("No published places found, run `manage.py seed_places` first")
+
+    if "upload" in scenarios:
+        context.photo = make_photo()
+        method, path, body, headers = create_request(context, random.Random(0))
+        client.connection.request(method, client.prefix + path, body, headers)
+        response = client.connection.getresponse()
+        context.own_place_id = json.loads(response.read())["id"]
+
+    client.connection.close()
+    return context
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(values))
+    return values[max(0, min(len(values), rank) - 1)]
+
+
+def run_level(args, context, scenario, concurrency) -> dict:
+    """Runs one scenario at one concurrency level"""
+    build = SCENARIOS[scenario]
+    warmup_until = perf_counter() + args.warmup
+    deadline = warmup_until + args.duration
+    lock = threading.Lock()
+    latencies, ttfbs, sizes = [], [], []
+    errors = 0
+
+    def worker(worker_id):
+        nonlocal errors
+        rng = random.Random(args.seed * 1000 + worker_id)
+        client = Client(args.base_url)
+        local_latencies, local_ttfbs, local_sizes, local_errors = [], [], [], 0
+        while (now := perf_counter()) < deadline:
+            method, path, body, headers = build(context, rng)
+            status, ttfb, elapsed, size = client.request(method, path, body, headers)
+            if now < warmup_until:
+                continue
+            if status >= 400 or status == 0:
+                local_errors += 1
+            local_latencies.append(elapsed)
+            local_ttfbs.append(ttfb)
+            local_sizes.append(size)
+        client.connection.close()
+        with lock:
+            latencies.extend(local_latencies)
+            ttfbs.extend(local_ttfbs)
+            sizes.extend(local_sizes)
+            errors += local_errors
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(concurrency)))
+
+    latencies.sort()
+    ttfbs.sort()
+    count = len(latencies)
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": count,
+        "errors": errors,
+        "duration_s": args.duration,
+        "throughput_rps": round(count / args.duration, 2),
+        "latency_ms": {
+            name: round(percentile(latencies, pct) * 1000, 3)
+            for name, pct in (("p50", 50), ("p95", 95), ("p99", 99))
+        }
+        | {
+            "mean": round(sum(latencies) / count * 1000, 3) if count else 0.0,
+            "max": round(latencies[-1] * 1000, 3) if count else 0.0,
+        },
+        "ttfb_ms": {
+            name: round(percentile(ttfbs, pct) * 1000, 3)
+            for name, pct in (("p50", 50), ("p95", 95), ("p99", 99))
+        },
+        "mean_response_bytes": round(sum(sizes) / count) if count else 0,
+        # Little's law: average number of requests the server had in flight
+        "in_flight": round(sum(latencies) / args.duration, 2),
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument(
+        "--scenarios",
+        default="radius,bbox,list,detail",
+        help=f"Comma separated, any of: {', '.join(SCENARIOS)}",
+    )
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds/level")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Seconds/level")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="cities")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--email", default=os.getenv("BENCHMARK_EMAIL"))
+    parser.add_argument("--password", default=os.getenv("BENCHMARK_PASSWORD"))
+    parser.add_argument("--label", default="local")
+    parser.add_argument("--output", help="Path of the JSON results file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        sys.exit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    levels = [int(value) for value in args.concurrency.split(",")]
+
+    context = prepare(args, scenarios)
+    results = []
+    print(
+        f"{'scenario':<14}{'conc':>6}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}"
+        f"{'in-flight':>11}"
+    )
+    for scenario in scenarios:
+        for concurrency in levels:
+            result = run_level(args, context, scenario, concurrency)
+            results.append(result)
+            latency = result["latency_ms"]
+            print(
+                f"{scenario:<14}{concurrency:>6}{result['throughput_rps']:>10.1f}"
+                f"{latency['p50']:>10.2f}{latency['p95']:>10.2f}{latency['p99']:>10.2f}"
+                f"{result['in_flight']:>11.2f}"
+                + (f"  errors={result['errors']}" if result["errors"] else "")
+            )
+
+    report = {
+        "meta": {
+            "label": args.label,
+            "revision": git_revision(),
+            "created_at": datetime.now(UTC).isoformat(),
+            "base_url": args.base_url,
+            "distribution": args.distribution,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Results written to {args.output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
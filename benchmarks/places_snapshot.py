@@ -0,0 +1,102 @@
+"""
+Worker boot with the published places loaded from the database versus
+mapped from the snapshot file, each in a fresh process:
+
+    python manage.py seed_places 1000000 --truncate
+    python manage.py build_places_snapshot
+    python -m benchmarks.places_snapshot --runs 3
+
+Reported per variant: time until the places are usable, the queries run
+and the RSS growth of the process.
+"""
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+from time import perf_counter
+
+
+def run_worker(source: str) -> dict:
+    """Runs inside the measured process"""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "GeolocationAPI.settings")
+    import django
+
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from places.models import Place, PlaceStatus
+    from places.snapshot import PlacesIndex, coordinates
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = perf_counter()
+    with CaptureQueriesContext(connection) as queries:
+        if source == "database":
+            places = list(
+                Place.objects.filter(status=PlaceStatus.PUBLISHED)
+                .annotate(**coordinates())
+                .values_list("pk", "lon", "lat", "name")
+            )
+            count = len(places)
+        else:
+            index = PlacesIndex()
+            index.refresh()
+            count = len(index.snapshot) + len(index.changes)
+    elapsed = perf_counter() - start
+    # ru_maxrss is in kilobytes on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return {
+        "source": source,
+        "places": count,
+        "load_ms": round(elapsed * 1000, 1),
+        "queries": len(queries),
+        "rss_growth_mb": round((peak - baseline) / 1024, 1),
+    }
+
+
+def run_once(source: str) -> dict:
+    command = [sys.executable, "-m", "benchmarks.places_snapshot", "--worker"]
+    command += ["--source", source]
+    output = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3, help="Processes per variant")
+    parser.add_argument("--output", help="Path of the JSON results file")
+    parser.add_argument("--source", help=argparse.SUPPRESS)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_worker(args.source)))
+        return None
+
+    results = []
+    print(f"{'source':>10}{'places':>10}{'load ms':>10}{'queries':>9}{'rss MB':>9}")
+    for source in ("database", "snapshot"):
+        runs = [run_once(source) for _ in range(args.runs)]
+        results.extend(runs)
+        print(
+            f"{source:>10}{runs[0]['places']:>10,}"
+            f"{statistics.median(run['load_ms'] for run in runs):>10.1f}"
+            f"{runs[0]['queries']:>9}"
+            f"{statistics.median(run['rss_growth_mb'] for run in runs):>9.1f}"
+        )
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
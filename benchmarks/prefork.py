@@ -0,0 +1,127 @@
+"""
+Memory per gunicorn worker with and without the prefork bootstrap.
+
+Each variant starts gunicorn with gunicorn.conf.py, warms every worker up
+with a number of requests and reads RSS, PSS, shared and private bytes of
+the workers from /proc (Linux only):
+
+    python -m benchmarks.prefork --workers 4 --requests 200
+
+With the bootstrap the application is loaded and frozen in the master, so
+the workers' private memory (what one more worker costs) is lower.
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from monitoring.memory import memory_usage
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def worker_pids(master: int) -> list[int]:
+    with open(f"/proc/{master}/task/{master}/children") as file:
+        return [int(pid) for pid in file.read().split()]
+
+
+def fetch(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+
+
+def wait_until_ready(url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            fetch(url)
+            return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    raise TimeoutError(f"gunicorn did not answer {url} in {timeout:.0f} s")
+
+
+def run_variant(bootstrap: bool, args) -> dict:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}{args.path}"
+    env = os.environ | {
+        "PREFORK_BOOTSTRAP": str(bootstrap),
+        "GUNICORN_BIND": f"127.0.0.1:{port}",
+        "GUNICORN_WORKERS": str(args.workers),
+        "THROTTLE_ENABLED": "False",
+    }
+    command = ["gunicorn", args.app, "-c", "gunicorn.conf.py"]
+    if args.app.endswith("asgi"):
+        command += ["-k", "uvicorn.workers.UvicornWorker"]
+    server = subprocess.Popen(command, env=env, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(url, args.timeout)
+        with ThreadPoolExecutor(args.workers * 2) as executor:
+            statuses = list(executor.map(fetch, [url] * args.requests))
+        workers = [memory_usage(pid) for pid in worker_pids(server.pid)]
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+    totals = {kind: sum(worker[kind] for worker in workers) for kind in workers[0]}
+    return {
+        "bootstrap": bootstrap,
+        "statuses": sorted(set(statuses)),
+        "workers": workers,
+        "totals": totals,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--app", default="GeolocationAPI.wsgi")
+    parser.add_argument("--path", default="/api/v1/places/?page_size=20")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--output", help="Path of the JSON results file")
+    args = parser.parse_args(argv)
+
+    if not memory_usage():
+        print("Reading worker memory needs /proc/<pid>/smaps_rollup (Linux)")
+        sys.exit(1)
+
+    results = []
+    mb = 1024 * 1024
+    print(f"{'bootstrap':>10}{'rss MB':>10}{'pss MB':>10}{'private MB':>12}")
+    for bootstrap in (False, True):
+        result = run_variant(bootstrap, args)
+        results.append(result)
+        totals, count = result["totals"], len(result["workers"])
+        print(
+            f"{'yes' if bootstrap else 'no':>10}{totals['rss'] / count / mb:>10.1f}"
+            f"{totals['pss'] / count / mb:>10.1f}"
+            f"{totals['private'] / count / mb:>12.1f}"
+        )
+    print("(averages per worker)")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Cold start of a worker: importing the WSGI application, the warm-up and
+the first request, each run in a fresh process.
+
+    python -m benchmarks.startup --runs 5 --budget-ms 1500 --top 15
+
+With --budget-ms the exit status is 1 when the median cold start (import,
+warm-up and first request) is over budget. --top lists the slowest imports
+by cumulative time from `python -X importtime`.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from time import perf_counter
+
+
+def run_worker(path: str, warmup: bool) -> dict:
+    """Runs inside the measured process"""
+    start = perf_counter()
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "GeolocationAPI.settings")
+    os.environ["WARMUP_ENABLED"] = "False"
+    import GeolocationAPI.wsgi  # noqa: F401
+
+    imported = perf_counter()
+    timings = {}
+    if warmup:
+        from GeolocationAPI.warmup import warm_up
+
+        timings = warm_up()
+    warmed = perf_counter()
+
+    from django.conf import settings
+    from django.test import Client
+
+    settings.ALLOWED_HOSTS = ["testserver"]
+    status = Client().get(path).status_code
+    done = perf_counter()
+
+    return {
+        "warmup": warmup,
+        "status": status,
+        "import_ms": round((imported - start) * 1000, 1),
+        "warmup_ms": round((warmed - imported) * 1000, 1),
+        "warmup_steps_ms": timings,
+        "first_request_ms": round((done - warmed) * 1000, 1),
+        "total_ms": round((done - start) * 1000, 1),
+    }
+
+
+def run_once(args, warmup: bool) -> dict:
+    command = [sys.executable, "-m", "benchmarks.startup", "--worker"]
+    command += ["--path", args.path] + (["--warmup"] if warmup else [])
+    output = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int) -> list[tuple[str, float]]:
+    """Modules with the largest cumulative import time, in milliseconds"""
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "import GeolocationAPI.wsgi",
+        ],
+        env=os.environ | {"WARMUP_ENABLED": "False"},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    modules = []
+    for line in output.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        modules.append((name.strip(), int(cumulative) / 1000))
+    return sorted(modules, key=lambda module: module[1], reverse=True)[:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="Processes per variant")
+    parser.add_argument("--path", default="/api/v1/places/?page_size=1")
+    parser.add_argument("--budget-ms", type=float, help="Median cold start budget")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports shown")
+    parser.add_argument("--output", help="Path of the JSON results file")
+    parser.add_argument("--warmup", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_worker(args.path, args.warmup)))
+        return None
+
+    results = {"runs": [], "imports": []}
+    print(f"{'warmup':>7}{'import':>9}{'warmup':>9}{'first req':>11}{'total':>9}")
+    medians = {}
+    for warmup in (False, True):
+        runs = [run_once(args, warmup) for _ in range(args.runs)]
+        results["runs"].extend(runs)
+        median = {
+            key: statistics.median(run[key] for run in runs)
+            for key in ("import_ms", "warmup_ms", "first_request_ms", "total_ms")
+        }
+        medians[warmup] = median
+        print(
+            f"{'yes' if warmup else 'no':>7}{median['import_ms']:>9.1f}"
+            f"{median['warmup_ms']:>9.1f}{median['first_request_ms']:>11.1f}"
+            f"{median['total_ms']:>9.1f}"
+        )
+
+    if args.top:
+        print("\nSlowest imports (cumulative ms):")
+        for name, ms in slowest_imports(args.top):
+            results["imports"].append({"module": name, "cumulative_ms": ms})
+            print(f"{ms:>10.1f}  {name}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    # Workers are started with the warm-up, it is part of the budget
+    if args.budget_ms is not None and medians[True]["total_ms"] > args.budget_ms:
+        print(
+            f"\nCold start {medians[True]['total_ms']:.1f} ms"
+            f" is over the {args.budget_ms:.0f} ms budget"
+        )
+        sys.exit(1)
+    return results
+
+
+if __name__ == "__main__":
+    main()
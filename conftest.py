@@ -1,10 +1,11 @@
 import factory.django
 import pytest
 from django.contrib.gis.geos import Point
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
 from accounts.models import CustomUser, UserRole
-from places.models import Place
+from places.models import Place, PlaceStatus
 
 
 class UserFactory(factory.django.DjangoModelFactory):
@@ -32,6 +33,12 @@ class PlaceFactory(factory.django.DjangoModelFactory):
     created_by = factory.SubFactory(UserFactory)
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Throttle counters and other cached state must not leak between tests"""
+    cache.clear()
+
+
 @pytest.fixture
 def user_factory():
     return UserFactory
@@ -42,6 +49,26 @@ def place_factory():
     return PlaceFactory
 
 
+@pytest.fixture
+def places(place_factory):
+    """Seven published places 0.001 degree apart along a parallel in Kraków"""
+    return [
+        place_factory(
+            status=PlaceStatus.PUBLISHED,
+            description="Long text " * 50,
+            city="Kraków",
+            location=Point(19.94 + 0.001 * index, 50.06, srid=4326),
+        )
+        for index in range(7)
+    ]
+
+
+@pytest.fixture
+def api_client():
+    """Returns an unauthenticated API client"""
+    return APIClient()
+
+
 @pytest.fixture
 def authenticated_client(user_factory):
     """Creates and returns a fully isolated client authenticated as a regular user"""
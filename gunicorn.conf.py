@@ -0,0 +1,35 @@
+"""
+gunicorn settings. The application is loaded once in the master, which
+builds the shared read-only data before the workers are forked (see
+GeolocationAPI.prefork):
+
+    gunicorn GeolocationAPI.wsgi -c gunicorn.conf.py
+    gunicorn GeolocationAPI.asgi -c gunicorn.conf.py \\
+        -k uvicorn.workers.UvicornWorker
+
+PREFORK_BOOTSTRAP=False loads the application in every worker instead.
+"""
+
+import multiprocessing
+import os
+
+os.environ.setdefault("PREFORK_BOOTSTRAP", "True")
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+preload_app = os.environ["PREFORK_BOOTSTRAP"].lower() in ("1", "true", "yes")
+
+# Every worker has its own password hashing pool (accounts.hashing). They
+# share the CPUs, but each gets at least one process: with the default
+# worker count a share below one would turn the offloading off. Pool
+# processes start on the first hash, idle workers do not pay for theirs
+os.environ.setdefault(
+    "PASSWORD_HASH_WORKERS", str(max(multiprocessing.cpu_count() // workers, 1))
+)
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        from GeolocationAPI.prefork import after_fork
+
+        after_fork()
@@ -0,0 +1,31 @@
+import json
+
+from django.contrib import admin
+from django.utils.html import format_html
+
+from monitoring.models import SlowQuery
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ("captured_at", "duration_ms", "endpoint", "path", "has_plan")
+    list_filter = ("endpoint", "database", "captured_at")
+    search_fields = ("path", "sql")
+    readonly_fields = ("formatted_plan",)
+    exclude = ("plan",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(boolean=True, description="Plan")
+    def has_plan(self, obj):
+        return obj.plan is not None
+
+    @admin.display(description="Plan")
+    def formatted_plan(self, obj):
+        if obj.plan is None:
+            return "-"
+        return format_html("<pre>{}</pre>", json.dumps(obj.plan, indent=2))
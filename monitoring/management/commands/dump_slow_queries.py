@@ -0,0 +1,71 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from monitoring.models import SlowQuery
+
+
+class Command(BaseCommand):
+    help = "Dumps recorded slow queries together with their EXPLAIN ANALYZE plans"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument("--endpoint", help="e.g. PlaceBboxSearchViewSet.list")
+        parser.add_argument(
+            "--with-plan", action="store_true", help="Only queries with a plan"
+        )
+        parser.add_argument("--format", choices=["text", "json"], default="text")
+
+    def handle(self, *args, **options):
+        queryset = SlowQuery.objects.all()
+        if options["endpoint"]:
+            queryset = queryset.filter(endpoint=options["endpoint"])
+        if options["with_plan"]:
+            queryset = queryset.filter(plan__isnull=False)
+        entries = list(queryset[: options["limit"]])
+
+        if options["format"] == "json":
+            data = [
+                {
+                    "captured_at": entry.captured_at.isoformat(),
+                    "duration_ms": entry.duration_ms,
+                    "database": entry.database,
+                    "endpoint": entry.endpoint,
+                    "path": entry.path,
+                    "filter_params": entry.filter_params,
+                    "sql": entry.sql,
+                    "params": entry.params,
+                    "executed_sql": entry.executed_sql,
+                    "plan": entry.plan,
+                }
+                for entry in entries
+            ]
+            self.stdout.write(json.dumps(data, indent=2))
+            return
+
+        for entry in entries:
+            self.stdout.write(
+                self.style.MIGRATE_HEADING(
+                    f"{entry.captured_at:%Y-%m-%d %H:%M:%S} {entry.duration_ms:.1f} ms"
+                    f" {entry.endpoint or '-'} {entry.path}"
+                )
+            )
+            self.stdout.write(f"  filters: {json.dumps(entry.filter_params)}")
+            self.stdout.write(f"  {entry.executed_sql or entry.sql}")
+            if entry.plan:
+                for line in self._format_plan(entry.plan[0]["Plan"]):
+                    self.stdout.write(f"  {line}")
+            self.stdout.write("")
+
+    def _format_plan(self, node: dict, depth: int = 0):
+        """Renders a JSON plan as an indented tree with actual timings"""
+        relation = node.get("Index Name") or node.get("Relation Name") or ""
+        yield (
+            f"{'  ' * depth}-> {node['Node Type']} {relation}".rstrip()
+            + f" (actual time={node.get('Actual Total Time')} ms"
+            + f" rows={node.get('Actual Rows')}"
+            + f" shared hit={node.get('Shared Hit Blocks')}"
+            + f" read={node.get('Shared Read Blocks')})"
+        )
+        for child in node.get("Plans", []):
+            yield from self._format_plan(child, depth + 1)
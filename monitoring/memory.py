@@ -0,0 +1,52 @@
+"""
+Memory of the worker processes, from /proc/<pid>/smaps_rollup (Linux).
+
+RSS counts pages shared with the master and the other workers in full, so
+PSS (shared pages divided among the processes mapping them) and the
+private bytes are what one more worker actually costs.
+"""
+
+import os
+
+# smaps_rollup field: reported kind
+SMAPS_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared",
+    "Shared_Dirty": "shared",
+    "Private_Clean": "private",
+    "Private_Dirty": "private",
+}
+
+
+def memory_usage(pid: int | str = "self") -> dict[str, int]:
+    """Rss, Pss, shared and private bytes of a process, empty off Linux"""
+    usage = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as file:
+            for line in file:
+                field, _, value = line.partition(":")
+                kind = SMAPS_FIELDS.get(field)
+                if kind is not None:
+                    # Values are in kB
+                    usage[kind] = usage.get(kind, 0) + int(value.split()[0]) * 1024
+    except OSError:
+        return {}
+    return usage
+
+
+def render_memory_metrics(prefix: str = "geolocation_") -> str:
+    """Memory of the answering worker in the Prometheus text format"""
+    usage = memory_usage()
+    if not usage:
+        return ""
+
+    name = f"{prefix}process_memory_bytes"
+    lines = [
+        f"# HELP {name} Memory of the worker process by kind.",
+        f"# TYPE {name} gauge",
+    ]
+    pid = os.getpid()
+    for kind, value in sorted(usage.items()):
+        lines.append(f'{name}{{pid="{pid}",kind="{kind}"}} {value}')
+    return "\n".join(lines) + "\n"
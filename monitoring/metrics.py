@@ -0,0 +1,239 @@
+import os
+import threading
+from bisect import bisect_left
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.db import connections
+
+DURATION_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+ROW_COUNT_BUCKETS = (0, 1, 5, 10, 20, 50, 100, 500, 1000, 5000)
+
+
+class Histogram:
+    """Fixed-bucket histogram with Prometheus semantics"""
+
+    __slots__ = ("bounds", "counts", "total", "count", "_lock")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        # The last slot is the implicit "+Inf" bucket
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += value
+            self.count += 1
+
+    def snapshot(self) -> tuple[list[int], float, int]:
+        """Returns cumulative bucket counts, sum and count"""
+        with self._lock:
+            counts, total, count = list(self.counts), self.total, self.count
+
+        cumulative, running = [], 0
+        for value in counts:
+            running += value
+            cumulative.append(running)
+        return cumulative, total, count
+
+
+class MetricsRegistry:
+    """
+    In-process store of request histograms and counters. Every series is
+    labelled with the pid, each server worker keeps its own.
+    """
+
+    HISTOGRAMS = {
+        "request_duration_seconds": (
+            "Wall time spent handling the request.",
+            DURATION_BUCKETS,
+        ),
+        "request_db_queries": (
+            "Number of database queries executed per request.",
+            QUERY_COUNT_BUCKETS,
+        ),
+        "request_db_duration_seconds": (
+            "Total time spent in database queries per request.",
+            DURATION_BUCKETS,
+        ),
+        "request_serialization_duration_seconds": (
+            "Time spent serializing the response data.",
+            DURATION_BUCKETS,
+        ),
+        "request_result_rows": (
+            "Number of objects returned by the endpoint.",
+            ROW_COUNT_BUCKETS,
+        ),
+    }
+    PREFIX = "geolocation_"
+
+    def __init__(self):
+        self._histograms: dict[tuple[str, str], Histogram] = {}
+        self._requests: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, endpoint: str) -> Histogram:
+        key = (name, endpoint)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(
+                    key, Histogram(self.HISTOGRAMS[name][1])
+                )
+        return histogram
+
+    def record(self, metrics: "RequestMetrics", status_code: int) -> None:
+        """Stores the measurements of a finished request"""
+        endpoint = metrics.endpoint
+        self.histogram("request_duration_seconds", endpoint).observe(metrics.wall_time)
+        self.histogram("request_db_queries", endpoint).observe(metrics.query_count)
+        self.histogram("request_db_duration_seconds", endpoint).observe(metrics.db_time)
+        if metrics.serialization_time is not None:
+            self.histogram("request_serialization_duration_seconds", endpoint).observe(
+                metrics.serialization_time
+            )
+        if metrics.rows is not None:
+            self.histogram("request_result_rows", endpoint).observe(metrics.rows)
+
+        key = (endpoint, str(status_code))
+        with self._lock:
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._requests.clear()
+
+    def render(self) -> str:
+        """Renders all metrics in the Prometheus text exposition format"""
+        lines = []
+        pid = os.getpid()
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            requests = sorted(self._requests.items())
+
+        name = f"{self.PREFIX}requests_total"
+        lines.append(f"# HELP {name} Number of handled requests.")
+        lines.append(f"# TYPE {name} counter")
+        for (endpoint, status_code), value in requests:
+            lines.append(
+                f'{name}{{pid="{pid}",endpoint="{endpoint}",'
+                f'status="{status_code}"}} {value}'
+            )
+
+        current = None
+        for (metric, endpoint), histogram in histograms:
+            name = f"{self.PREFIX}{metric}"
+            if metric != current:
+                lines.append(f"# HELP {name} {self.HISTOGRAMS[metric][0]}")
+                lines.append(f"# TYPE {name} histogram")
+                current = metric
+
+            cumulative, total, count = histogram.snapshot()
+            labels = f'pid="{pid}",endpoint="{endpoint}"'
+            for bound, value in zip(histogram.bounds, cumulative, strict=False):
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {value}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative[-1]}')
+            lines.append(f"{name}_sum{{{labels}}} {total}")
+            lines.append(f"{name}_count{{{labels}}} {count}")
+
+        return "\n".join(lines) + "\n"
+
+
+class RequestMetrics:
+    """
+    Measurements collected while a single request is handled.
+    Installed as a database execute wrapper to count queries.
+    """
+
+    __slots__ = (
+        "endpoint",
+        "wall_time",
+        "query_count",
+        "db_time",
+        "serialization_time",
+        "rows",
+        "connections_wrapped",
+        "_serialization_start",
+    )
+
+    def __init__(self, endpoint: str = "unmatched"):
+        self.endpoint = endpoint
+        self.wall_time = 0.0
+        self.query_count = 0
+        self.db_time = 0.0
+        self.serialization_time = None
+        self.rows = None
+        self.connections_wrapped = False
+        self._serialization_start = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record_query(perf_counter() - start)
+
+    def record_query(self, duration: float) -> None:
+        """Counts a query, also used by the async database path"""
+        self.db_time += duration
+        self.query_count += 1
+
+    def start_serialization(self) -> None:
+        self._serialization_start = (perf_counter(), self.db_time)
+
+    def stop_serialization(self) -> None:
+        """Closes the serialization window, excluding lazy queries made in it"""
+        if self._serialization_start is None:
+            return
+        started_at, db_time = self._serialization_start
+        elapsed = perf_counter() - started_at
+        self.serialization_time = max(elapsed - (self.db_time - db_time), 0.0)
+        self._serialization_start = None
+
+    def server_timing(self) -> str:
+        """Value for the Server-Timing response header"""
+        parts = [
+            f"total;dur={self.wall_time * 1000:.2f}",
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.query_count} queries"',
+        ]
+        if self.serialization_time is not None:
+            parts.append(f"ser;dur={self.serialization_time * 1000:.2f}")
+        return ", ".join(parts)
+
+
+registry = MetricsRegistry()
+
+
+def wrap_connections(metrics: RequestMetrics) -> ExitStack:
+    """Counts the queries of the current thread's connections into metrics"""
+    stack = ExitStack()
+    for connection in connections.all(initialized_only=False):
+        stack.enter_context(connection.execute_wrapper(metrics))
+    metrics.connections_wrapped = True
+    return stack
+
+
+def get_request_metrics(request) -> RequestMetrics | None:
+    """Returns the metrics of the current request, if instrumentation is on"""
+    return getattr(request, "request_metrics", None)
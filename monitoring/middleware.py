@@ -0,0 +1,106 @@
+from contextlib import ExitStack
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from monitoring.metrics import (
+    RequestMetrics,
+    get_request_metrics,
+    registry,
+    wrap_connections,
+)
+from monitoring.slow_queries import SlowQueryRecorder
+
+
+class RequestMetricsMiddleware:
+    """
+    Records wall time and database usage of every request into the
+    in-process metrics registry.
+
+    Under ASGI the middleware stays async so it does not add thread hops.
+    Queries of the async views are counted by places.async_db, those of
+    sync DRF views by InstrumentedViewMixin in the thread the view runs in.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICS_ENABLED", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Django runs sync process_view hooks through sync_to_async
+            self.process_view = self._aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        metrics = RequestMetrics()
+        request.request_metrics = metrics
+        start = perf_counter()
+
+        with wrap_connections(metrics):
+            response = self.get_response(request)
+
+        return self._finish(metrics, start, response)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        request.request_metrics = metrics
+        start = perf_counter()
+        response = await self.get_response(request)
+        return self._finish(metrics, start, response)
+
+    def _finish(self, metrics, start, response):
+        metrics.wall_time = perf_counter() - start
+        registry.record(metrics, response.status_code)
+
+        if getattr(settings, "METRICS_SERVER_TIMING", False):
+            response["Server-Timing"] = metrics.server_timing()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Tags the request with the view that handles it"""
+        metrics = get_request_metrics(request)
+        if metrics is None:
+            return None
+
+        view_class = getattr(view_func, "cls", None)
+        if view_class is None:
+            metrics.endpoint = request.resolver_match.view_name or view_func.__name__
+            return None
+
+        actions = getattr(view_func, "actions", None) or {}
+        action = actions.get(request.method.lower(), request.method.lower())
+        metrics.endpoint = f"{view_class.__name__}.{action}"
+        return None
+
+    async def _aprocess_view(self, request, view_func, view_args, view_kwargs):
+        return RequestMetricsMiddleware.process_view(
+            self, request, view_func, view_args, view_kwargs
+        )
+
+
+class SlowQueryMiddleware:
+    """
+    Captures queries slower than SLOW_QUERY_THRESHOLD_MS together with
+    the request that issued them. Opt-in via SLOW_QUERY_LOG_ENABLED.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SLOW_QUERY_LOG_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = SlowQueryRecorder(request)
+        with ExitStack() as stack:
+            for connection in connections.all(initialized_only=False):
+                stack.enter_context(connection.execute_wrapper(recorder))
+            return self.get_response(request)
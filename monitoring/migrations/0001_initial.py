@@ -0,0 +1,109 @@
+# Generated by Django 5.2.4 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="SlowQuery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "captured_at",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="When the query was recorded.",
+                        verbose_name="Captured",
+                    ),
+                ),
+                (
+                    "duration_ms",
+                    models.FloatField(
+                        help_text="Execution time of the original query.",
+                        verbose_name="Duration (ms)",
+                    ),
+                ),
+                (
+                    "database",
+                    models.CharField(
+                        help_text="Alias of the database connection.",
+                        max_length=100,
+                        verbose_name="Database",
+                    ),
+                ),
+                (
+                    "sql",
+                    models.TextField(
+                        help_text="Query with parameter placeholders.",
+                        verbose_name="SQL",
+                    ),
+                ),
+                (
+                    "params",
+                    models.JSONField(
+                        default=list,
+                        help_text="Query parameters (geometries as EWKB).",
+                        verbose_name="Parameters",
+                    ),
+                ),
+                (
+                    "executed_sql",
+                    models.TextField(
+                        blank=True,
+                        help_text="Query with parameters interpolated, as sent to the database.",
+                        verbose_name="Executed SQL",
+                    ),
+                ),
+                (
+                    "path",
+                    models.CharField(
+                        help_text="Request path.", max_length=255, verbose_name="Path"
+                    ),
+                ),
+                (
+                    "endpoint",
+                    models.CharField(
+                        blank=True,
+                        help_text="Viewset and action.",
+                        max_length=255,
+                        verbose_name="Endpoint",
+                    ),
+                ),
+                (
+                    "filter_params",
+                    models.JSONField(
+                        default=dict,
+                        help_text="Query string of the request.",
+                        verbose_name="Filter inputs",
+                    ),
+                ),
+                (
+                    "plan",
+                    models.JSONField(
+                        blank=True,
+                        help_text="Output of EXPLAIN (ANALYZE, BUFFERS) for sampled queries.",
+                        null=True,
+                        verbose_name="Plan",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Slow query",
+                "verbose_name_plural": "Slow queries",
+                "ordering": ["-captured_at"],
+            },
+        ),
+    ]
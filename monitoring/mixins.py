@@ -0,0 +1,47 @@
+from rest_framework import permissions
+
+from monitoring.metrics import get_request_metrics, wrap_connections
+
+
+class InstrumentedViewMixin:
+    """
+    DRF view mixin that adds serialization time and result row count
+    to the metrics collected by RequestMetricsMiddleware.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        metrics = get_request_metrics(request)
+        if metrics is None or metrics.connections_wrapped:
+            return super().dispatch(request, *args, **kwargs)
+        # Under ASGI the middleware runs in the event loop, while the view
+        # runs in a worker thread with connections of its own
+        with wrap_connections(metrics):
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        metrics = get_request_metrics(request)
+        if metrics is not None and getattr(self, "action", None):
+            metrics.endpoint = f"{type(self).__name__}.{self.action}"
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        metrics = get_request_metrics(self.request)
+        if metrics is not None and page is not None:
+            metrics.rows = len(page)
+            metrics.start_serialization()
+        return page
+
+    def get_object(self):
+        obj = super().get_object()
+        metrics = get_request_metrics(self.request)
+        if metrics is not None and self.request.method in permissions.SAFE_METHODS:
+            metrics.rows = 1
+            metrics.start_serialization()
+        return obj
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        metrics = get_request_metrics(request)
+        if metrics is not None:
+            metrics.stop_serialization()
+        return super().finalize_response(request, response, *args, **kwargs)
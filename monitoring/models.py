@@ -0,0 +1,43 @@
+from django.db import models
+
+
+class SlowQuery(models.Model):
+    captured_at = models.DateTimeField(
+        "Captured", auto_now_add=True, help_text="When the query was recorded."
+    )
+    duration_ms = models.FloatField(
+        "Duration (ms)", help_text="Execution time of the original query."
+    )
+    database = models.CharField(
+        "Database", max_length=100, help_text="Alias of the database connection."
+    )
+    sql = models.TextField("SQL", help_text="Query with parameter placeholders.")
+    params = models.JSONField(
+        "Parameters", default=list, help_text="Query parameters (geometries as EWKB)."
+    )
+    executed_sql = models.TextField(
+        "Executed SQL",
+        blank=True,
+        help_text="Query with parameters interpolated, as sent to the database.",
+    )
+    path = models.CharField("Path", max_length=255, help_text="Request path.")
+    endpoint = models.CharField(
+        "Endpoint", max_length=255, blank=True, help_text="Viewset and action."
+    )
+    filter_params = models.JSONField(
+        "Filter inputs", default=dict, help_text="Query string of the request."
+    )
+    plan = models.JSONField(
+        "Plan",
+        null=True,
+        blank=True,
+        help_text="Output of EXPLAIN (ANALYZE, BUFFERS) for sampled queries.",
+    )
+
+    class Meta:
+        verbose_name = "Slow query"
+        verbose_name_plural = "Slow queries"
+        ordering = ["-captured_at"]
+
+    def __str__(self):
+        return f"{self.endpoint or self.path} ({self.duration_ms:.1f} ms)"
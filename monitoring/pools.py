@@ -0,0 +1,109 @@
+import os
+
+from django.db import connections
+
+# Pools not managed by Django's connection handler, e.g. places.async_db
+_extra_pools: dict[str, object] = {}
+
+
+def register_pool(name: str, pool) -> None:
+    _extra_pools[name] = pool
+
+
+def unregister_pool(name: str) -> None:
+    _extra_pools.pop(name, None)
+
+
+def _database_pools() -> dict[str, object]:
+    pools = {}
+    for alias in connections:
+        pool = getattr(connections[alias], "pool", None)
+        if pool is not None:
+            pools[alias] = pool
+    return pools
+
+
+def _summarize(stats: dict) -> dict:
+    """Converts psycopg_pool statistics to in-use/idle/wait figures"""
+    size = stats.get("pool_size", 0)
+    idle = stats.get("pool_available", 0)
+    requests = stats.get("requests_num", 0)
+    wait_ms = stats.get("requests_wait_ms", 0)
+    return {
+        "min_size": stats.get("pool_min", 0),
+        "max_size": stats.get("pool_max", 0),
+        "size": size,
+        "in_use": size - idle,
+        "idle": idle,
+        "waiting": stats.get("requests_waiting", 0),
+        "requests": requests,
+        "requests_queued": stats.get("requests_queued", 0),
+        "wait_ms_total": wait_ms,
+        "wait_ms_avg": round(wait_ms / requests, 3) if requests else 0.0,
+        "timeouts": stats.get("requests_errors", 0),
+        "connections_opened": stats.get("connections_num", 0),
+        "connect_ms_total": stats.get("connections_ms", 0),
+        "connections_lost": stats.get("connections_lost", 0),
+    }
+
+
+def pool_stats() -> dict[str, dict]:
+    """Usage of every connection pool of this process, by pool name"""
+    pools = _database_pools() | _extra_pools
+    return {name: _summarize(pool.get_stats()) for name, pool in pools.items()}
+
+
+# (statistic, metric name, type, help)
+POOL_METRICS = (
+    ("size", "db_pool_size", "gauge", "Connections currently open in the pool."),
+    ("in_use", "db_pool_in_use", "gauge", "Connections checked out of the pool."),
+    ("idle", "db_pool_idle", "gauge", "Connections available in the pool."),
+    ("waiting", "db_pool_waiting", "gauge", "Requests waiting for a connection."),
+    (
+        "requests",
+        "db_pool_requests_total",
+        "counter",
+        "Connections requested from the pool.",
+    ),
+    (
+        "wait_ms_total",
+        "db_pool_wait_milliseconds_total",
+        "counter",
+        "Time spent waiting for a connection.",
+    ),
+    (
+        "timeouts",
+        "db_pool_timeouts_total",
+        "counter",
+        "Requests that timed out waiting for a connection.",
+    ),
+    (
+        "connections_opened",
+        "db_pool_connections_opened_total",
+        "counter",
+        "Connections opened by the pool.",
+    ),
+    (
+        "connections_lost",
+        "db_pool_connections_lost_total",
+        "counter",
+        "Connections found broken by the pool.",
+    ),
+)
+
+
+def render_pool_metrics(prefix: str = "geolocation_") -> str:
+    """Pool statistics in the Prometheus text exposition format"""
+    stats = pool_stats()
+    if not stats:
+        return ""
+
+    lines = []
+    pid = os.getpid()
+    for key, metric, kind, help_text in POOL_METRICS:
+        name = f"{prefix}{metric}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for pool, values in sorted(stats.items()):
+            lines.append(f'{name}{{pid="{pid}",pool="{pool}"}} {values[key]}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,122 @@
+import json
+import logging
+import random
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+
+from monitoring.metrics import get_request_metrics
+from monitoring.models import SlowQuery
+
+logger = logging.getLogger(__name__)
+
+# A single worker keeps EXPLAIN load on the database predictable
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query")
+
+
+def _run_in_worker(fn, *args):
+    close_old_connections()
+    fn(*args)
+
+
+def submit(fn, *args):
+    """Runs the function off the request path"""
+    return _executor.submit(_run_in_worker, fn, *args)
+
+
+def _json_param(value):
+    """Converts a query parameter to a JSON-compatible value"""
+    if value is None or isinstance(value, bool | int | float | str):
+        return value
+    if isinstance(value, list | tuple):
+        return [_json_param(item) for item in value]
+    if hasattr(value, "ewkb"):
+        # Geometry adapters; EWKB hex can be pasted back into psql as is
+        return bytes(value.ewkb).hex()
+    return str(value)
+
+
+class SlowQueryRecorder:
+    """Execute wrapper capturing queries slower than SLOW_QUERY_THRESHOLD_MS"""
+
+    def __init__(self, request):
+        self.request = request
+        self.threshold_ms = settings.SLOW_QUERY_THRESHOLD_MS
+        self.sample_rate = settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+        self._capturing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if self._capturing:
+            return execute(sql, params, many, context)
+
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (perf_counter() - start) * 1000
+            if not many and duration_ms >= self.threshold_ms:
+                self._capture(sql, params, duration_ms, context)
+
+    def _capture(self, sql, params, duration_ms, context):
+        connection = context["connection"]
+        try:
+            executed_sql = connection.ops.last_executed_query(
+                context["cursor"].cursor, sql, params
+            )
+        except Exception:
+            executed_sql = ""
+
+        metrics = get_request_metrics(self.request)
+        record = {
+            "duration_ms": duration_ms,
+            "database": connection.alias,
+            "sql": sql,
+            "params": _json_param(params or []),
+            "executed_sql": executed_sql or "",
+            "path": self.request.path[:255],
+            "endpoint": metrics.endpoint if metrics else "",
+            "filter_params": self.request.GET.dict(),
+        }
+
+        # ANALYZE executes the statement again, so only reads are explained
+        explain = (
+            sql.lstrip()[:6].upper() == "SELECT" and random.random() < self.sample_rate
+        )
+        self._capturing = True
+        try:
+            submit(store_slow_query, record, params if explain else None)
+        finally:
+            self._capturing = False
+
+
+def explain_query(alias: str, sql: str, params) -> list:
+    """Runs EXPLAIN (ANALYZE, BUFFERS) in a transaction that is rolled back"""
+    timeout_ms = int(settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS)
+    with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+        cursor.execute(f"SET LOCAL statement_timeout = {timeout_ms}")
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+        transaction.set_rollback(True, using=alias)
+
+    return json.loads(plan) if isinstance(plan, str) else plan
+
+
+def store_slow_query(record: dict, explain_params=None) -> None:
+    """Stores the query, keeping only the latest SLOW_QUERY_CAPACITY entries"""
+    try:
+        if explain_params is not None:
+            try:
+                record["plan"] = explain_query(
+                    record["database"], record["sql"], explain_params
+                )
+            except Exception:
+                logger.warning("EXPLAIN failed for slow query", exc_info=True)
+
+        entry = SlowQuery.objects.create(**record)
+        SlowQuery.objects.filter(
+            pk__lte=entry.pk - settings.SLOW_QUERY_CAPACITY
+        ).delete()
+    except Exception:
+        logger.exception("Failed to store slow query")
@@ -0,0 +1,165 @@
+import os
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.gis.geos import Point
+from django.test import AsyncClient
+
+from monitoring.memory import memory_usage, render_memory_metrics
+from monitoring.metrics import Histogram, MetricsRegistry, RequestMetrics, registry
+from monitoring.pools import register_pool, unregister_pool
+from places.models import PlaceStatus
+
+
+class TestMetricsRegistry:
+    def test_histogram_buckets_are_cumulative(self):
+        """Observations land in the first bucket whose bound is not exceeded"""
+        histogram = Histogram((0.1, 1.0))
+
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(3.0)
+
+        cumulative, total, count = histogram.snapshot()
+        assert cumulative == [1, 2, 3]
+        assert total == pytest.approx(3.55)
+        assert count == 3
+
+    def test_render_uses_prometheus_text_format(self):
+        """Histograms are rendered with bucket, sum and count series"""
+        metrics_registry = MetricsRegistry()
+        metrics = RequestMetrics("PlaceRadiusSearchViewSet.list")
+        metrics.wall_time = 0.02
+        metrics.rows = 3
+
+        metrics_registry.record(metrics, 200)
+        output = metrics_registry.render()
+        pid = os.getpid()
+
+        assert (
+            f'geolocation_requests_total{{pid="{pid}",'
+            'endpoint="PlaceRadiusSearchViewSet.list",status="200"} 1' in output
+        )
+        assert "# TYPE geolocation_request_duration_seconds histogram" in output
+        assert (
+            f'geolocation_request_result_rows_bucket{{pid="{pid}",'
+            'endpoint="PlaceRadiusSearchViewSet.list",le="5"} 1' in output
+        )
+        assert "geolocation_request_serialization_duration_seconds" not in output
+
+
+@pytest.mark.django_db
+class TestMetricsEndpoint:
+    url = "/api/v1/monitoring/metrics/"
+
+    def test_metrics_are_not_available_for_regular_user(self, authenticated_client):
+        """Only administrators can read the metrics"""
+        client, user = authenticated_client
+
+        response = client.get(self.url)
+
+        assert response.status_code == 403
+
+    def test_search_requests_are_tagged_by_viewset_and_action(
+        self, client, admin_client, place_factory
+    ):
+        """Radius searches are recorded under the viewset and action name"""
+        registry.clear()
+        place_factory(status=PlaceStatus.PUBLISHED, location=Point(19.945, 50.062))
+
+        client.get("/api/v1/places/search/radius/?lat=50.0613&lon=19.937&radius=5")
+        response = admin_client.get(self.url)
+
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain")
+        content = response.content.decode()
+        pid = os.getpid()
+        assert (
+            f'geolocation_request_result_rows_bucket{{pid="{pid}",'
+            'endpoint="PlaceRadiusSearchViewSet.list",le="1"} 1' in content
+        )
+        assert (
+            f'geolocation_request_serialization_duration_seconds_count{{pid="{pid}",'
+            'endpoint="PlaceRadiusSearchViewSet.list"} 1' in content
+        )
+
+    def test_server_timing_header_is_optional(self, client, settings):
+        """The Server-Timing header is only sent when enabled"""
+        url = "/api/v1/places/search/bbox/?in_bbox=19.93,50.06,19.94,50.065"
+
+        settings.METRICS_SERVER_TIMING = False
+        assert "Server-Timing" not in client.get(url)
+
+        settings.METRICS_SERVER_TIMING = True
+        response = client.get(url)
+        assert response["Server-Timing"].startswith("total;dur=")
+        assert "db;dur=" in response["Server-Timing"]
+
+    def test_sync_view_queries_are_counted_under_asgi(self, settings, place_factory):
+        """Queries of a sync viewset are counted through the async handler"""
+        settings.METRICS_SERVER_TIMING = True
+        place_factory(status=PlaceStatus.PUBLISHED, location=Point(19.935, 50.062))
+
+        response = async_to_sync(AsyncClient().get)(
+            "/api/v1/places/search/bbox/?in_bbox=19.93,50.06,19.94,50.065"
+        )
+
+        assert response.status_code == 200
+        timing = response["Server-Timing"]
+        queries = int(timing.split('desc="')[1].split(" queries")[0])
+        assert queries > 0
+
+
+class FakePool:
+    def get_stats(self):
+        return {
+            "pool_min": 2,
+            "pool_max": 10,
+            "pool_size": 4,
+            "pool_available": 1,
+            "requests_num": 8,
+            "requests_wait_ms": 20,
+        }
+
+
+@pytest.mark.django_db
+class TestPoolStats:
+    url = "/api/v1/monitoring/db-pools/"
+
+    def test_pool_stats_are_not_available_for_regular_user(self, authenticated_client):
+        """Only administrators can read the pool statistics"""
+        client, user = authenticated_client
+
+        assert client.get(self.url).status_code == 403
+
+    def test_pool_stats_report_usage_and_wait_time(self, admin_client):
+        """Registered pools are summarized as in-use, idle and wait time"""
+        register_pool("fake", FakePool())
+        try:
+            response = admin_client.get(self.url)
+            metrics = admin_client.get("/api/v1/monitoring/metrics/")
+        finally:
+            unregister_pool("fake")
+
+        assert response.status_code == 200
+        stats = response.data["fake"]
+        assert stats["in_use"] == 3
+        assert stats["idle"] == 1
+        assert stats["wait_ms_avg"] == 2.5
+        assert (
+            f'geolocation_db_pool_in_use{{pid="{os.getpid()}",pool="fake"}} 3'
+            in metrics.content.decode()
+        )
+
+
+@pytest.mark.skipif(not memory_usage(), reason="needs /proc/self/smaps_rollup")
+def test_worker_memory_is_reported_per_process():
+    """RSS, PSS, shared and private bytes are labelled with the worker pid"""
+    output = render_memory_metrics()
+
+    usage = memory_usage()
+    assert usage["rss"] >= usage["pss"] > 0
+    assert usage["rss"] == usage["shared"] + usage["private"]
+    assert f'geolocation_process_memory_bytes{{pid="{os.getpid()}",kind="pss"}}' in (
+        output
+    )
@@ -0,0 +1,50 @@
+import pytest
+from django.core.management import call_command
+
+from monitoring import slow_queries
+from monitoring.models import SlowQuery
+
+
+@pytest.fixture
+def slow_query_log(settings, monkeypatch):
+    """Records every query and explains all of them, synchronously"""
+    settings.SLOW_QUERY_LOG_ENABLED = True
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE = 1.0
+    settings.SLOW_QUERY_CAPACITY = 500
+    monkeypatch.setattr(slow_queries, "submit", lambda fn, *args: fn(*args))
+
+
+@pytest.mark.django_db
+class TestSlowQueryLog:
+    def test_bbox_search_queries_are_captured_with_plan(self, client, slow_query_log):
+        """Slow bbox queries keep the request inputs and an EXPLAIN plan"""
+        url = "/api/v1/places/search/bbox/?in_bbox=19.93,50.06,19.94,50.065"
+
+        response = client.get(url)
+
+        assert response.status_code == 200
+        entry = SlowQuery.objects.filter(endpoint="PlaceBboxSearchViewSet.list").first()
+        assert entry is not None
+        assert entry.filter_params == {"in_bbox": "19.93,50.06,19.94,50.065"}
+        assert entry.path == "/api/v1/places/search/bbox/"
+        assert entry.plan[0]["Plan"]["Node Type"]
+
+    def test_ring_buffer_keeps_latest_entries(self, client, settings, slow_query_log):
+        """Older entries are dropped once the capacity is exceeded"""
+        settings.SLOW_QUERY_CAPACITY = 2
+
+        for _ in range(3):
+            client.get("/api/v1/places/search/radius/?lat=50.06&lon=19.93")
+
+        assert SlowQuery.objects.count() <= 2
+
+    def test_dump_command_prints_plans(self, client, slow_query_log, capsys):
+        """The management command prints the recorded queries"""
+        client.get("/api/v1/places/search/radius/?lat=50.06&lon=19.93")
+
+        call_command("dump_slow_queries", "--with-plan")
+
+        output = capsys.readouterr().out
+        assert "PlaceRadiusSearchViewSet.list" in output
+        assert "->" in output
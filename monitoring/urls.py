@@ -0,0 +1,10 @@
+from django.urls import path
+
+from monitoring.views import MetricsView, PoolStatsView
+
+app_name = "monitoring"
+
+urlpatterns = [
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+    path("db-pools/", PoolStatsView.as_view(), name="db-pools"),
+]
@@ -0,0 +1,52 @@
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from monitoring.memory import render_memory_metrics
+from monitoring.metrics import registry
+from monitoring.pools import pool_stats, render_pool_metrics
+
+
+class PrometheusRenderer(BaseRenderer):
+    media_type = "text/plain"
+    format = "txt"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, str):
+            return data.encode(self.charset)
+        # Error responses (e.g. 403) are dictionaries
+        return "\n".join(f"# {key}: {value}" for key, value in data.items()).encode(
+            self.charset
+        )
+
+
+class MetricsView(APIView):
+    """
+    Request metrics in the Prometheus text format.
+    Available for administrators only.
+    """
+
+    permission_classes = [IsAdminUser]
+    renderer_classes = [PrometheusRenderer]
+
+    def get(self, request):
+        return Response(
+            registry.render()
+            + render_pool_metrics(registry.PREFIX)
+            + render_memory_metrics(registry.PREFIX),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+
+class PoolStatsView(APIView):
+    """
+    Database connection pool usage: in-use, idle and wait time per pool.
+    Available for administrators only.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(pool_stats())
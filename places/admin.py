@@ -1,6 +1,8 @@
 from django.contrib.gis import admin
+from django.db import transaction
 
-from places.models import Place
+from places.changes import record_change, record_deletes
+from places.models import Place, PlaceChangeOp
 
 
 @admin.register(Place)
@@ -8,3 +10,20 @@ class PlaceAdmin(admin.GISModelAdmin):
     list_display = ("name", "created_by", "created_at")
     list_filter = ("created_at",)
     search_fields = ("name", "description")
+
+    def save_model(self, request, obj, form, change):
+        status_before = form.initial.get("status", "") if change else ""
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            op = PlaceChangeOp.UPDATE if change else PlaceChangeOp.CREATE
+            record_change(obj, op, status_before)
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            record_deletes([obj])
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            record_deletes(queryset)
+            super().delete_queryset(request, queryset)
@@ -0,0 +1,206 @@
+"""
+Async read path to PostgreSQL through a psycopg 3 connection pool.
+
+Querysets are built and compiled with the regular ORM (no I/O), executed on
+an async connection and turned back into model instances, so async views do
+not need `sync_to_async` for their queries. Django's own async ORM methods
+still run the sync driver in a thread.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from time import perf_counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.gis.db.backends.postgis.adapter import PostGISAdapter
+from django.contrib.gis.db.backends.postgis.base import postgis_adapters
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
+from django.db.models.query import get_related_populators
+from psycopg import AsyncClientCursor, AsyncConnection
+from psycopg.conninfo import make_conninfo
+from psycopg.types import TypeInfo
+from psycopg.types.string import TextBinaryLoader, TextLoader
+from psycopg_pool import AsyncConnectionPool
+
+from monitoring.pools import register_pool, unregister_pool
+from places.models import Place
+
+_pools: dict[str, AsyncConnectionPool] = {}
+_pool_loops: dict[str, asyncio.AbstractEventLoop] = {}
+_pool_lock = asyncio.Lock()
+_type_infos: dict[str, TypeInfo | None] = {}
+_srid_ready: set[str] = set()
+
+
+def _connection_kwargs(alias: str) -> dict:
+    settings_dict = connections[alias].settings_dict
+    params = {
+        "dbname": settings_dict["NAME"],
+        "user": settings_dict["USER"],
+        "password": settings_dict["PASSWORD"],
+        "host": settings_dict["HOST"],
+        "port": settings_dict["PORT"],
+    }
+    return {
+        "conninfo": make_conninfo(
+            **{key: value for key, value in params.items() if value}
+        ),
+        # Same wire behaviour as Django: client-side binding, UTC timestamps
+        "cursor_factory": AsyncClientCursor,
+        "options": "-c TimeZone=UTC",
+        "autocommit": True,
+    }
+
+
+async def _configure(connection: AsyncConnection) -> None:
+    """Registers the PostGIS adapters the way Django does for sync connections"""
+    oids = []
+    for typename in ("geometry", "geography", "raster"):
+        if typename not in _type_infos:
+            _type_infos[typename] = await TypeInfo.fetch(connection, typename)
+        info = _type_infos[typename]
+        if info is not None:
+            info.register(connection)
+            connection.adapters.register_loader(info.oid, TextLoader)
+            connection.adapters.register_loader(info.oid, TextBinaryLoader)
+        oids.append(info.oid if info else None)
+
+    text_dumper, binary_dumper = postgis_adapters(*oids)
+    connection.adapters.register_dumper(PostGISAdapter, text_dumper)
+    connection.adapters.register_dumper(PostGISAdapter, binary_dumper)
+
+
+def _warm_up(alias: str) -> None:
+    """
+    Loads the SRID metadata that query compilation reads from
+    spatial_ref_sys. Runs once per process in a worker thread.
+    """
+    connection = connections[alias]
+    try:
+        Place._meta.get_field("location").geodetic(connection)
+    finally:
+        connection.close()
+
+
+async def _prepare(alias: str) -> None:
+    if alias not in _srid_ready:
+        await sync_to_async(_warm_up, thread_sensitive=False)(alias)
+        _srid_ready.add(alias)
+
+
+async def get_pool(alias: str = "default") -> AsyncConnectionPool:
+    """Returns the pool of the alias, opening it on first use"""
+    pool = _pools.get(alias)
+    if pool is not None:
+        return pool
+
+    async with _pool_lock:
+        if alias not in _pools:
+            await _prepare(alias)
+            kwargs = _connection_kwargs(alias)
+            pool = AsyncConnectionPool(
+                kwargs.pop("conninfo"),
+                kwargs=kwargs,
+                min_size=settings.ASYNC_DB_POOL_MIN_SIZE,
+                max_size=settings.ASYNC_DB_POOL_MAX_SIZE,
+                timeout=settings.ASYNC_DB_POOL_TIMEOUT,
+                configure=_configure,
+                name=f"async-{alias}",
+                open=False,
+            )
+            await pool.open()
+            _pools[alias] = pool
+            register_pool(pool.name, pool)
+            _pool_loops[alias] = asyncio.get_running_loop()
+    return _pools[alias]
+
+
+async def close_pools() -> None:
+    """Closes all pools of the process (tests, graceful shutdown hooks)"""
+    for alias in list(_pools):
+        pool = _pools.pop(alias)
+        _pool_loops.pop(alias, None)
+        unregister_pool(pool.name)
+        await pool.close()
+
+
+@asynccontextmanager
+async def get_connection(request=None, alias: str = "default"):
+    """
+    Pooled connection under ASGI. Under WSGI every async view runs in its
+    own short-lived event loop, so a pool cannot be shared and a dedicated
+    connection is opened instead.
+    """
+    loop = asyncio.get_running_loop()
+    if isinstance(request, ASGIRequest) and _pool_loops.get(alias, loop) is loop:
+        pool = await get_pool(alias)
+        async with pool.connection() as connection:
+            yield connection
+        return
+
+    await _prepare(alias)
+    kwargs = _connection_kwargs(alias)
+    connection = await AsyncConnection.connect(kwargs.pop("conninfo"), **kwargs)
+    try:
+        await _configure(connection)
+        yield connection
+    finally:
+        await connection.close()
+
+
+async def _execute(connection, sql: str, params, metrics=None) -> list[tuple]:
+    start = perf_counter()
+    try:
+        async with connection.cursor() as cursor:
+            await cursor.execute(sql, params)
+            return await cursor.fetchall()
+    finally:
+        if metrics is not None:
+            metrics.record_query(perf_counter() - start)
+
+
+async def fetch_models(connection, queryset, metrics=None) -> list:
+    """Evaluates a model queryset, including select_related and annotations"""
+    compiler = queryset.query.get_compiler(using=queryset.db)
+    sql, params = compiler.as_sql()
+    rows = await _execute(connection, sql, params, metrics)
+    if compiler.has_extra_select:
+        rows = [row[: compiler.col_count] for row in rows]
+
+    # Same row to instance mapping as django.db.models.query.ModelIterable
+    select, klass_info, annotation_col_map = (
+        compiler.select,
+        compiler.klass_info,
+        compiler.annotation_col_map,
+    )
+    model_cls = klass_info["model"]
+    select_fields = klass_info["select_fields"]
+    model_fields_start, model_fields_end = select_fields[0], select_fields[-1] + 1
+    init_list = [
+        f[0].target.attname for f in select[model_fields_start:model_fields_end]
+    ]
+    related_populators = get_related_populators(klass_info, select, queryset.db)
+
+    objects = []
+    for row in compiler.results_iter(results=[rows]):
+        obj = model_cls.from_db(
+            queryset.db, init_list, row[model_fields_start:model_fields_end]
+        )
+        for rel_populator in related_populators:
+            rel_populator.populate(row, obj)
+        for attr_name, col_pos in (annotation_col_map or {}).items():
+            setattr(obj, attr_name, row[col_pos])
+        objects.append(obj)
+    return objects
+
+
+async def fetch_count(connection, queryset, metrics=None) -> int:
+    """COUNT(*) of a queryset, ignoring its ordering"""
+    compiler = queryset.order_by().values("pk").query.get_compiler(queryset.db)
+    sql, params = compiler.as_sql()
+    rows = await _execute(
+        connection, f"SELECT COUNT(*) FROM ({sql}) subquery", params, metrics
+    )
+    return rows[0][0]
@@ -0,0 +1,256 @@
+"""
+Async versions of the public search and detail endpoints.
+
+They return the same payloads as the DRF viewsets for anonymous users
+and run their queries through places.async_db, so under ASGI a worker
+keeps many searches in flight while PostGIS is busy. `place_stream` sends
+live updates of the places in an area, see places.subscriptions.
+"""
+
+import asyncio
+import math
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import APIException, NotFound, ParseError, Throttled
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from GeolocationAPI.throttling import AnonThrottle
+from monitoring.metrics import get_request_metrics
+from places.async_db import fetch_count, fetch_models, get_connection
+from places.fields import parse_precision
+from places.filters import BboxSearchFilter, PlaceRadiusSearchFilter
+from places.models import Place, PlaceStatus
+from places.serializers import PlacePublicSerializer
+from places.services import GeospatialService
+from places.subscriptions import RESET, BoxArea, RadiusArea, broker
+
+
+class PublicRateThrottle(AnonThrottle):
+    """
+    Anonymous rate applied by client address. The async endpoints never
+    authenticate, so request.user is not consulted.
+    """
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
+
+
+class PublicSearchRateThrottle(PublicRateThrottle):
+    scope = "search_anon"
+
+
+class StreamUnavailable(APIException):
+    status_code = 503
+    default_detail = "Live updates are unavailable, try again later."
+    default_code = "stream_unavailable"
+
+
+def _json_response(data, status=200) -> HttpResponse:
+    return HttpResponse(
+        # The API's JSON renderer, orjson unless JSON_BACKEND says otherwise
+        api_settings.DEFAULT_RENDERER_CLASSES[0]().render(data),
+        status=status,
+        content_type="application/json",
+    )
+
+
+def _error_response(exc: APIException) -> HttpResponse:
+    response = _json_response({"detail": exc.detail}, status=exc.status_code)
+    if getattr(exc, "wait", None):
+        response["Retry-After"] = str(int(exc.wait))
+    return response
+
+
+def _serializer_context(request) -> dict:
+    context = {"request": request}
+    precision = parse_precision(request.GET)
+    if precision is not None:
+        context["precision"] = precision
+    return context
+
+
+async def _check_throttle(request, throttle_class=PublicRateThrottle) -> None:
+    throttle = throttle_class()
+    # The counters live in the (sync) cache, which may be Redis
+    if not await sync_to_async(throttle.allow_request)(request, None):
+        raise Throttled(throttle.wait())
+
+
+def _published_places():
+    return Place.objects.filter(status=PlaceStatus.PUBLISHED).select_related(
+        "created_by"
+    )
+
+
+def _page_number(request) -> int:
+    try:
+        page = int(request.GET.get("page", 1))
+    except ValueError as err:
+        raise NotFound("Invalid page.") from err
+    if page < 1:
+        raise NotFound("Invalid page.")
+    return page
+
+
+def _page_link(request, page: int, pages: int) -> str | None:
+    if page < 1 or page > pages:
+        return None
+    url = request.build_absolute_uri()
+    if page == 1:
+        return remove_query_param(url, "page")
+    return replace_query_param(url, "page", page)
+
+
+async def _search(request, filterset_class) -> HttpResponse:
+    """Filtered, paginated search in the PageNumberPagination format"""
+    metrics = get_request_metrics(request)
+    page_size = api_settings.PAGE_SIZE
+
+    try:
+        await _check_throttle(request, PublicSearchRateThrottle)
+        page = _page_number(request)
+        context = _serializer_context(request)
+        queryset = filterset_class(
+            request.GET, queryset=_published_places(), request=Request(request)
+        ).qs
+
+        async with get_connection(request) as connection:
+            count = await fetch_count(connection, queryset, metrics)
+            pages = max(math.ceil(count / page_size), 1)
+            if page > pages:
+                raise NotFound("Invalid page.")
+            offset = (page - 1) * page_size
+            places = await fetch_models(
+                connection, queryset[offset : offset + page_size], metrics
+            )
+    except APIException as exc:
+        return _error_response(exc)
+
+    if metrics is not None:
+        metrics.rows = len(places)
+        metrics.start_serialization()
+    data = {
+        "count": count,
+        "next": _page_link(request, page + 1, pages),
+        "previous": _page_link(request, page - 1, pages),
+        "results": PlacePublicSerializer(places, many=True, context=context).data,
+    }
+    response = _json_response(data)
+    if metrics is not None:
+        metrics.stop_serialization()
+    return response
+
+
+@require_GET
+async def radius_search(request):
+    """Async counterpart of PlaceRadiusSearchViewSet.list"""
+    return await _search(request, PlaceRadiusSearchFilter)
+
+
+@require_GET
+async def bbox_search(request):
+    """Async counterpart of PlaceBboxSearchViewSet.list"""
+    return await _search(request, BboxSearchFilter)
+
+
+@require_GET
+async def place_detail(request, pk: int):
+    """Async counterpart of PlaceViewSet.retrieve for anonymous users"""
+    metrics = get_request_metrics(request)
+
+    try:
+        await _check_throttle(request)
+        context = _serializer_context(request)
+        async with get_connection(request) as connection:
+            places = await fetch_models(
+                connection, _published_places().filter(pk=pk)[:1], metrics
+            )
+        if not places:
+            raise NotFound("No Place matches the given query.")
+    except APIException as exc:
+        return _error_response(exc)
+
+    if metrics is not None:
+        metrics.rows = 1
+        metrics.start_serialization()
+    response = _json_response(PlacePublicSerializer(places[0], context=context).data)
+    if metrics is not None:
+        metrics.stop_serialization()
+    return response
+
+
+def _subscription_area(params) -> BoxArea | RadiusArea:
+    """Area of ?in_bbox= or ?lat=&lon=&radius=, as the search endpoints"""
+    if params.get("in_bbox"):
+        try:
+            return BoxArea(*BboxSearchFilter._parse_bbox(params["in_bbox"]))
+        except (ValueError, IndexError) as err:
+            raise ParseError(f"Incorrect format 'in_bbox': {str(err)}") from err
+
+    if not (params.get("lat") and params.get("lon")):
+        raise ParseError("Either 'in_bbox' or 'lat' and 'lon' are mandatory")
+    try:
+        lat, lon = float(params["lat"]), float(params["lon"])
+        radius = float(params.get("radius", PlaceRadiusSearchFilter.DEFAULT_RADIUS))
+    except ValueError as err:
+        raise ParseError(
+            "Incorrect parameters. 'lat', 'lon' and 'radius' must be numbers"
+        ) from err
+    for is_valid, error in (
+        GeospatialService.validate_coordinates(lat, lon),
+        GeospatialService.validate_radius(radius),
+    ):
+        if not is_valid:
+            raise ParseError(error)
+    return RadiusArea(lon, lat, radius)
+
+
+async def _events(area):
+    # Subscribed once streaming starts, so the finally below always runs
+    subscription = broker.subscribe(area)
+    try:
+        # Reconnecting clients wait about one poll
+        yield b"retry: %d\n\n" % (settings.SUBSCRIPTION_POLL_SECONDS * 1000)
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), settings.SUBSCRIPTION_HEARTBEAT_SECONDS
+                )
+            except TimeoutError:
+                # Keeps proxies from closing an idle connection
+                yield b": keep-alive\n\n"
+                continue
+            yield event
+            if event is RESET:
+                return
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@require_GET
+async def place_stream(request):
+    """Server-sent events of published places in an area"""
+    try:
+        if not isinstance(request, ASGIRequest):
+            raise StreamUnavailable("Live updates need an ASGI server.")
+        await _check_throttle(request)
+        area = _subscription_area(request.GET)
+        if broker.index.count >= settings.SUBSCRIPTION_MAX_CLIENTS:
+            raise StreamUnavailable()
+    except APIException as exc:
+        return _error_response(exc)
+
+    response = StreamingHttpResponse(_events(area), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # nginx would buffer the events otherwise
+    response["X-Accel-Buffering"] = "no"
+    return response
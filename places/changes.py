@@ -0,0 +1,74 @@
+"""
+Change-data feed of places.
+
+Every create, update and delete made through PlaceService, the API or the
+admin appends a PlaceChange row in the same transaction, so consumers
+(caches, search indexes, snapshots) ask for "everything after sequence N"
+instead of scanning `updated_at`, and see hard deletes too.
+
+Appends take a transaction-level advisory lock, so sequence numbers are
+committed in order and a consumer that read up to N never finds a smaller
+one later. Bulk loads (`seed_places`) and `QuerySet.update()` bypass the
+log; consumers should be rebuilt after them. Rows older than
+PLACE_CHANGE_RETENTION_DAYS are removed by `manage.py prune_place_changes`.
+"""
+
+from collections.abc import Iterable, Iterator
+from datetime import timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from places.models import Place, PlaceChange, PlaceChangeOp
+
+# pg_advisory_xact_lock key of the append
+APPEND_LOCK = 0x504C4348
+
+
+def record_change(place: Place, op: str, status_before: str = "") -> PlaceChange:
+    """Appends a change of the place, must run in the mutating transaction"""
+    if not connection.in_atomic_block:
+        raise RuntimeError("Place changes must be recorded in a transaction")
+    with connection.cursor() as cursor:
+        # Held until commit: the next append gets a larger sequence
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", [APPEND_LOCK])
+    return PlaceChange.objects.create(
+        place_id=place.pk,
+        op=op,
+        status_before=status_before,
+        status_after="" if op == PlaceChangeOp.DELETE else place.status,
+        location=place.location,
+    )
+
+
+def record_deletes(places: Iterable[Place]) -> None:
+    for place in places:
+        record_change(place, PlaceChangeOp.DELETE, place.status)
+
+
+def changes_since(seq: int = 0, batch_size: int = 1000) -> Iterator[PlaceChange]:
+    """Changes after the sequence in order, read in keyset batches"""
+    while True:
+        batch = list(PlaceChange.objects.filter(seq__gt=seq)[:batch_size])
+        yield from batch
+        if len(batch) < batch_size:
+            return
+        seq = batch[-1].seq
+
+
+def last_seq() -> int:
+    """Sequence of the latest change, 0 when there is none"""
+    return (
+        PlaceChange.objects.order_by("-seq").values_list("seq", flat=True).first() or 0
+    )
+
+
+def prune(days: int, batch_size: int = 10000) -> int:
+    """Deletes changes older than the retention, in batches"""
+    deleted = 0
+    queryset = PlaceChange.objects.filter(
+        created_at__lt=timezone.now() - timedelta(days=days)
+    )
+    while seqs := list(queryset.values_list("seq", flat=True)[:batch_size]):
+        deleted += PlaceChange.objects.filter(seq__in=seqs).delete()[0]
+    return deleted
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from rest_framework.exceptions import ParseError
+from rest_framework_gis.fields import GeoJsonDict, GeometryField
+
+
+def parse_precision(params) -> int | None:
+    """`precision` query parameter, decimals of the returned coordinates"""
+    value = params.get("precision")
+    if value is None:
+        return None
+    try:
+        precision = int(value)
+    except ValueError as err:
+        raise ParseError("'precision' must be an integer") from err
+    if not 0 <= precision <= settings.COORDINATE_MAX_PRECISION:
+        raise ParseError(
+            f"'precision' must be between 0 and {settings.COORDINATE_MAX_PRECISION}"
+        )
+    return precision
+
+
+class CoordinatesField(GeometryField):
+    """
+    GeometryField rounding coordinates to the `precision` of the serializer
+    context, COORDINATE_PRECISION decimals by default. Points are written
+    from their coordinates directly, without the GeoJSON round trip.
+    """
+
+    def to_representation(self, value):
+        precision = self.context.get("precision", settings.COORDINATE_PRECISION)
+        if isinstance(value, Point) and not value.empty and self.transform is None:
+            return GeoJsonDict(
+                (
+                    ("type", "Point"),
+                    ("coordinates", [round(c, precision) for c in value.coords]),
+                )
+            )
+        self.precision = precision
+        return super().to_representation(value)
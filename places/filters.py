@@ -1,10 +1,15 @@
+import math
+
 import django_filters
+from django.conf import settings
 from django.contrib.gis.db.models.functions import Distance
 from django.contrib.gis.geos import Point, Polygon
 from django.contrib.gis.measure import D
+from django.db.models import Q
 from rest_framework.exceptions import ParseError
 
-from places.models import Place, PlaceStatus
+from places.geohash import cells_q, covering_cells, radius_cells
+from places.models import Place, PlaceStatus, location_geography
 from places.services import GeospatialService
 
 
@@ -31,9 +36,9 @@ class BaseGeospatialFilter(django_filters.FilterSet):
         return None
 
     def _add_distance_annotation(self, queryset, user_location: Point):
-        """Adding distance annotation and sorting"""
+        """Adding distance annotation and sorting, pk breaks ties"""
         return queryset.annotate(distance=Distance("location", user_location)).order_by(
-            "distance"
+            "distance", "pk"
         )
 
 
@@ -73,8 +78,14 @@ class PlaceRadiusSearchFilter(BaseGeospatialFilter):
 
             user_location = Point(lon_val, lat_val, srid=4326)
 
-            queryset = queryset.filter(
-                location__distance_lte=(user_location, D(km=radius_val))
+            if settings.GEOHASH_PREFILTER:
+                queryset = queryset.filter(
+                    cells_q(radius_cells(lon_val, lat_val, radius_val))
+                )
+            # ST_DWithin on geography is exact across the antimeridian and
+            # near the poles and is served by the geography index
+            queryset = queryset.alias(geography=location_geography()).filter(
+                geography__dwithin=(user_location, D(km=radius_val))
             )
 
             return self._add_distance_annotation(queryset, user_location)
@@ -98,8 +109,13 @@ class BboxSearchFilter(BaseGeospatialFilter):
 
         try:
             coords = self._parse_bbox(bbox_str)
-            poly = Polygon.from_bbox(coords)
-            queryset = queryset.filter(location__bboverlaps=poly)
+            condition = Q()
+            for box in self._split_bbox(coords):
+                box_condition = Q(location__bboverlaps=Polygon.from_bbox(box))
+                if settings.GEOHASH_PREFILTER:
+                    box_condition &= cells_q(covering_cells(*box))
+                condition |= box_condition
+            queryset = queryset.filter(condition)
 
             user_location = self._get_user_location(params)
             if user_location:
@@ -110,7 +126,8 @@ class BboxSearchFilter(BaseGeospatialFilter):
         except (ValueError, IndexError) as err:
             raise ParseError(f"Incorrect format 'in_bbox': {str(err)}") from err
 
-    def _parse_bbox(self, bbox_str: str) -> tuple[float, float, float, float]:
+    @staticmethod
+    def _parse_bbox(bbox_str: str) -> tuple[float, float, float, float]:
         """Parsing and validation bbox"""
         coords = [float(x.strip()) for x in bbox_str.split(",")]
 
@@ -129,11 +146,77 @@ class BboxSearchFilter(BaseGeospatialFilter):
             if not is_valid:
                 raise ValueError(f"Incorrect longitude: {lon}")
 
-        if min_lon >= max_lon or min_lat >= max_lat:
+        # min_lon > max_lon is a box crossing the antimeridian
+        if min_lon == max_lon or min_lat >= max_lat:
             raise ValueError("Incorrect bounding rectangle")
 
         return min_lon, min_lat, max_lon, max_lat
 
+    @staticmethod
+    def _split_bbox(coords) -> list[tuple[float, float, float, float]]:
+        """A box crossing the antimeridian as two boxes, one on each side"""
+        min_lon, min_lat, max_lon, max_lat = coords
+        if min_lon < max_lon:
+            return [coords]
+        return [(min_lon, min_lat, 180.0, max_lat), (-180.0, min_lat, max_lon, max_lat)]
+
+
+class PlaceHeatmapFilter(BboxSearchFilter):
+    """Bounding box and grid of a density heatmap"""
+
+    DEFAULT_RESOLUTION = 64
+    MAX_RESOLUTION = 256
+    MAX_CELLS = 65536
+
+    def filter_queryset(self, queryset):
+        queryset = django_filters.FilterSet.filter_queryset(self, queryset)
+        params = self.request.query_params
+
+        bbox_str = params.get("in_bbox")
+        if not bbox_str:
+            raise ParseError("The 'in_bbox' parameter is mandatory")
+        try:
+            min_lon, min_lat, max_lon, max_lat = self._parse_bbox(bbox_str)
+        except (ValueError, IndexError) as err:
+            raise ParseError(f"Incorrect format 'in_bbox': {str(err)}") from err
+        if min_lon > max_lon:
+            raise ParseError("Heatmap boxes cannot cross the antimeridian")
+
+        resolution = self._parse_resolution(params.get("resolution"))
+        # Power of two sizes put nearby boxes on the same grid, so the
+        # aligned box and the response repeat and cache well
+        self.cell_size = 2.0 ** round(math.log2((max_lon - min_lon) / resolution))
+        self.bbox = (
+            max(self._align(min_lon, -0.5), -180.0),
+            max(self._align(min_lat, -0.5), -90.0),
+            min(self._align(max_lon, 0.5), 180.0),
+            min(self._align(max_lat, 0.5), 90.0),
+        )
+
+        columns = (self.bbox[2] - self.bbox[0]) / self.cell_size
+        rows = (self.bbox[3] - self.bbox[1]) / self.cell_size
+        if columns * rows > self.MAX_CELLS:
+            raise ParseError("Too many cells, use a lower 'resolution'")
+
+        return queryset.filter(location__bboverlaps=Polygon.from_bbox(self.bbox))
+
+    def _align(self, value: float, edge: float) -> float:
+        """Outer edge of the ST_SnapToGrid cell, centered on a grid point"""
+        return (math.floor(value / self.cell_size + 0.5) + edge) * self.cell_size
+
+    def _parse_resolution(self, value) -> int:
+        if value is None:
+            return self.DEFAULT_RESOLUTION
+        try:
+            resolution = int(value)
+        except ValueError as err:
+            raise ParseError("'resolution' must be an integer") from err
+        if not (1 <= resolution <= self.MAX_RESOLUTION):
+            raise ParseError(
+                f"'resolution' should be between 1 and {self.MAX_RESOLUTION}"
+            )
+        return resolution
+
 
 class PlaceStatusFilter(django_filters.FilterSet):
     """Filter by place status (for admins/moderators)"""
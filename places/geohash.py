@@ -0,0 +1,149 @@
+"""
+Geohash cells of places.
+
+Place.geohash holds the full-precision geohash of the location. Every prefix
+of it is the cell of the place at a coarser resolution (1 character ≈ 5000
+km, 4 ≈ 39 km, 6 ≈ 1.2 km, 8 ≈ 38 m), so grouping by `Left("geohash", n)`
+clusters places and `geohash__startswith` selects a cell through the btree
+index. `covering_cells` turns a bounding box into a small set of prefixes
+for pre-filtering searches before the exact geometry check.
+"""
+
+import math
+
+from django.db.models import Q
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+PRECISION = 12
+
+
+def encode(lon: float, lat: float, precision: int = PRECISION) -> str:
+    """
+    Geohash of the point, identical to PostGIS ST_GeoHash: a point on the
+    line halving an interval belongs to the lower half.
+    """
+    lon_range, lat_range = [-180.0, 180.0], [-90.0, 90.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, lon) if even else (lat_range, lat)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate > middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def zorder(lon: float, lat: float) -> int:
+    """
+    64-bit Z-order key of the point. Bits alternate longitude and latitude
+    as in a geohash, so the top 5n bits are the geohash of precision n and
+    sorting by the key keeps places of a cell next to each other.
+    """
+    # Like encode(), points on a boundary belong to the lower cell
+    x = max(math.ceil((lon + 180) / 360 * 2**32) - 1, 0)
+    y = max(math.ceil((lat + 90) / 180 * 2**32) - 1, 0)
+    key = 0
+    for bit in range(31, -1, -1):
+        key = (key << 2) | ((x >> bit) & 1) << 1 | ((y >> bit) & 1)
+    return key
+
+
+def zorder_range(cell: str) -> tuple[int, int]:
+    """Z-order keys [low, high) of the points in a geohash cell"""
+    value = 0
+    for char in cell:
+        value = (value << 5) | BASE32.index(char)
+    shift = 64 - 5 * len(cell)
+    return value << shift, (value + 1) << shift
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """(width, height) in degrees of a cell at the precision"""
+    lon_bits = math.ceil(5 * precision / 2)
+    lat_bits = 5 * precision // 2
+    return 360 / 2**lon_bits, 180 / 2**lat_bits
+
+
+def _span(low: float, high: float, origin: float, size: float) -> range:
+    """Indexes of the cells holding values in [low, high], as encode() assigns"""
+    first = max(math.ceil((low - origin) / size) - 1, 0)
+    return range(first, max(math.ceil((high - origin) / size) - 1, 0) + 1)
+
+
+def covering_cells(
+    min_lon: float, min_lat: float, max_lon: float, max_lat: float, max_cells: int = 32
+) -> list[str]:
+    """
+    Geohash prefixes of the finest precision whose cells cover the box
+    with at most `max_cells` cells. Empty if even one-character cells
+    need more, the box then is better served by the spatial index alone.
+    """
+    best = None
+    for precision in range(1, PRECISION + 1):
+        if box_cell_count(min_lon, min_lat, max_lon, max_lat, precision) > max_cells:
+            break
+        best = precision
+    if best is None:
+        return []
+    return box_cells(min_lon, min_lat, max_lon, max_lat, best)
+
+
+def box_cell_count(
+    min_lon: float, min_lat: float, max_lon: float, max_lat: float, precision: int
+) -> int:
+    """Upper bound of len(box_cells(...)), without building them"""
+    width, height = cell_size(precision)
+    columns = _span(min_lon, max_lon, -180, width)
+    rows = _span(min_lat, max_lat, -90, height)
+    return len(columns) * len(rows)
+
+
+def box_cells(
+    min_lon: float, min_lat: float, max_lon: float, max_lat: float, precision: int
+) -> list[str]:
+    """Cells of the precision that cover the box"""
+    width, height = cell_size(precision)
+    return sorted(
+        {
+            encode(
+                -180 + (column + 0.5) * width,
+                -90 + (row + 0.5) * height,
+                precision,
+            )
+            for column in _span(min_lon, max_lon, -180, width)
+            # Cells at the edge of the map
+            if 0 <= column < 360 / width
+            for row in _span(min_lat, max_lat, -90, height)
+            if 0 <= row < 180 / height
+        }
+    )
+
+
+def radius_cells(lon: float, lat: float, radius_km: float, **kwargs) -> list[str]:
+    """Covering cells of the circle's bounding box, empty if it wraps around"""
+    # Slightly less than a degree of latitude on the sphere, errs on the wide side
+    lat_delta = radius_km / 111.0
+    if abs(lat) + lat_delta >= 90:
+        return []
+    lon_delta = lat_delta / math.cos(math.radians(abs(lat) + lat_delta))
+    if lon - lon_delta < -180 or lon + lon_delta > 180:
+        return []
+    return covering_cells(
+        lon - lon_delta, lat - lat_delta, lon + lon_delta, lat + lat_delta, **kwargs
+    )
+
+
+def cells_q(cells: list[str], field: str = "geohash") -> Q:
+    """Matches rows in any of the cells, each prefix is an index range scan"""
+    condition = Q()
+    for cell in cells:
+        condition |= Q(**{f"{field}__startswith": cell})
+    return condition
@@ -0,0 +1,29 @@
+import os
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from GeolocationAPI.prefork import shared_path
+from places.snapshot import SNAPSHOT_FILE, write_snapshot
+
+
+class Command(BaseCommand):
+    help = "Writes published places to the memory-mapped snapshot workers read"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output", help=f"Path of the snapshot, SHARED_DATA_DIR/{SNAPSHOT_FILE}"
+        )
+
+    def handle(self, *args, **options):
+        path = options["output"] or shared_path(SNAPSHOT_FILE)
+        start = perf_counter()
+        count = write_snapshot(path)
+        elapsed = perf_counter() - start
+        size = os.path.getsize(path)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {count} places to {path} ({size / 1024 / 1024:.1f} MB)"
+                f" in {elapsed:.1f}s"
+            )
+        )
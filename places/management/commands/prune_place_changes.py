@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from places.changes import prune
+
+
+class Command(BaseCommand):
+    help = "Deletes place changes older than the retention (run e.g. daily)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=None, help="PLACE_CHANGE_RETENTION_DAYS"
+        )
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        days = options["days"] or settings.PLACE_CHANGE_RETENTION_DAYS
+        deleted = prune(days, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} place changes"))
@@ -0,0 +1,135 @@
+import io
+import random
+from datetime import timedelta
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from places.geohash import encode as encode_geohash
+from places.models import Place, PlaceStatus
+from places.seeding import DISTRIBUTIONS, generate_points
+
+LOREM = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua. Ut enim ad minim veniam, "
+    "quis nostrud exercitation ullamco laboris nisi ut aliquip ex ea commodo "
+    "consequat. Duis aute irure dolor in reprehenderit in voluptate velit esse "
+    "cillum dolore eu fugiat nulla pariatur. Excepteur sint occaecat cupidatat non "
+    "proident, sunt in culpa qui officia deserunt mollit anim id est laborum."
+)
+
+
+class Command(BaseCommand):
+    help = "Bulk-loads synthetic places with COPY (1k to 10M rows) for benchmarks"
+
+    COLUMNS = (
+        "name",
+        "description",
+        "location",
+        "geohash",
+        "address",
+        "city",
+        "country",
+        "status",
+        "created_at",
+        "updated_at",
+        "created_by_id",
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("count", type=int, help="Number of places to create")
+        parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="cities")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--status", choices=PlaceStatus.values, default=PlaceStatus.PUBLISHED
+        )
+        parser.add_argument("--owner-email", help="Existing user set as the author")
+        parser.add_argument(
+            "--truncate", action="store_true", help="Remove all places first"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100_000,
+            help="Rows per COPY chunk (psycopg2 only)",
+        )
+
+    def handle(self, *args, **options):
+        if options["count"] <= 0:
+            raise CommandError("count must be positive")
+
+        owner_id = None
+        if options["owner_email"]:
+            try:
+                owner_id = CustomUser.objects.get(email=options["owner_email"]).pk
+            except CustomUser.DoesNotExist as err:
+                raise CommandError(f"No user {options['owner_email']}") from err
+
+        table = Place._meta.db_table
+        copy_sql = f"COPY {table} ({', '.join(self.COLUMNS)}) FROM STDIN"
+        rows = self._rows(options, owner_id)
+        start = perf_counter()
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            if options["truncate"]:
+                cursor.execute(f"TRUNCATE {table} RESTART IDENTITY")
+            if is_psycopg3:
+                with cursor.cursor.copy(copy_sql) as copy:
+                    for row in rows:
+                        copy.write_row(row)
+            else:
+                self._copy_psycopg2(cursor.cursor, copy_sql, rows, options)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {table}")
+
+        elapsed = perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {options['count']} places ({options['distribution']})"
+                f" in {elapsed:.1f}s ({options['count'] / elapsed:,.0f} rows/s)"
+            )
+        )
+
+    def _rows(self, options, owner_id):
+        rng = random.Random(options["seed"] + 1)
+        now = timezone.now()
+        points = generate_points(
+            options["count"], options["distribution"], options["seed"]
+        )
+        for index, (lon, lat, city, country) in enumerate(points):
+            created_at = now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+            yield (
+                f"{city or 'Place'} #{index}",
+                LOREM[: rng.randint(0, len(LOREM))],
+                f"SRID=4326;POINT({lon:.7f} {lat:.7f})",
+                encode_geohash(round(lon, 7), round(lat, 7)),
+                "",
+                city,
+                country,
+                options["status"],
+                created_at,
+                created_at,
+                owner_id,
+            )
+
+    def _copy_psycopg2(self, cursor, copy_sql, rows, options):
+        """COPY in chunks, psycopg2 has no incremental row writer"""
+        buffer, size = io.StringIO(), 0
+        for row in rows:
+            buffer.write(
+                "\t".join(r"\N" if value is None else str(value) for value in row)
+                + "\n"
+            )
+            size += 1
+            if size == options["batch_size"]:
+                buffer.seek(0)
+                cursor.copy_expert(copy_sql, buffer)
+                buffer, size = io.StringIO(), 0
+        if size:
+            buffer.seek(0)
+            cursor.copy_expert(copy_sql, buffer)
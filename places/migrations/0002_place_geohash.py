@@ -0,0 +1,48 @@
+from django.db import migrations, models
+
+BATCH_SIZE = 50_000
+
+
+def backfill_geohash(apps, schema_editor):
+    """Fills the column in pk ranges with PostGIS, each batch commits"""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM places_place")
+        last_id = cursor.fetchone()[0]
+        for start in range(0, last_id, BATCH_SIZE):
+            cursor.execute(
+                "UPDATE places_place SET geohash = ST_GeoHash(location, 12)"
+                " WHERE id > %s AND id <= %s AND location IS NOT NULL",
+                [start, start + BATCH_SIZE],
+            )
+
+
+class Migration(migrations.Migration):
+    # Batches of the backfill are committed one by one
+    atomic = False
+
+    dependencies = [
+        ("places", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="place",
+            name="geohash",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text="Geohash of the location, its prefixes are coarser cells.",
+                max_length=12,
+                verbose_name="Geohash",
+            ),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="place",
+            index=models.Index(
+                fields=["geohash"],
+                name="places_place_geohash_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+import django.contrib.gis.db.models.fields
+import django.contrib.postgres.indexes
+import django.db.models.functions.comparison
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("places", "0002_place_geohash"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="place",
+            index=django.contrib.postgres.indexes.GistIndex(
+                django.db.models.functions.comparison.Cast(
+                    "location",
+                    output_field=django.contrib.gis.db.models.fields.PointField(
+                        geography=True, srid=4326
+                    ),
+                ),
+                name="places_place_location_geog_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,83 @@
+import django.contrib.gis.db.models.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("places", "0003_place_location_geog_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlaceChange",
+            fields=[
+                (
+                    "seq",
+                    models.BigAutoField(
+                        primary_key=True, serialize=False, verbose_name="Sequence"
+                    ),
+                ),
+                (
+                    "place_id",
+                    models.BigIntegerField(db_index=True, verbose_name="Place ID"),
+                ),
+                (
+                    "op",
+                    models.CharField(
+                        choices=[
+                            ("create", "Create"),
+                            ("update", "Update"),
+                            ("delete", "Delete"),
+                        ],
+                        max_length=10,
+                        verbose_name="Operation",
+                    ),
+                ),
+                (
+                    "status_before",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("draft", "Draft"),
+                            ("moderating", "Moderating"),
+                            ("published", "Published"),
+                            ("rejected", "Rejected"),
+                            ("archived", "Archived"),
+                        ],
+                        max_length=20,
+                        verbose_name="Status before",
+                    ),
+                ),
+                (
+                    "status_after",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("draft", "Draft"),
+                            ("moderating", "Moderating"),
+                            ("published", "Published"),
+                            ("rejected", "Rejected"),
+                            ("archived", "Archived"),
+                        ],
+                        max_length=20,
+                        verbose_name="Status after",
+                    ),
+                ),
+                (
+                    "location",
+                    django.contrib.gis.db.models.fields.PointField(
+                        null=True, srid=4326, verbose_name="Coordinates"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Recorded"),
+                ),
+            ],
+            options={
+                "verbose_name": "Place change",
+                "verbose_name_plural": "Place changes",
+                "ordering": ["seq"],
+            },
+        ),
+    ]
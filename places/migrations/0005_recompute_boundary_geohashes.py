@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("places", "0004_placechange"),
+    ]
+
+    # Places saved on a cell boundary before the encoder matched ST_GeoHash
+    # hold the key of the neighbouring cell
+    operations = [
+        migrations.RunSQL(
+            "UPDATE places_place SET geohash = ST_GeoHash(location, 12)"
+            " WHERE location IS NOT NULL"
+            " AND geohash IS DISTINCT FROM ST_GeoHash(location, 12)",
+            migrations.RunSQL.noop,
+        ),
+    ]
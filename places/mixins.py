@@ -0,0 +1,133 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ParseError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from places.fields import parse_precision
+from places.renderers import (
+    ColumnarJSONRenderer,
+    GeoJSONStreamRenderer,
+    MessagePackRenderer,
+)
+
+
+class CoordinatePrecisionMixin:
+    """`?precision=` sets the decimals of the coordinates in responses"""
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        precision = parse_precision(self.request.query_params)
+        if precision is not None:
+            context["precision"] = precision
+        return context
+
+
+class SparseFieldsMixin:
+    """
+    DRF view mixin for `?fields=name,city` on the `sparse_fields_actions`.
+    Only the requested properties are serialized and only their columns
+    loaded, id and coordinates are always returned. Adds the compact
+    columnar JSON and MessagePack renderers.
+    """
+
+    sparse_fields_actions = ("list",)
+    renderer_classes = [
+        *api_settings.DEFAULT_RENDERER_CLASSES,
+        ColumnarJSONRenderer,
+        MessagePackRenderer,
+    ]
+
+    def get_sparse_fields(self) -> list[str] | None:
+        if getattr(self, "action", None) not in self.sparse_fields_actions:
+            return None
+        value = self.request.query_params.get("fields")
+        if not value:
+            return None
+
+        fields = [name.strip() for name in value.split(",") if name.strip()]
+        meta = self.get_serializer_class().Meta
+        # The geometry is always returned, asking for it is allowed
+        allowed = {*meta.fields, getattr(meta, "geo_field", None)}
+        unknown = sorted(set(fields) - allowed)
+        if unknown:
+            raise ParseError(f"Unknown fields: {', '.join(unknown)}")
+        return fields
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs.setdefault("fields", fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def prune_queryset(self, queryset):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            if "created_by" not in fields:
+                queryset = queryset.select_related(None)
+            queryset = queryset.only(*self.get_serializer_class().columns_for(fields))
+        return queryset
+
+    def paginate_queryset(self, queryset):
+        return super().paginate_queryset(self.prune_queryset(queryset))
+
+
+async def _async_chunks(chunks):
+    """
+    Iterates a sync generator in the request's sync thread, where its
+    database connection lives. An ASGI server reads a sync iterator into
+    a list before sending anything.
+    """
+    pull = sync_to_async(next, thread_sensitive=True)
+    try:
+        while (chunk := await pull(chunks, None)) is not None:
+            yield chunk
+    finally:
+        # Closes the server-side cursor when the client goes away
+        await sync_to_async(chunks.close, thread_sensitive=True)()
+
+
+class StreamingListMixin(SparseFieldsMixin):
+    """
+    Pages of at least STREAMING_MIN_PAGE_SIZE places rendered as JSON are
+    written feature by feature from a server-side cursor instead of being
+    serialized in memory first.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.list_response(self.filter_queryset(self.get_queryset()))
+
+    def list_response(self, queryset):
+        if self._streams():
+            return self.streaming_response(queryset)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+    def _streams(self) -> bool:
+        if self.paginator is None or self.request.accepted_renderer.format != "json":
+            return False
+        page_size = self.paginator.get_page_size(self.request)
+        return bool(page_size) and page_size >= settings.STREAMING_MIN_PAGE_SIZE
+
+    def streaming_response(self, queryset):
+        page = self.paginator.paginate_queryset_lazily(
+            self.prune_queryset(queryset), self.request, view=self
+        )
+        envelope = self.paginator.get_paginated_response(None).data
+        serializer = self.get_serializer(many=True).child
+        # Rows are read after the view returned, when the router no longer
+        # knows the database chosen for this request
+        rows = page.using(page.db).iterator(chunk_size=settings.STREAMING_CHUNK_SIZE)
+
+        renderer = GeoJSONStreamRenderer()
+        content = renderer.stream(envelope, map(serializer.to_representation, rows))
+        if isinstance(self.request._request, ASGIRequest):
+            content = _async_chunks(content)
+        return StreamingHttpResponse(content, content_type=renderer.media_type)
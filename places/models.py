@@ -1,9 +1,21 @@
 from django.conf import settings
 from django.contrib.gis.db import models
+from django.contrib.postgres.indexes import GistIndex
+from django.db.models.functions import Cast
 
+from places.geohash import PRECISION as GEOHASH_PRECISION
+from places.geohash import encode as encode_geohash
 from places.utils import place_photo_path
 
 
+def location_geography():
+    """
+    Place.location as geography, for distances in meters. Queries must use
+    this exact expression to be served by places_place_location_geog_idx.
+    """
+    return Cast("location", models.PointField(geography=True, srid=4326))
+
+
 class PlaceStatus(models.TextChoices):
     DRAFT = "draft", "Draft"
     MODERATING = "moderating", "Moderating"
@@ -23,6 +35,13 @@ class Place(models.Model):
     location = models.PointField(
         "Coordinates", srid=4326, help_text="Geographic coordinates (point)."
     )
+    geohash = models.CharField(
+        "Geohash",
+        max_length=GEOHASH_PRECISION,
+        blank=True,
+        editable=False,
+        help_text="Geohash of the location, its prefixes are coarser cells.",
+    )
     photo = models.ImageField(
         "Photo",
         upload_to=place_photo_path,
@@ -80,6 +99,58 @@ class Place(models.Model):
         verbose_name = "Place"
         verbose_name_plural = "Places"
         ordering = ["-created_at"]
+        indexes = [
+            # pattern_ops lets LIKE 'prefix%' (geohash__startswith) use the index
+            models.Index(
+                fields=["geohash"],
+                name="places_place_geohash_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+            GistIndex(location_geography(), name="places_place_location_geog_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name}"
+
+    def save(self, *args, **kwargs):
+        # QuerySet.update() of the location has to set the geohash itself
+        self.geohash = (
+            encode_geohash(self.location.x, self.location.y) if self.location else ""
+        )
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "location" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "geohash"}
+        super().save(*args, **kwargs)
+
+
+class PlaceChangeOp(models.TextChoices):
+    CREATE = "create", "Create"
+    UPDATE = "update", "Update"
+    DELETE = "delete", "Delete"
+
+
+class PlaceChange(models.Model):
+    """
+    Append-only log of place mutations, see places.changes. The primary key
+    is the sequence; place_id is not a foreign key, so deletes are kept.
+    """
+
+    seq = models.BigAutoField("Sequence", primary_key=True)
+    place_id = models.BigIntegerField("Place ID", db_index=True)
+    op = models.CharField("Operation", max_length=10, choices=PlaceChangeOp.choices)
+    status_before = models.CharField(
+        "Status before", max_length=20, choices=PlaceStatus.choices, blank=True
+    )
+    status_after = models.CharField(
+        "Status after", max_length=20, choices=PlaceStatus.choices, blank=True
+    )
+    location = models.PointField("Coordinates", srid=4326, null=True)
+    created_at = models.DateTimeField("Recorded", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Place change"
+        verbose_name_plural = "Place changes"
+        ordering = ["seq"]
+
+    def __str__(self):
+        return f"#{self.seq} {self.op} place {self.place_id}"
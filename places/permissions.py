@@ -13,4 +13,4 @@ class IsOwnerOrModerator(permissions.BasePermission):
 
         if not request.user.is_authenticated:
             return False
-        return obj.created_by == request.user or request.user.is_moderator
+        return obj.created_by_id == request.user.pk or request.user.is_moderator
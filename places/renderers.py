@@ -0,0 +1,90 @@
+"""
+Compact alternatives to GeoJSON for list and search responses, chosen by
+the Accept header or `?format=`.
+"""
+
+from collections.abc import Iterable, Iterator
+from itertools import islice
+
+import msgpack
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from GeolocationAPI.renderers import ORJSONRenderer
+
+
+def to_columns(features: list[dict]) -> dict:
+    """Features as parallel arrays: id, lon, lat and one array per property"""
+    columns = {"id": [], "lon": [], "lat": []}
+    names = []
+    for feature in features:
+        for name in feature.get("properties") or {}:
+            if name not in columns:
+                columns[name] = []
+                names.append(name)
+
+    for feature in features:
+        geometry = feature.get("geometry")
+        lon, lat = geometry["coordinates"][:2] if geometry else (None, None)
+        properties = feature.get("properties") or {}
+        columns["id"].append(feature.get("id"))
+        columns["lon"].append(lon)
+        columns["lat"].append(lat)
+        for name in names:
+            columns[name].append(properties.get(name))
+    return columns
+
+
+class ColumnarJSONRenderer(ORJSONRenderer):
+    """
+    GeoJSON FeatureCollections as parallel arrays, property names are
+    written once per response instead of once per feature. Other payloads
+    (errors, single objects) are rendered as plain JSON.
+    """
+
+    media_type = "application/vnd.geolocation.columnar+json"
+    format = "columnar"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            results = data.get("results")
+            if isinstance(results, dict) and "features" in results:
+                data = {**data, "results": to_columns(results["features"])}
+            elif data.get("type") == "FeatureCollection":
+                data = to_columns(data["features"])
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class GeoJSONStreamRenderer(ORJSONRenderer):
+    """
+    Writes a paginated FeatureCollection incrementally, features are
+    encoded in batches as they are read instead of as one document.
+    """
+
+    batch_size = 100
+
+    def stream(self, envelope: dict, features: Iterable[dict]) -> Iterator[bytes]:
+        empty = {**envelope, "results": {"type": "FeatureCollection", "features": []}}
+        head, tail = self.render(empty).rsplit(b"[]", 1)
+        yield head + b"["
+
+        features, separator = iter(features), b""
+        while batch := list(islice(features, self.batch_size)):
+            yield separator + b",".join(self.render(feature) for feature in batch)
+            separator = b","
+        yield b"]" + tail
+
+
+class MessagePackRenderer(BaseRenderer):
+    """The JSON structure of the response encoded as MessagePack"""
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        # Dates, decimals and lazy strings, the way the JSON renderer does
+        return msgpack.packb(data, default=JSONEncoder().default)
@@ -0,0 +1,72 @@
+"""Synthetic place datasets for benchmarks and load tests"""
+
+import math
+import random
+from collections.abc import Iterator
+
+# name, country, lon, lat, relative weight, spread (km)
+CITIES = [
+    ("Kraków", "Poland", 19.937, 50.0613, 3, 6),
+    ("Warszawa", "Poland", 21.0122, 52.2297, 5, 10),
+    ("Berlin", "Germany", 13.405, 52.52, 6, 12),
+    ("Paris", "France", 2.3522, 48.8566, 8, 10),
+    ("London", "United Kingdom", -0.1276, 51.5072, 9, 15),
+    ("Kyiv", "Ukraine", 30.5234, 50.4501, 4, 10),
+    ("Istanbul", "Türkiye", 28.9784, 41.0082, 6, 15),
+    ("Cairo", "Egypt", 31.2357, 30.0444, 5, 12),
+    ("Nairobi", "Kenya", 36.8219, -1.2921, 2, 8),
+    ("Mumbai", "India", 72.8777, 19.076, 8, 15),
+    ("Tokyo", "Japan", 139.6917, 35.6895, 10, 20),
+    ("Sydney", "Australia", 151.2093, -33.8688, 4, 15),
+    ("Auckland", "New Zealand", 174.7633, -36.8485, 2, 8),
+    ("Suva", "Fiji", 178.4419, -18.1416, 1, 5),
+    ("Anchorage", "United States", -149.9003, 61.2181, 1, 8),
+    ("New York", "United States", -74.006, 40.7128, 10, 15),
+    ("Mexico City", "Mexico", -99.1332, 19.4326, 7, 15),
+    ("São Paulo", "Brazil", -46.6333, -23.5505, 7, 15),
+    ("Reykjavík", "Iceland", -21.8174, 64.1265, 1, 5),
+]
+
+DISTRIBUTIONS = ("cities", "uniform")
+
+KM_PER_DEGREE = 111.32
+
+
+def _wrap_lon(lon: float) -> float:
+    return (lon + 180.0) % 360.0 - 180.0
+
+
+def _clamp_lat(lat: float) -> float:
+    return max(-90.0, min(90.0, lat))
+
+
+def random_city_point(rng: random.Random) -> tuple[float, float, str, str]:
+    """Point normally distributed around a weighted random city"""
+    name, country, lon, lat, _, spread_km = rng.choices(
+        CITIES, weights=[city[4] for city in CITIES]
+    )[0]
+    dlat = rng.gauss(0, spread_km) / KM_PER_DEGREE
+    dlon = rng.gauss(0, spread_km) / (
+        KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01)
+    )
+    return _wrap_lon(lon + dlon), _clamp_lat(lat + dlat), name, country
+
+
+def random_uniform_point(rng: random.Random) -> tuple[float, float, str, str]:
+    """Point uniformly distributed over the sphere (not over lon/lat)"""
+    lon = rng.uniform(-180.0, 180.0)
+    lat = math.degrees(math.asin(rng.uniform(-1.0, 1.0)))
+    return lon, lat, "", ""
+
+
+def generate_points(
+    count: int, distribution: str = "cities", seed: int = 0
+) -> Iterator[tuple[float, float, str, str]]:
+    """Yields (lon, lat, city, country) tuples, reproducible for a given seed"""
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution: {distribution}")
+
+    rng = random.Random(seed)
+    point = random_city_point if distribution == "cities" else random_uniform_point
+    for _ in range(count):
+        yield point(rng)
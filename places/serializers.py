@@ -1,12 +1,19 @@
+from django.conf import settings
+from django.contrib.gis.geos import LineString
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
+from rest_framework_gis.fields import GeometryField
 from rest_framework_gis.serializers import GeoFeatureModelSerializer
 
 from accounts.serializers import UserDetailSerializer, UserPublicSerializer
-from places.models import Place
+from places.fields import CoordinatesField
+from places.models import Place, PlaceChange
+from places.services import GeospatialService
+from places.utils import decode_polyline
 
 
 class PlaceSerializer(GeoFeatureModelSerializer):
+    location = CoordinatesField()
     created_by = serializers.SerializerMethodField(read_only=True)
     distance = serializers.SerializerMethodField(read_only=True)
 
@@ -33,13 +40,33 @@ class PlaceSerializer(GeoFeatureModelSerializer):
             "updated_at": {"read_only": True},
         }
 
+    # Model columns read by fields that are not columns of the same name
+    field_columns = {"created_by": ("created_by",), "distance": ()}
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            keep = {"id", self.Meta.geo_field, *fields}
+            for name in set(self.fields) - keep:
+                self.fields.pop(name)
+
+    @classmethod
+    def columns_for(cls, fields) -> list[str]:
+        """Columns to load for `fields`, for QuerySet.only()"""
+        columns = ["id", cls.Meta.geo_field]
+        for name in fields:
+            columns.extend(cls.field_columns.get(name, (name,)))
+        return list(dict.fromkeys(columns))
+
     @extend_schema_field(serializers.FloatField(allow_null=True))
     def get_distance(self, obj):
         """
         Returns the distance to the object in meters, if calculated.
         """
         if hasattr(obj, "distance"):
-            return round(obj.distance.m, 2)
+            # 2 decimals at the default 6 of the coordinates
+            precision = self.context.get("precision", settings.COORDINATE_PRECISION)
+            return round(obj.distance.m, max(precision - 4, 0))
         return None
 
     @extend_schema_field(UserDetailSerializer)
@@ -55,3 +82,120 @@ class PlaceSerializer(GeoFeatureModelSerializer):
             return UserDetailSerializer(obj.created_by).data
 
         return UserPublicSerializer(obj.created_by).data
+
+
+class PlacePublicSerializer(PlaceSerializer):
+    """Place representation for anonymous readers, used by the async views"""
+
+    @extend_schema_field(UserPublicSerializer)
+    def get_created_by(self, obj):
+        if not obj.created_by:
+            return None
+        return UserPublicSerializer(obj.created_by).data
+
+
+class PolygonSearchSerializer(serializers.Serializer):
+    """GeoJSON Polygon or MultiPolygon to search places in"""
+
+    geometry = GeometryField()
+
+    def validate_geometry(self, value):
+        if value.geom_type not in ("Polygon", "MultiPolygon"):
+            raise serializers.ValidationError("Expected a Polygon or MultiPolygon.")
+        if value.empty:
+            raise serializers.ValidationError("The polygon is empty.")
+        if value.num_coords > settings.POLYGON_MAX_VERTICES:
+            raise serializers.ValidationError(
+                f"The polygon has more than {settings.POLYGON_MAX_VERTICES} vertices."
+            )
+        if value.srid is None:
+            value.srid = 4326
+        elif value.srid != 4326:
+            value.transform(4326)
+
+        min_lon, min_lat, max_lon, max_lat = value.extent
+        if min_lon < -180 or max_lon > 180 or min_lat < -90 or max_lat > 90:
+            raise serializers.ValidationError("Coordinates are out of range.")
+
+        if not value.valid:
+            reason = value.valid_reason
+            # Self-intersections and the like, repaired the way PostGIS does
+            value = value.make_valid()
+            if value.geom_type not in ("Polygon", "MultiPolygon"):
+                raise serializers.ValidationError(f"The polygon is invalid: {reason}")
+        return value
+
+
+class PlaceChangeSerializer(serializers.ModelSerializer):
+    location = CoordinatesField(allow_null=True)
+
+    class Meta:
+        model = PlaceChange
+        fields = (
+            "seq",
+            "place_id",
+            "op",
+            "status_before",
+            "status_after",
+            "location",
+            "created_at",
+        )
+
+
+class ChangeFeedQuerySerializer(serializers.Serializer):
+    """Query parameters of the change feed"""
+
+    since = serializers.IntegerField(min_value=0, default=0)
+    limit = serializers.IntegerField(min_value=1, required=False)
+
+    def validate_limit(self, value):
+        if value > settings.PLACE_CHANGE_MAX_LIMIT:
+            raise serializers.ValidationError(
+                f"Ensure this value is less than or equal to "
+                f"{settings.PLACE_CHANGE_MAX_LIMIT}."
+            )
+        return value
+
+
+class CorridorSearchSerializer(serializers.Serializer):
+    """Route as an encoded polyline or a GeoJSON LineString, and a distance"""
+
+    polyline = serializers.CharField(required=False)
+    precision = serializers.ChoiceField(choices=[5, 6], default=5)
+    line = GeometryField(required=False)
+    distance = serializers.FloatField(
+        default=100, help_text="Meters from the route (max 5000)"
+    )
+
+    def validate_distance(self, value):
+        is_valid, error = GeospatialService.validate_corridor_width(value)
+        if not is_valid:
+            raise serializers.ValidationError(error)
+        return value
+
+    def validate(self, attrs):
+        if ("polyline" in attrs) == ("line" in attrs):
+            raise serializers.ValidationError("Provide either 'polyline' or 'line'.")
+
+        if "polyline" in attrs:
+            try:
+                points = decode_polyline(attrs.pop("polyline"), attrs["precision"])
+            except ValueError as err:
+                raise serializers.ValidationError({"polyline": str(err)}) from err
+        else:
+            line = attrs.pop("line")
+            if line.geom_type != "LineString":
+                raise serializers.ValidationError({"line": "Expected a LineString."})
+            points = line.coords
+
+        if not 2 <= len(points) <= settings.ROUTE_MAX_POINTS:
+            raise serializers.ValidationError(
+                f"The route should have 2 to {settings.ROUTE_MAX_POINTS} points."
+            )
+        for lon, lat in points:
+            is_valid, error = GeospatialService.validate_coordinates(lat, lon)
+            if not is_valid:
+                raise serializers.ValidationError(error)
+
+        attrs["route"] = LineString(points, srid=4326)
+        return attrs
@@ -1,12 +1,17 @@
 import io
 
+from django.conf import settings
+from django.contrib.gis.db.models.functions import Distance, GeoFunc, SnapToGrid
+from django.contrib.gis.geos import GEOSGeometry, LineString
+from django.contrib.gis.measure import D
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import InMemoryUploadedFile
-from django.db.models import QuerySet
-from PIL import Image
+from django.db import transaction
+from django.db.models import Count, FloatField, Func, QuerySet
 
 from accounts.models import CustomUser
-from places.models import Place, PlaceStatus
+from places.changes import record_change
+from places.models import Place, PlaceChangeOp, PlaceStatus, location_geography
 
 
 class PlaceValidationService:
@@ -24,6 +29,9 @@ class PlaceValidationService:
                 f"The file size must not exceed {cls.MAX_IMAGE_SIZE // (1024 * 1024)}MB"
             )
 
+        # Pillow is only needed by uploads, not imported by every worker
+        from PIL import Image
+
         try:
             img = Image.open(photo)
             if img.format not in cls.ALLOWED_IMAGE_FORMATS:
@@ -51,6 +59,8 @@ class PlaceImageProcessor:
     @staticmethod
     def optimize_image(photo: InMemoryUploadedFile) -> InMemoryUploadedFile:
         """Image Optimization"""
+        from PIL import Image
+
         img = Image.open(photo)
 
         output = io.BytesIO()
@@ -72,7 +82,7 @@ class PlaceService:
 
     @staticmethod
     def create_place(serializer, user: CustomUser) -> Place:
-        """Creating a new place"""
+        """Creating a new place (user may be a token-backed ClaimsUser)"""
         if "photo" in serializer.validated_data:
             PlaceValidationService.validate_photo(serializer.validated_data["photo"])
 
@@ -80,7 +90,31 @@ class PlaceService:
                 serializer.validated_data["photo"]
             )
 
-        return serializer.save(created_by=user, status=PlaceStatus.MODERATING)
+        with transaction.atomic():
+            place = serializer.save(
+                created_by_id=user.pk, status=PlaceStatus.MODERATING
+            )
+            record_change(place, PlaceChangeOp.CREATE)
+        return place
+
+    @staticmethod
+    def update_place(serializer) -> Place:
+        """Updating the place with the validated data"""
+        status_before = serializer.instance.status
+        with transaction.atomic():
+            place = serializer.save()
+            record_change(place, PlaceChangeOp.UPDATE, status_before)
+        return place
+
+    @staticmethod
+    def archive_place(place: Place) -> Place:
+        """Archiving instead of deleting, the place stays in the database"""
+        status_before = place.status
+        place.status = PlaceStatus.ARCHIVED
+        with transaction.atomic():
+            place.save()
+            record_change(place, PlaceChangeOp.UPDATE, status_before)
+        return place
 
     @staticmethod
     def update_photo(place: Place, photo: InMemoryUploadedFile) -> Place:
@@ -92,7 +126,9 @@ class PlaceService:
             place.photo.delete(save=False)
 
         place.photo = optimized_photo
-        place.save(update_fields=["photo", "updated_at"])
+        with transaction.atomic():
+            place.save(update_fields=["photo", "updated_at"])
+            record_change(place, PlaceChangeOp.UPDATE, place.status)
         return place
 
     @staticmethod
@@ -123,3 +159,115 @@ class GeospatialService:
         if not (0 < radius <= 1000):
             return False, "The radius should be between 0 and 1000 km"
         return True, ""
+
+    @staticmethod
+    def validate_corridor_width(distance: float) -> tuple[bool, str]:
+        """Route corridor half-width validation"""
+        if not (0 < distance <= 5000):
+            return False, "The distance should be between 0 and 5000 m"
+        return True, ""
+
+
+class HeatmapService:
+    """Density of places on a regular grid"""
+
+    @staticmethod
+    def aggregate(queryset: QuerySet[Place], cell_size: float) -> list[list]:
+        """[lon, lat, count] of every non-empty cell, lon/lat is its center"""
+        cell = SnapToGrid("location", cell_size)
+        rows = (
+            queryset.annotate(
+                cell_lon=Func(cell, function="ST_X", output_field=FloatField()),
+                cell_lat=Func(cell, function="ST_Y", output_field=FloatField()),
+            )
+            .values("cell_lon", "cell_lat")
+            .annotate(count=Count("pk"))
+            .order_by("cell_lat", "cell_lon")
+            .values_list("cell_lon", "cell_lat", "count")
+        )
+        return [[round(lon, 7), round(lat, 7), count] for lon, lat, count in rows]
+
+
+class PolygonSearchService:
+    """Places inside an arbitrary (multi)polygon"""
+
+    @staticmethod
+    def simplify(
+        polygon: GEOSGeometry, max_vertices: int
+    ) -> tuple[GEOSGeometry, float]:
+        """Topology preserving simplification to at most `max_vertices`"""
+        if polygon.num_coords <= max_vertices:
+            return polygon, 0.0
+        min_lon, min_lat, max_lon, max_lat = polygon.extent
+        size = max(max_lon - min_lon, max_lat - min_lat)
+        tolerance = size / 10000
+        simplified = polygon.simplify(tolerance, preserve_topology=True)
+        # Many-part polygons can stay above the limit, their rings do not vanish
+        while simplified.num_coords > max_vertices and tolerance < size:
+            tolerance *= 2
+            simplified = polygon.simplify(tolerance, preserve_topology=True)
+        return simplified, tolerance
+
+    @classmethod
+    def filter(
+        cls, queryset: QuerySet[Place], polygon: GEOSGeometry
+    ) -> QuerySet[Place]:
+        """
+        ST_Intersects checks the bbox index (&&) before the exact test.
+        Large polygons are simplified into an outline that the database
+        tests first, with few vertices, before the exact polygon. When the
+        outline holds at most POLYGON_MAX_CANDIDATES places, they are
+        checked against a prepared geometry here instead.
+        """
+        simplified, tolerance = cls.simplify(
+            polygon, settings.POLYGON_SIMPLIFY_VERTICES
+        )
+        if not tolerance:
+            return queryset.filter(location__intersects=polygon)
+
+        # Simplification moves the boundary by at most the tolerance, so
+        # the buffered outline contains every place of the original polygon.
+        # Mitred joins with one segment per quadrant add few vertices.
+        outline = simplified.buffer_with_style(tolerance, quadsegs=1, join_style=2)
+        prefiltered = queryset.filter(location__intersects=outline)
+        limit = settings.POLYGON_MAX_CANDIDATES
+        candidates = list(
+            prefiltered.order_by().values_list("pk", "location")[: limit + 1]
+        )
+        if len(candidates) > limit:
+            # Pages and counts are then served by the database alone
+            return prefiltered.filter(location__intersects=polygon)
+
+        prepared = polygon.prepared
+        return queryset.filter(
+            pk__in=[pk for pk, location in candidates if prepared.intersects(location)]
+        )
+
+
+class LineLocatePoint(GeoFunc):
+    """Position (0 to 1) along the line of its point closest to the geometry"""
+
+    output_field = FloatField()
+    arity = 2
+
+
+class CorridorSearchService:
+    """Places within a distance of a route"""
+
+    @staticmethod
+    def filter(
+        queryset: QuerySet[Place], route: LineString, distance_m: float
+    ) -> QuerySet[Place]:
+        """
+        One ST_DWithin query on geography, served by the geography index,
+        ordered by position along the route and then distance from it.
+        """
+        return (
+            queryset.alias(geography=location_geography())
+            .filter(geography__dwithin=(route, D(m=distance_m)))
+            .annotate(
+                route_position=LineLocatePoint(route, "location"),
+                distance=Distance("geography", route),
+            )
+            .order_by("route_position", "distance", "pk")
+        )
@@ -0,0 +1,212 @@
+"""
+Memory-mapped snapshot of published places.
+
+`manage.py build_places_snapshot` writes every published place to one
+binary file in SHARED_DATA_DIR, so workers get an in-process view of them
+without querying the whole table on boot. The file is a header followed by
+columns of 8-byte values, all in Z-order (geohash bit order), so the places
+of a geohash cell are one contiguous range:
+
+    header   magic, version, count, sequence of the last place change
+             included (places.changes) and size of the names section
+    ids      int64[count]
+    keys     uint64[count], Z-order key of the location
+    lons     float64[count]
+    lats     float64[count]
+    offsets  uint64[count + 1], start of each name in the names section
+    by_id    int64[count], positions sorted by id
+    names    UTF-8 names, back to back
+
+`PlacesSnapshot` reads the columns in place through memoryviews, nothing is
+copied. `PlacesIndex` maps the latest generation and overlays the places
+changed since its sequence.
+"""
+
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterator
+
+from django.db.models import F, FloatField, Func
+
+from GeolocationAPI.prefork import SharedFile, publish, shared_path
+from places.changes import changes_since, last_seq
+from places.geohash import covering_cells, zorder, zorder_range
+from places.models import Place, PlaceStatus
+
+SNAPSHOT_FILE = "places.snapshot"
+MAGIC = b"GEOPLSNP"
+# 2: the header holds a change sequence instead of an updated_at watermark
+VERSION = 2
+HEADER = struct.Struct("<8sH6xQqQ")
+
+
+def coordinates():
+    return {
+        "lon": Func(F("location"), function="ST_X", output_field=FloatField()),
+        "lat": Func(F("location"), function="ST_Y", output_field=FloatField()),
+    }
+
+
+def write_snapshot(path: str | None = None) -> int:
+    """Publishes a new snapshot of the published places, returns their count"""
+    ids, keys, lons, lats = array("q"), array("Q"), array("d"), array("d")
+    names = []
+    # Read first: rows changed while they are read are applied again later
+    seq = last_seq()
+    rows = (
+        Place.objects.filter(status=PlaceStatus.PUBLISHED)
+        .annotate(**coordinates())
+        .values_list("pk", "lon", "lat", "name")
+    )
+    for pk, lon, lat, name in rows.iterator(chunk_size=10000):
+        ids.append(pk)
+        keys.append(zorder(lon, lat))
+        lons.append(lon)
+        lats.append(lat)
+        names.append(name.encode())
+
+    order = sorted(range(len(ids)), key=keys.__getitem__)
+    offsets, position = array("Q", [0]), 0
+    for index in order:
+        position += len(names[index])
+        offsets.append(position)
+    by_id = array("q", sorted(range(len(order)), key=lambda i: ids[order[i]]))
+
+    def write(file):
+        file.write(HEADER.pack(MAGIC, VERSION, len(order), seq, position))
+        for column in (ids, keys, lons, lats):
+            file.write(array(column.typecode, (column[i] for i in order)))
+        file.write(offsets)
+        file.write(by_id)
+        file.writelines(names[index] for index in order)
+
+    publish(path or shared_path(SNAPSHOT_FILE), write)
+    return len(order)
+
+
+class PlacesSnapshot:
+    """Zero-copy view of a snapshot file, positions are in Z-order"""
+
+    def __init__(self, buffer):
+        magic, version, count, self.seq, names_size = HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} places snapshot")
+        view, offset = memoryview(buffer), HEADER.size
+        columns = []
+        for typecode, length in (
+            ("q", count),
+            ("Q", count),
+            ("d", count),
+            ("d", count),
+            ("Q", count + 1),
+            ("q", count),
+        ):
+            columns.append(view[offset : offset + 8 * length].cast(typecode))
+            offset += 8 * length
+        self.ids, self.keys, self.lons, self.lats, self.offsets, self.by_id = columns
+        self.names = view[offset : offset + names_size]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def name(self, position: int) -> str:
+        start, end = self.offsets[position], self.offsets[position + 1]
+        return str(self.names[start:end], "utf-8")
+
+    def find(self, pk: int) -> int | None:
+        """Position of the place, None if it is not in the snapshot"""
+        index = bisect_left(self.by_id, pk, key=self.ids.__getitem__)
+        if index < len(self.by_id) and self.ids[self.by_id[index]] == pk:
+            return self.by_id[index]
+        return None
+
+    def cell(self, cell: str) -> range:
+        """Positions of the places in a geohash cell"""
+        low, high = zorder_range(cell)
+        return range(bisect_left(self.keys, low), bisect_left(self.keys, high))
+
+    def within(
+        self, min_lon: float, min_lat: float, max_lon: float, max_lat: float
+    ) -> Iterator[int]:
+        """Positions of the places in the box"""
+        for cell in covering_cells(min_lon, min_lat, max_lon, max_lat) or [""]:
+            for position in self.cell(cell):
+                if (
+                    min_lon <= self.lons[position] <= max_lon
+                    and min_lat <= self.lats[position] <= max_lat
+                ):
+                    yield position
+
+
+class PlacesIndex:
+    """Published places of the mapped snapshot with later changes applied"""
+
+    def __init__(self, path: str | None = None):
+        self._file = SharedFile(path or shared_path(SNAPSHOT_FILE))
+        self._lock = threading.Lock()
+        self._mapping = None
+        self.snapshot: PlacesSnapshot | None = None
+        # pk: (lon, lat, name), None once it is no longer published
+        self.changes: dict[int, tuple[float, float, str] | None] = {}
+        self.seq = 0
+
+    def refresh(self) -> None:
+        """Maps a new snapshot generation and reads the changes since"""
+        with self._lock:
+            mapping = self._file.get()
+            if mapping is None:
+                raise FileNotFoundError(
+                    f"{self._file.path} missing, run `manage.py build_places_snapshot`"
+                )
+            if mapping is not self._mapping:
+                self.snapshot = PlacesSnapshot(mapping)
+                self._mapping = mapping
+                self.changes = {}
+                self.seq = self.snapshot.seq
+            self._apply_changes()
+
+    def _apply_changes(self) -> None:
+        # The current rows of the changed places, deleted ones are missing
+        changed = set()
+        for change in changes_since(self.seq):
+            changed.add(change.place_id)
+            self.seq = change.seq
+        changed = list(changed)
+        for start in range(0, len(changed), 1000):
+            pks = changed[start : start + 1000]
+            self.changes.update(dict.fromkeys(pks))
+            rows = (
+                Place.objects.filter(pk__in=pks, status=PlaceStatus.PUBLISHED)
+                .annotate(**coordinates())
+                .values_list("pk", "lon", "lat", "name")
+            )
+            for pk, lon, lat, name in rows:
+                self.changes[pk] = (lon, lat, name)
+
+    def get(self, pk: int) -> tuple[float, float, str] | None:
+        """(lon, lat, name) of a published place"""
+        if pk in self.changes:
+            return self.changes[pk]
+        position = self.snapshot.find(pk)
+        if position is None:
+            return None
+        snapshot = self.snapshot
+        return snapshot.lons[position], snapshot.lats[position], snapshot.name(position)
+
+    def within(
+        self, min_lon: float, min_lat: float, max_lon: float, max_lat: float
+    ) -> Iterator[tuple[int, float, float, str]]:
+        """(pk, lon, lat, name) of the published places in the box"""
+        snapshot, changes = self.snapshot, self.changes
+        for position in snapshot.within(min_lon, min_lat, max_lon, max_lat):
+            pk = snapshot.ids[position]
+            if pk not in changes:
+                lon, lat = snapshot.lons[position], snapshot.lats[position]
+                yield pk, lon, lat, snapshot.name(position)
+        for pk, change in changes.items():
+            if change is not None:
+                lon, lat, name = change
+                if min_lon <= lon <= max_lon and min_lat <= lat <= max_lat:
+                    yield pk, lon, lat, name
@@ -0,0 +1,249 @@
+"""
+Live updates of published places near a client (server-sent events).
+
+Every ASGI worker runs one poller that reads the change log
+(places.changes) every SUBSCRIPTION_POLL_SECONDS, however many clients are
+connected, and turns changes into publish, update, archive and delete
+events. Subscriptions are kept in a grid of geohash cells of
+SUBSCRIPTION_CELL_PRECISION characters: an event is only tested against
+the subscriptions of the cell its place is in, so the fan-out cost grows
+with the subscribers that match, not with all subscribers. Areas covering
+more than SUBSCRIPTION_MAX_CELLS cells are tested against every event.
+"""
+
+import asyncio
+import logging
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+
+from places.async_db import fetch_models, get_connection
+from places.geohash import box_cell_count, box_cells, encode
+from places.models import Place, PlaceChange, PlaceChangeOp, PlaceStatus
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Queued for a client that does not keep up, it is disconnected
+RESET = b"event: reset\ndata: {}\n\n"
+
+
+class BoxArea:
+    """Bounding box, split in two when it crosses the antimeridian"""
+
+    def __init__(self, min_lon: float, min_lat: float, max_lon: float, max_lat: float):
+        if min_lon < max_lon:
+            self.boxes = [(min_lon, min_lat, max_lon, max_lat)]
+        else:
+            self.boxes = [(min_lon, min_lat, 180.0, max_lat)]
+            self.boxes.append((-180.0, min_lat, max_lon, max_lat))
+
+    def contains(self, lon: float, lat: float) -> bool:
+        return any(
+            min_lon <= lon <= max_lon and min_lat <= lat <= max_lat
+            for min_lon, min_lat, max_lon, max_lat in self.boxes
+        )
+
+
+class RadiusArea:
+    """Circle of `radius_km` around a point"""
+
+    def __init__(self, lon: float, lat: float, radius_km: float):
+        self.lon, self.lat, self.radius_km = lon, lat, radius_km
+        # The circle's bounding box, none when it wraps around the map
+        lat_delta = radius_km / 111.0
+        self.boxes = []
+        if abs(lat) + lat_delta < 90:
+            lon_delta = lat_delta / math.cos(math.radians(abs(lat) + lat_delta))
+            if lon - lon_delta >= -180 and lon + lon_delta <= 180:
+                self.boxes = [
+                    (lon - lon_delta, lat - lat_delta, lon + lon_delta, lat + lat_delta)
+                ]
+
+    def contains(self, lon: float, lat: float) -> bool:
+        # Haversine distance
+        phi1, phi2 = math.radians(self.lat), math.radians(lat)
+        d_lambda = math.radians(lon - self.lon)
+        a = (
+            math.sin((phi2 - phi1) / 2) ** 2
+            + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+        )
+        return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a)) <= self.radius_km
+
+
+class Subscription:
+    def __init__(self, area: BoxArea | RadiusArea):
+        self.area = area
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(
+            settings.SUBSCRIPTION_QUEUE_SIZE
+        )
+        self.cells: list[str] = []
+
+    def push(self, event: bytes) -> None:
+        if self.queue.full():
+            return
+        # The last slot is kept for the reset
+        if self.queue.qsize() == self.queue.maxsize - 1:
+            event = RESET
+        self.queue.put_nowait(event)
+
+
+class SubscriptionIndex:
+    """Subscriptions by the geohash cells their areas cover"""
+
+    def __init__(self, precision: int, max_cells: int):
+        self.precision = precision
+        self.max_cells = max_cells
+        self.cells: dict[str, set[Subscription]] = defaultdict(set)
+        # Areas with too many cells, tested against every event
+        self.wide: set[Subscription] = set()
+        self.count = 0
+
+    def add(self, subscription: Subscription) -> None:
+        self.count += 1
+        boxes = subscription.area.boxes
+        count = sum(box_cell_count(*box, self.precision) for box in boxes)
+        if not boxes or count > self.max_cells:
+            self.wide.add(subscription)
+            return
+        subscription.cells = sorted(
+            {cell for box in boxes for cell in box_cells(*box, self.precision)}
+        )
+        for cell in subscription.cells:
+            self.cells[cell].add(subscription)
+
+    def remove(self, subscription: Subscription) -> None:
+        self.count -= 1
+        self.wide.discard(subscription)
+        for cell in subscription.cells:
+            subscribers = self.cells.get(cell)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.cells[cell]
+
+    def matching(self, lon: float, lat: float) -> list[Subscription]:
+        """Subscriptions whose area contains the point"""
+        cell = encode(lon, lat, self.precision)
+        candidates = [*self.cells.get(cell, ()), *self.wide]
+        return [sub for sub in candidates if sub.area.contains(lon, lat)]
+
+
+def event_type(change: PlaceChange) -> str | None:
+    """Event of a change as seen by anonymous clients, None if invisible"""
+    was_published = change.status_before == PlaceStatus.PUBLISHED
+    if change.op == PlaceChangeOp.DELETE:
+        return "delete" if was_published else None
+    if change.status_after == PlaceStatus.PUBLISHED:
+        return "update" if was_published else "publish"
+    return "archive" if was_published else None
+
+
+def encode_event(change: PlaceChange, event: str, name: str | None) -> bytes:
+    precision = settings.COORDINATE_PRECISION
+    data = {
+        "seq": change.seq,
+        "id": change.place_id,
+        "name": name,
+        "location": {
+            "type": "Point",
+            "coordinates": [round(c, precision) for c in change.location.coords],
+        },
+    }
+    body = api_settings.DEFAULT_RENDERER_CLASSES[0]().render(data)
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (change.seq, event.encode(), body)
+
+
+class ChangeBroker:
+    """Polls the change log while clients are subscribed, one per process"""
+
+    def __init__(self):
+        self.index = SubscriptionIndex(
+            settings.SUBSCRIPTION_CELL_PRECISION, settings.SUBSCRIPTION_MAX_CELLS
+        )
+        self._task: asyncio.Task | None = None
+        self._seq: int | None = None
+
+    def subscribe(self, area: BoxArea | RadiusArea) -> Subscription:
+        subscription = Subscription(area)
+        self.index.add(subscription)
+        loop = asyncio.get_running_loop()
+        task = self._task
+        # A task of a closed loop (another test, a restarted server) is dead
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._seq = None
+            self._task = loop.create_task(self._run())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.index.remove(subscription)
+        if not self.index.count and self._task is not None:
+            # Nobody listens: stop polling, new subscribers start from now
+            self._task.cancel()
+            self._task = None
+            self._seq = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with get_connection() as connection:
+                    while True:
+                        await self.poll(connection)
+                        await asyncio.sleep(settings.SUBSCRIPTION_POLL_SECONDS)
+            except Exception:
+                logger.exception("Place change poller failed, reconnecting")
+                await asyncio.sleep(settings.SUBSCRIPTION_POLL_SECONDS)
+
+    async def poll(self, connection) -> None:
+        """Dispatches the changes recorded since the previous poll"""
+        if self._seq is None:
+            latest = await fetch_models(
+                connection, PlaceChange.objects.order_by("-seq").only("seq")[:1]
+            )
+            self._seq = latest[0].seq if latest else 0
+            return
+
+        changes = await fetch_models(
+            connection,
+            PlaceChange.objects.filter(seq__gt=self._seq)[
+                : settings.SUBSCRIPTION_BATCH_SIZE
+            ],
+        )
+        if not changes:
+            return
+        self._seq = changes[-1].seq
+
+        # Updates are also sent to the area the place moved out of
+        place_ids = {change.place_id for change in changes}
+        previous = await fetch_models(
+            connection,
+            PlaceChange.objects.filter(place_id__in=place_ids, seq__lt=changes[0].seq)
+            .order_by("place_id", "-seq")
+            .distinct("place_id")
+            .only("place_id", "location"),
+        )
+        locations = {change.place_id: change.location for change in previous}
+        places = await fetch_models(
+            connection, Place.objects.filter(pk__in=place_ids).only("pk", "name")
+        )
+        names = {place.pk: place.name for place in places}
+
+        for change in changes:
+            before = locations.get(change.place_id)
+            locations[change.place_id] = change.location
+            event = event_type(change)
+            if event is None or change.location is None:
+                continue
+            subscribers = set(self.index.matching(*change.location.coords))
+            if event == "update" and before is not None:
+                subscribers.update(self.index.matching(*before.coords))
+            if subscribers:
+                data = encode_event(change, event, names.get(change.place_id))
+                for subscription in subscribers:
+                    subscription.push(data)
+
+
+broker = ChangeBroker()
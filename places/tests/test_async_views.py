@@ -0,0 +1,65 @@
+import pytest
+from django.contrib.gis.geos import Point
+
+from places.models import PlaceStatus
+
+
+# The async views query through their own connection, so the test data
+# has to be committed instead of living in the test transaction
+@pytest.mark.django_db(transaction=True)
+class TestAsyncPlaceViews:
+    def test_async_radius_search_matches_sync_endpoint(self, client, place_factory):
+        """The async radius search returns the same payload as the sync one"""
+        place_factory(status=PlaceStatus.PUBLISHED, location=Point(19.945, 50.062))
+        place_factory(status=PlaceStatus.PUBLISHED, location=Point(21.0122, 52.2297))
+        place_factory(status=PlaceStatus.DRAFT, location=Point(19.94, 50.061))
+        query = "?lat=50.0613&lon=19.937&radius=5"
+
+        sync_response = client.get(f"/api/v1/places/search/radius/{query}")
+        async_response = client.get(f"/api/v1/places/async/search/radius/{query}")
+
+        assert async_response.status_code == 200
+        assert async_response.json() == sync_response.json()
+        assert async_response.json()["count"] == 1
+
+    def test_async_bbox_search_is_paginated(self, client, place_factory, settings):
+        """Results are split into pages like PageNumberPagination does"""
+        settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, "PAGE_SIZE": 2}
+        for _ in range(3):
+            place_factory(status=PlaceStatus.PUBLISHED, location=Point(19.94, 50.062))
+        url = "/api/v1/places/async/search/bbox/?in_bbox=19.93,50.06,19.95,50.065"
+
+        first_page = client.get(url).json()
+        second_page = client.get(f"{url}&page=2").json()
+
+        assert first_page["count"] == 3
+        assert len(first_page["results"]["features"]) == 2
+        assert first_page["next"].endswith("page=2")
+        assert len(second_page["results"]["features"]) == 1
+        assert second_page["next"] is None
+        assert client.get(f"{url}&page=3").status_code == 404
+
+    def test_async_search_validates_parameters(self, client):
+        """Filter errors are returned as 400 with a detail message"""
+        response = client.get("/api/v1/places/async/search/radius/?radius=5")
+
+        assert response.status_code == 400
+        assert response.json() == {
+            "detail": "The parameters 'lat' and 'lon' are mandatory for radius search"
+        }
+
+    def test_async_detail_returns_only_published_places(self, client, place_factory):
+        """Drafts are not visible through the anonymous async detail view"""
+        published = place_factory(status=PlaceStatus.PUBLISHED)
+        draft = place_factory(status=PlaceStatus.DRAFT)
+
+        response = client.get(f"/api/v1/places/async/{published.pk}/")
+
+        assert response.status_code == 200
+        assert response.json()["id"] == published.pk
+        assert response.json()["properties"]["created_by"] == {
+            "id": published.created_by.pk,
+            "first_name": published.created_by.first_name,
+            "last_name": published.created_by.last_name,
+        }
+        assert client.get(f"/api/v1/places/async/{draft.pk}/").status_code == 404
@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from places.changes import changes_since, last_seq
+from places.models import Place, PlaceChange, PlaceChangeOp, PlaceStatus
+
+
+def ops():
+    return [
+        (change.place_id, change.op, change.status_before, change.status_after)
+        for change in changes_since(0)
+    ]
+
+
+@pytest.mark.django_db
+class TestChangeLog:
+    def test_api_writes_are_recorded(self, authenticated_client):
+        """Create, update and archive each append one change, in order"""
+        client, user = authenticated_client
+        payload = {
+            "name": "Some Place",
+            "location": {"type": "Point", "coordinates": [10.0, 20.0]},
+        }
+
+        pk = client.post("/api/v1/places/", payload, format="json").data["id"]
+        client.patch(f"/api/v1/places/{pk}/", {"name": "Renamed"}, format="json")
+        client.delete(f"/api/v1/places/{pk}/")
+
+        moderating, archived = PlaceStatus.MODERATING, PlaceStatus.ARCHIVED
+        assert ops() == [
+            (pk, PlaceChangeOp.CREATE, "", moderating),
+            (pk, PlaceChangeOp.UPDATE, moderating, moderating),
+            (pk, PlaceChangeOp.UPDATE, moderating, archived),
+        ]
+        assert PlaceChange.objects.last().location.coords == (10.0, 20.0)
+
+    def test_admin_site_deletes_are_recorded(self, admin_client, place_factory):
+        """Deleting a place in the admin records a delete change"""
+        place = place_factory(status=PlaceStatus.PUBLISHED)
+
+        response = admin_client.post(
+            f"/admin/places/place/{place.pk}/delete/", {"post": "yes"}
+        )
+
+        assert response.status_code == 302
+        assert not Place.objects.exists()
+        assert ops() == [
+            (place.pk, PlaceChangeOp.DELETE, PlaceStatus.PUBLISHED, ""),
+        ]
+
+    def test_changes_are_read_in_batches(self, authenticated_client, place_factory):
+        """changes_since pages by sequence in batches of batch_size"""
+        client, user = authenticated_client
+        place = place_factory(created_by=user)
+        for index in range(5):
+            client.patch(f"/api/v1/places/{place.pk}/", {"name": f"v{index}"})
+        first = PlaceChange.objects.first().seq
+
+        seqs = [change.seq for change in changes_since(first, batch_size=2)]
+
+        assert seqs == list(range(first + 1, first + 5))
+        assert last_seq() == first + 4
+
+    def test_prune_removes_only_old_changes(self, authenticated_client, place_factory):
+        """Only changes older than the retention are pruned"""
+        client, user = authenticated_client
+        place = place_factory(created_by=user)
+        for index in range(3):
+            client.patch(f"/api/v1/places/{place.pk}/", {"name": f"v{index}"})
+        old = PlaceChange.objects.order_by("seq")[:2].values_list("seq", flat=True)
+        PlaceChange.objects.filter(seq__in=list(old)).update(
+            created_at=timezone.now() - timedelta(days=40)
+        )
+
+        call_command("prune_place_changes", "--days", "30", "--batch-size", "1")
+
+        assert PlaceChange.objects.count() == 1
+
+
+@pytest.mark.django_db
+class TestChangeFeedEndpoint:
+    url = "/api/v1/places/changes/"
+
+    def test_feed_is_not_available_for_regular_user(self, authenticated_client):
+        """Only administrators can read the change feed"""
+        client, user = authenticated_client
+
+        assert client.get(self.url).status_code == 403
+
+    def test_feed_pages_by_sequence(self, admin_client, authenticated_client):
+        """`since` continues the feed after the last sequence returned"""
+        client, user = authenticated_client
+        for index in range(3):
+            payload = {
+                "name": f"Place {index}",
+                "location": {"type": "Point", "coordinates": [10.0, 20.0]},
+            }
+            client.post("/api/v1/places/", payload, format="json")
+
+        first = admin_client.get(self.url, {"limit": 2}).json()
+        rest = admin_client.get(self.url, {"since": first["last_seq"]}).json()
+
+        assert [change["op"] for change in first["results"]] == ["create"] * 2
+        assert first["more"] is True
+        assert len(rest["results"]) == 1
+        assert rest["more"] is False
+        assert rest["results"][0]["location"]["coordinates"] == [10.0, 20.0]
+        assert admin_client.get(self.url, {"limit": 10**6}).status_code == 400
@@ -0,0 +1,77 @@
+import gzip
+import json
+
+import pytest
+from django.http import StreamingHttpResponse
+from rest_framework.test import APIClient
+
+from GeolocationAPI.compression import accepted_encodings
+from places.models import PlaceStatus
+
+LIST_URL = "/api/v1/places/"
+
+
+def test_accepted_encodings():
+    """Accept-Encoding is parsed with q-values, invalid ones count as 0"""
+    assert accepted_encodings("gzip, br;q=0.5, zstd;q=0, *;q=x") == {
+        "gzip": 1.0,
+        "br": 0.5,
+        "zstd": 0.0,
+        "*": 0.0,
+    }
+
+
+@pytest.mark.django_db
+class TestCompression:
+    @pytest.fixture(autouse=True)
+    def gzip_only(self, settings):
+        settings.COMPRESSION_ENCODINGS = ["gzip"]
+        settings.COMPRESSION_MIN_SIZE = 1024
+
+    def test_gzip(self, places):
+        """Large responses are gzipped when the client accepts it"""
+        plain = APIClient().get(LIST_URL)
+        response = APIClient().get(LIST_URL, HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+        assert response["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response["Vary"]
+        assert int(response["Content-Length"]) < len(plain.content)
+        assert json.loads(gzip.decompress(response.content)) == plain.json()
+
+    def test_small_responses_are_not_compressed(self, place_factory):
+        """Bodies below COMPRESSION_MIN_SIZE are sent as they are"""
+        place_factory(status=PlaceStatus.PUBLISHED)
+
+        response = APIClient().get(LIST_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+        assert response.status_code == 200
+        assert not response.has_header("Content-Encoding")
+
+    def test_refused_encoding(self, places):
+        """Encodings refused with q=0 or not configured are not used"""
+        response = APIClient().get(LIST_URL, HTTP_ACCEPT_ENCODING="gzip;q=0, br")
+
+        assert not response.has_header("Content-Encoding")
+
+    def test_streamed_page(self, settings, admin_client, places):
+        """Streamed pages are compressed chunk by chunk"""
+        settings.STREAMING_MIN_PAGE_SIZE = 5
+
+        response = admin_client.get(
+            LIST_URL, {"page_size": 10}, HTTP_ACCEPT_ENCODING="gzip"
+        )
+
+        assert isinstance(response, StreamingHttpResponse)
+        assert response["Content-Encoding"] == "gzip"
+        data = json.loads(gzip.decompress(b"".join(response.streaming_content)))
+        assert len(data["results"]["features"]) == 7
+
+    def test_brotli(self, settings, places):
+        """br is preferred over gzip when both are accepted"""
+        brotli = pytest.importorskip("brotli")
+        settings.COMPRESSION_ENCODINGS = ["zstd", "br", "gzip"]
+
+        response = APIClient().get(LIST_URL, HTTP_ACCEPT_ENCODING="gzip, br")
+
+        assert response["Content-Encoding"] == "br"
+        assert json.loads(brotli.decompress(response.content))["count"] == 7
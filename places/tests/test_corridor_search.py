@@ -0,0 +1,80 @@
+import pytest
+from django.contrib.gis.geos import Point
+
+from places.models import PlaceStatus
+from places.utils import decode_polyline
+
+URL = "/api/v1/places/search/corridor/"
+
+# West to east through Kraków along latitude 50.06
+ROUTE = {"type": "LineString", "coordinates": [[19.90, 50.06], [20.00, 50.06]]}
+
+
+def ids(response) -> list[int]:
+    return [feature["id"] for feature in response.data["results"]["features"]]
+
+
+@pytest.mark.django_db
+class TestCorridorSearch:
+    def test_places_are_ordered_along_the_route(self, api_client, place_factory):
+        """Published places near the route are returned from start to end"""
+        east = place_factory(
+            status=PlaceStatus.PUBLISHED, location=Point(19.99, 50.0605)
+        )
+        west = place_factory(
+            status=PlaceStatus.PUBLISHED, location=Point(19.91, 50.0595)
+        )
+        middle = place_factory(
+            status=PlaceStatus.PUBLISHED, location=Point(19.95, 50.0601)
+        )
+        # About 1.1 km north of the route
+        place_factory(status=PlaceStatus.PUBLISHED, location=Point(19.95, 50.07))
+        place_factory(status=PlaceStatus.DRAFT, location=Point(19.95, 50.06))
+
+        response = api_client.post(URL, {"line": ROUTE, "distance": 200}, format="json")
+
+        assert response.status_code == 200
+        assert ids(response) == [west.pk, middle.pk, east.pk]
+        distances = [
+            feature["properties"]["distance"]
+            for feature in response.data["results"]["features"]
+        ]
+        assert all(0 <= distance <= 200 for distance in distances)
+
+    def test_encoded_polyline_is_accepted(self, api_client, place_factory):
+        """The route can be sent as an encoded polyline"""
+        place = place_factory(
+            status=PlaceStatus.PUBLISHED, location=Point(19.95, 50.06)
+        )
+
+        response = api_client.post(
+            URL, {"polyline": "_jppH_vmxB?_pR", "distance": 50}, format="json"
+        )
+
+        assert response.status_code == 200
+        assert ids(response) == [place.pk]
+
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            {"distance": 100},
+            {"line": ROUTE, "polyline": "_jppH_vmxB?_pR"},
+            {"line": ROUTE, "distance": 0},
+            {"line": ROUTE, "distance": 10000},
+            {"line": {"type": "Point", "coordinates": [19.9, 50.06]}},
+            {"polyline": "_p~iF"},
+            {"line": {"type": "LineString", "coordinates": [[19.9, 95], [20, 50]]}},
+        ],
+    )
+    def test_invalid_requests_are_rejected(self, api_client, payload):
+        """Missing, ambiguous or invalid routes and distances are a 400"""
+        assert api_client.post(URL, payload, format="json").status_code == 400
+
+
+def test_decode_polyline_reference_value():
+    """Decodes the example of the encoded polyline specification"""
+    assert decode_polyline("_p~iF~ps|U_ulLnnqC_mqNvxq`@") == [
+        (-120.2, 38.5),
+        (-120.95, 40.7),
+        (-126.453, 43.252),
+    ]
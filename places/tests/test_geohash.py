@@ -0,0 +1,105 @@
+import random
+
+import pytest
+from django.contrib.gis.geos import Point
+from django.db import connection
+
+from places import geohash
+from places.models import Place, PlaceStatus
+
+
+class TestGeohash:
+    def test_encode_matches_reference_value(self):
+        """Encoding matches the reference geohash of the point"""
+        assert geohash.encode(-5.6, 42.6, 5) == "ezs42"
+
+    def test_points_on_a_boundary_belong_to_the_lower_cell(self):
+        """Boundary points are encoded and covered like PostGIS does"""
+        assert geohash.encode(0, 0, 4) == "7zzz"
+        assert geohash.encode(-90, 45, 4) == "9zzz"
+
+        for lon, lat in [(0, 0), (-90, 45), (-180, -90), (180, 90)]:
+            cells = geohash.covering_cells(lon, lat, lon, lat)
+            assert geohash.encode(lon, lat).startswith(tuple(cells))
+            low, high = geohash.zorder_range(geohash.encode(lon, lat, 8))
+            assert low <= geohash.zorder(lon, lat) < high
+
+    def test_covering_cells_contain_every_point_of_the_box(self):
+        """Every point of a box lies in one of its covering cells"""
+        rng = random.Random(0)
+        for _ in range(1000):
+            min_lon, min_lat = rng.uniform(-179, 170), rng.uniform(-89, 80)
+            max_lon = min_lon + rng.uniform(0.001, 9)
+            max_lat = min_lat + rng.uniform(0.001, 9)
+            cells = geohash.covering_cells(min_lon, min_lat, max_lon, max_lat)
+            assert 0 < len(cells) <= 32
+
+            lon, lat = rng.uniform(min_lon, max_lon), rng.uniform(min_lat, max_lat)
+            assert geohash.encode(lon, lat).startswith(tuple(cells))
+
+    def test_zorder_key_starts_with_the_geohash_bits(self):
+        """Keys of the points in a cell fall into the cell's key range"""
+        rng = random.Random(1)
+        for _ in range(1000):
+            lon, lat = rng.uniform(-180, 180), rng.uniform(-90, 90)
+            key = geohash.zorder(lon, lat)
+
+            low, high = geohash.zorder_range(geohash.encode(lon, lat, 8))
+            assert low <= key < high
+        assert geohash.zorder_range("") == (0, 2**64)
+
+    def test_radius_wrapping_around_the_map_is_not_prefiltered(self):
+        """Circles crossing the antimeridian or a pole get no cells"""
+        assert geohash.radius_cells(179.99, 0, 10) == []
+        assert geohash.radius_cells(0, 89.99, 10) == []
+
+
+@pytest.mark.django_db
+class TestPlaceGeohash:
+    def test_geohash_follows_location(self, place_factory):
+        """Place.geohash is updated with the location"""
+        place = place_factory(location=Point(-5.6, 42.6, srid=4326))
+        assert place.geohash.startswith("ezs42")
+
+        place.location = Point(19.94, 50.06, srid=4326)
+        place.save(update_fields=["location"])
+
+        place.refresh_from_db()
+        assert place.geohash == geohash.encode(19.94, 50.06)
+
+    @pytest.mark.parametrize(
+        "lon, lat", [(0, 0), (-90, 45), (-180, -90), (180, 90), (19.94, 50.06)]
+    )
+    def test_encode_matches_postgis_on_boundaries(self, lon, lat):
+        """Saved and backfilled places get the same key"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT ST_GeoHash(ST_SetSRID(ST_MakePoint(%s, %s), 4326), 12)",
+                [lon, lat],
+            )
+            assert cursor.fetchone()[0] == geohash.encode(lon, lat)
+
+    def test_prefiltered_search_returns_the_same_places(
+        self, client, place_factory, settings
+    ):
+        """The geohash prefilter does not change search results"""
+        rng = random.Random(1)
+        for _ in range(50):
+            place_factory(
+                status=PlaceStatus.PUBLISHED,
+                location=Point(
+                    19.94 + rng.uniform(-0.1, 0.1), 50.06 + rng.uniform(-0.1, 0.1)
+                ),
+            )
+        queries = [
+            "/api/v1/places/search/radius/?lat=50.06&lon=19.94&radius=5",
+            "/api/v1/places/search/bbox/?in_bbox=19.9,50.0,20.0,50.1",
+        ]
+
+        settings.GEOHASH_PREFILTER = False
+        expected = [client.get(url).data["count"] for url in queries]
+        settings.GEOHASH_PREFILTER = True
+        prefiltered = [client.get(url).data["count"] for url in queries]
+
+        assert prefiltered == expected
+        assert Place.objects.filter(geohash="").count() == 0
@@ -0,0 +1,48 @@
+import pytest
+from django.contrib.gis.geos import Point
+
+from places.models import PlaceStatus
+
+URL = "/api/v1/places/search/heatmap/"
+
+
+@pytest.mark.django_db
+class TestPlaceHeatmap:
+    def test_counts_published_places_per_cell(self, client, place_factory):
+        """Only published places are counted, per cell of the grid"""
+        for lon, lat in [(19.93, 50.06), (19.94, 50.06), (21.01, 52.23)]:
+            place_factory(status=PlaceStatus.PUBLISHED, location=Point(lon, lat))
+        place_factory(status=PlaceStatus.DRAFT, location=Point(19.93, 50.06))
+
+        response = client.get(URL, {"in_bbox": "14.12,49.00,24.14,54.83"})
+
+        assert response.status_code == 200
+        assert response.data["count"] == 3
+        assert response.data["cell_size"] == 0.125
+        assert sorted(cell[2] for cell in response.data["cells"]) == [1, 2]
+        assert "max-age" in response["Cache-Control"]
+
+    def test_cells_are_centered_on_the_grid(self, client, place_factory):
+        """Cells are aligned to the grid, not to the requested box"""
+        place_factory(status=PlaceStatus.PUBLISHED, location=Point(19.93, 50.06))
+
+        response = client.get(
+            URL, {"in_bbox": "19.0,49.0,21.0,51.0", "resolution": "2"}
+        )
+
+        assert response.data["cells"] == [[20.0, 50.0, 1]]
+        assert response.data["bbox"] == [18.5, 48.5, 21.5, 51.5]
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {},
+            {"in_bbox": "1,2,3"},
+            {"in_bbox": "14,49,24,54", "resolution": "0"},
+            {"in_bbox": "14,49,24,54", "resolution": "many"},
+            {"in_bbox": "0,-90,0.001,90", "resolution": "256"},
+        ],
+    )
+    def test_invalid_parameters_are_rejected(self, client, params):
+        """Bad boxes, bad resolutions and too many cells are a 400"""
+        assert client.get(URL, params).status_code == 400
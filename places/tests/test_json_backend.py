@@ -0,0 +1,94 @@
+import datetime
+import decimal
+import io
+import uuid
+
+import pytest
+from django.contrib.gis.geos import Point
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from GeolocationAPI.parsers import ORJSONParser
+from GeolocationAPI.renderers import ORJSONRenderer
+from places.models import PlaceStatus
+
+
+def test_renderer_matches_json_renderer():
+    """orjson output is byte-identical to DRF's JSONRenderer"""
+    data = {
+        "coordinates": [19.946083279790873, 50.06771748395846, 0.5, None, True],
+        "aware": datetime.datetime(2025, 1, 2, 3, 4, 5, 123, tzinfo=datetime.UTC),
+        "naive": datetime.datetime(2025, 1, 2),
+        "date": datetime.date(2025, 1, 1),
+        "decimal": decimal.Decimal("1.25"),
+        "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "duration": datetime.timedelta(seconds=5),
+        "text": "Krak\u00f3w \u2028",
+    }
+
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+def test_falls_back_for_unsupported_data():
+    """Integers orjson cannot encode go through the stdlib encoder"""
+    data = {"big": 2**70}
+
+    assert ORJSONRenderer().render(data) == b'{"big":1180591620717411303424}'
+
+
+def test_indented_output_matches_json_renderer():
+    """The indent media type parameter is honoured like DRF does"""
+    data = {"name": "Wawel", "location": [19.93, 50.05]}
+    media_type = "application/json; indent=4"
+
+    assert ORJSONRenderer().render(data, media_type) == JSONRenderer().render(
+        data, media_type
+    )
+
+
+def test_parser():
+    """Bodies are parsed with orjson, NaN is rejected"""
+    parser = ORJSONParser()
+
+    assert parser.parse(io.BytesIO('{"city": "Łódź"}'.encode())) == {"city": "Łódź"}
+    with pytest.raises(ParseError):
+        parser.parse(io.BytesIO(b'{"radius": NaN}'))
+
+
+@pytest.mark.django_db
+class TestApiOutput:
+    def test_list_is_byte_identical(self, place_factory):
+        """The place list is rendered exactly like with JSONRenderer"""
+        for index in range(3):
+            place_factory(
+                status=PlaceStatus.PUBLISHED,
+                description="Zażółć gęślą jaźń",
+                location=Point(19.94 + 0.001 * index, 50.06, srid=4326),
+            )
+
+        response = APIClient().get("/api/v1/places/")
+
+        assert response.status_code == 200
+        assert response.content == JSONRenderer().render(response.data)
+
+    def test_json_request_body(self, authenticated_client):
+        """JSON request bodies are parsed by the orjson parser"""
+        client, _ = authenticated_client
+
+        response = client.post(
+            "/api/v1/places/",
+            data=b'{"name": "Sukiennice", "location":'
+            b' {"type": "Point", "coordinates": [19.9373, 50.0617]}}',
+            content_type="application/json",
+        )
+
+        assert response.status_code == 201, response.data
+        assert response.data["properties"]["name"] == "Sukiennice"
+
+    def test_schema_keeps_json_media_type(self):
+        """The schema still documents application/json responses"""
+        response = APIClient().get("/api/schema/", {"format": "json"})
+
+        content = response.json()["paths"]["/api/v1/places/"]["get"]["responses"]
+        assert "application/json" in content["200"]["content"]
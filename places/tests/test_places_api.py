@@ -288,3 +288,49 @@ class TestPlaceSearchAPI:
         assert "The parameters 'lat' and 'lon' are mandatory for radius search" in str(
             response.data
         )
+
+
+@pytest.mark.django_db
+class TestWrappedSearches:
+    def test_bbox_crossing_antimeridian_returns_both_sides(self, client, place_factory):
+        """min_lon > max_lon selects the box wrapping around 180°"""
+        fiji = place_factory(status=PlaceStatus.PUBLISHED, location=Point(178.4, -18.1))
+        samoa = place_factory(
+            status=PlaceStatus.PUBLISHED, location=Point(-171.8, -13.8)
+        )
+        place_factory(status=PlaceStatus.PUBLISHED, location=Point(0.0, -15.0))
+
+        response = client.get(
+            "/api/v1/places/search/bbox/",
+            {"in_bbox": "170,-25,-165,-10", "lat": "-18.1", "lon": "178.0"},
+        )
+
+        assert response.status_code == 200
+        ids = [item["id"] for item in response.data["results"]["features"]]
+        assert ids == [fiji.id, samoa.id]
+
+    def test_radius_across_antimeridian(self, client, place_factory):
+        """Places on both sides of the antimeridian are found"""
+        east = place_factory(status=PlaceStatus.PUBLISHED, location=Point(179.99, 0))
+        west = place_factory(status=PlaceStatus.PUBLISHED, location=Point(-179.99, 0))
+
+        response = client.get(
+            "/api/v1/places/search/radius/", {"lat": "0", "lon": "180", "radius": "5"}
+        )
+
+        ids = {item["id"] for item in response.data["results"]["features"]}
+        assert ids == {east.id, west.id}
+
+    def test_radius_near_pole_spans_all_longitudes(self, client, place_factory):
+        """Meridians converge, 150 km around 89.5°N reaches the other side"""
+        near = place_factory(status=PlaceStatus.PUBLISHED, location=Point(0, 89.5))
+        across = place_factory(status=PlaceStatus.PUBLISHED, location=Point(180, 89.5))
+        place_factory(status=PlaceStatus.PUBLISHED, location=Point(0, 87.0))
+
+        response = client.get(
+            "/api/v1/places/search/radius/",
+            {"lat": "89.5", "lon": "0", "radius": "150"},
+        )
+
+        ids = {item["id"] for item in response.data["results"]["features"]}
+        assert ids == {near.id, across.id}
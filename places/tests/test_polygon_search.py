@@ -0,0 +1,97 @@
+import json
+import math
+
+import pytest
+from django.contrib.gis.geos import Point, Polygon
+
+from places.models import PlaceStatus
+
+URL = "/api/v1/places/search/polygon/"
+
+
+def circle(lon: float, lat: float, radius: float, vertices: int) -> Polygon:
+    ring = [
+        (
+            lon + radius * math.cos(2 * math.pi * i / vertices),
+            lat + radius * math.sin(2 * math.pi * i / vertices),
+        )
+        for i in range(vertices)
+    ]
+    return Polygon(ring + ring[:1], srid=4326)
+
+
+def search(client, geometry) -> list[int]:
+    response = client.post(
+        URL, {"geometry": json.loads(geometry.geojson)}, format="json"
+    )
+    assert response.status_code == 200, response.data
+    return sorted(feature["id"] for feature in response.data["results"]["features"])
+
+
+@pytest.mark.django_db
+class TestPolygonSearch:
+    @pytest.fixture
+    def places(self, place_factory):
+        """Published places on a 0.02 degree grid around Kraków and a draft"""
+        published = [
+            place_factory(
+                status=PlaceStatus.PUBLISHED,
+                location=Point(19.9 + 0.02 * x, 50.0 + 0.02 * y, srid=4326),
+            )
+            for x in range(10)
+            for y in range(10)
+        ]
+        place_factory(status=PlaceStatus.DRAFT, location=Point(19.99, 50.09))
+        return published
+
+    def test_returns_published_places_inside_polygon(self, api_client, places):
+        """Published places inside the polygon are returned"""
+        polygon = Polygon.from_bbox((19.95, 50.05, 20.0, 50.1))
+        polygon.srid = 4326
+
+        expected = sorted(
+            place.pk for place in places if polygon.intersects(place.location)
+        )
+        assert search(api_client, polygon) == expected
+
+    def test_simplified_search_matches_exact_search(self, api_client, places, settings):
+        """Simplified and fallback searches return the exact result"""
+        # Fits in one page: 16 places, the closest outside one is 0.006 away
+        polygon = circle(19.99, 50.09, 0.045, 2000)
+
+        settings.POLYGON_SIMPLIFY_VERTICES = 5000
+        exact = search(api_client, polygon)
+        settings.POLYGON_SIMPLIFY_VERTICES = 50
+        simplified = search(api_client, polygon)
+        settings.POLYGON_MAX_CANDIDATES = 1
+        fallback = search(api_client, polygon)
+
+        assert exact == simplified == fallback
+        assert exact
+
+    @pytest.mark.parametrize(
+        "geometry",
+        [
+            {"type": "Point", "coordinates": [19.9, 50.0]},
+            {
+                "type": "Polygon",
+                "coordinates": [[[200, 0], [201, 0], [201, 1], [200, 0]]],
+            },
+            "not a geometry",
+        ],
+    )
+    def test_invalid_geometry_is_rejected(self, api_client, geometry):
+        """Non-polygon, out of range or unparsable geometries are a 400"""
+        response = api_client.post(URL, {"geometry": geometry}, format="json")
+        assert response.status_code == 400
+
+    def test_vertex_count_is_capped(self, api_client, settings):
+        """Polygons above POLYGON_MAX_VERTICES are a 400"""
+        settings.POLYGON_MAX_VERTICES = 100
+        polygon = circle(19.99, 50.09, 0.1, 200)
+
+        response = api_client.post(
+            URL, {"geometry": json.loads(polygon.geojson)}, format="json"
+        )
+
+        assert response.status_code == 400
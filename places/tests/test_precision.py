@@ -0,0 +1,75 @@
+import json
+
+import pytest
+from django.contrib.gis.geos import Point
+
+from places.models import PlaceStatus
+
+LIST_URL = "/api/v1/places/"
+RADIUS_URL = "/api/v1/places/search/radius/"
+LOCATION = Point(19.946083279790873, 50.06771748395846, srid=4326)
+
+
+def coordinates(response) -> list[float]:
+    return response.data["results"]["features"][0]["geometry"]["coordinates"]
+
+
+@pytest.fixture
+def place(place_factory):
+    return place_factory(status=PlaceStatus.PUBLISHED, location=LOCATION)
+
+
+@pytest.mark.django_db
+class TestCoordinatePrecision:
+    def test_six_decimals_by_default(self, api_client, place):
+        """Coordinates are rounded to COORDINATE_PRECISION by default"""
+        response = api_client.get(LIST_URL)
+
+        assert coordinates(response) == [19.946083, 50.067717]
+
+    def test_client_selected_precision(self, api_client, place):
+        """?precision= rounds list and detail coordinates"""
+        response = api_client.get(LIST_URL, {"precision": 3})
+        detail = api_client.get(f"{LIST_URL}{place.pk}/", {"precision": 2})
+
+        assert coordinates(response) == [19.946, 50.068]
+        assert detail.data["geometry"]["coordinates"] == [19.95, 50.07]
+
+    def test_precision_is_capped(self, settings, api_client, place):
+        """Precisions above the maximum or not numbers are a 400"""
+        settings.COORDINATE_MAX_PRECISION = 8
+
+        assert api_client.get(LIST_URL, {"precision": 9}).status_code == 400
+        assert api_client.get(LIST_URL, {"precision": "x"}).status_code == 400
+
+    def test_distance_follows_precision(self, api_client, place):
+        """Distances in meters keep four decimals fewer than coordinates"""
+        params = {"lat": 50.0613, "lon": 19.937, "radius": 5}
+
+        default = api_client.get(RADIUS_URL, params)
+        coarse = api_client.get(RADIUS_URL, {**params, "precision": 4})
+
+        distance = default.data["results"]["features"][0]["properties"]["distance"]
+        assert distance == round(distance, 2)
+        coarse_distance = coarse.data["results"]["features"][0]["properties"][
+            "distance"
+        ]
+        assert coarse_distance == round(distance)
+
+    def test_compact_formats(self, api_client, place):
+        """Columnar coordinates are rounded as well"""
+        response = api_client.get(LIST_URL, {"precision": 4, "format": "columnar"})
+
+        columns = json.loads(response.content)["results"]
+        assert (columns["lon"], columns["lat"]) == ([19.9461], [50.0677])
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_views(client, place):
+    """The async views accept ?precision= too"""
+    response = client.get(f"/api/v1/places/async/{place.pk}/", {"precision": 3})
+
+    assert response.status_code == 200
+    assert response.json()["geometry"]["coordinates"] == [19.946, 50.068]
+    invalid = client.get(f"/api/v1/places/async/{place.pk}/", {"precision": -1})
+    assert invalid.status_code == 400
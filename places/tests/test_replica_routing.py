@@ -0,0 +1,77 @@
+import math
+
+import pytest
+
+from GeolocationAPI import db_routers
+from places.models import Place
+
+
+@pytest.fixture
+def replicas(settings, monkeypatch):
+    """Two replicas whose lag is taken from the returned dictionary"""
+    lags = {"replica_1": 0.1, "replica_2": 0.2}
+    settings.DATABASE_REPLICAS = list(lags)
+    settings.REPLICA_MAX_LAG_SECONDS = 5
+    monkeypatch.setattr(db_routers, "_lag_cache", {})
+    monkeypatch.setattr(db_routers, "_measure_lag", lambda alias: lags[alias])
+    return lags
+
+
+class TestReplicaRouter:
+    def test_reads_go_to_primary_outside_replica_views(self, replicas):
+        """Without a replica selected for the request, reads use the primary"""
+        router = db_routers.ReplicaRouter()
+
+        assert router.db_for_read(Place) == "default"
+        assert router.db_for_write(Place) == "default"
+
+    def test_lagging_replicas_are_skipped(self, replicas):
+        """Only replicas within REPLICA_MAX_LAG_SECONDS are used"""
+        replicas["replica_1"] = 60.0
+
+        assert db_routers.choose_replica() == "replica_2"
+
+    def test_primary_is_used_when_all_replicas_lag_or_fail(self, replicas, monkeypatch):
+        """Unreachable replicas count as infinitely lagging"""
+
+        def measure(alias):
+            if alias == "replica_1":
+                raise ConnectionError
+            return 60.0
+
+        monkeypatch.setattr(db_routers, "_measure_lag", measure)
+
+        assert db_routers.choose_replica() is None
+        assert db_routers._lag_cache["replica_1"][1] == math.inf
+
+
+@pytest.mark.django_db
+class TestStickyPrimary:
+    def test_user_is_pinned_to_primary_after_write(self, authenticated_client):
+        """After creating a place the author reads from the primary"""
+        client, user = authenticated_client
+        place_data = {
+            "name": "Some Place",
+            "description": "Description of some place",
+            "location": {"type": "Point", "coordinates": [10.0, 20.0]},
+        }
+
+        assert not db_routers.is_pinned_to_primary(user)
+        response = client.post("/api/v1/places/", data=place_data, format="json")
+
+        assert response.status_code == 201
+        assert db_routers.is_pinned_to_primary(user)
+
+    def test_pinned_user_reads_are_not_routed_to_replica(
+        self, authenticated_client, replicas, monkeypatch
+    ):
+        """Replica selection is skipped for pinned users"""
+        client, user = authenticated_client
+        chosen = []
+        monkeypatch.setattr(db_routers, "choose_replica", lambda: chosen.append(1))
+
+        db_routers.pin_to_primary(user)
+        response = client.get("/api/v1/places/")
+
+        assert response.status_code == 200
+        assert chosen == []
@@ -0,0 +1,36 @@
+import pytest
+from django.core.management import call_command
+
+from places.models import Place, PlaceStatus
+from places.seeding import generate_points
+
+
+class TestSyntheticDatasets:
+    def test_points_are_reproducible_for_a_seed(self):
+        """The same seed always produces the same dataset"""
+        first = list(generate_points(100, "uniform", seed=7))
+        second = list(generate_points(100, "uniform", seed=7))
+
+        assert first == second
+        assert first != list(generate_points(100, "uniform", seed=8))
+
+    def test_points_are_valid_coordinates(self):
+        """Clustered points never leave the valid coordinate range"""
+        for lon, lat, city, _ in generate_points(2000, "cities", seed=1):
+            assert -180 <= lon <= 180
+            assert -90 <= lat <= 90
+            assert city
+
+
+@pytest.mark.django_db
+class TestSeedPlacesCommand:
+    def test_seed_places_bulk_loads_published_places(self, user_factory):
+        """The seeder loads the requested number of places with COPY"""
+        user = user_factory()
+
+        call_command("seed_places", "50", "--seed", "3", "--owner-email", user.email)
+
+        assert Place.objects.count() == 50
+        assert Place.objects.filter(status=PlaceStatus.PUBLISHED).count() == 50
+        assert Place.objects.filter(created_by=user).count() == 50
+        assert Place.objects.first().location.srid == 4326
@@ -0,0 +1,79 @@
+import pytest
+from django.contrib.gis.geos import Point
+from django.core.management import call_command
+
+from places.changes import last_seq, record_change, record_deletes
+from places.models import PlaceChangeOp, PlaceStatus
+from places.services import PlaceService
+from places.snapshot import SNAPSHOT_FILE, PlacesIndex, PlacesSnapshot
+
+
+@pytest.fixture
+def snapshot_path(settings, tmp_path):
+    settings.SHARED_DATA_DIR = tmp_path
+    settings.SHARED_DATA_CHECK_SECONDS = 0
+    return tmp_path / SNAPSHOT_FILE
+
+
+@pytest.mark.django_db
+class TestPlacesSnapshot:
+    def test_command_writes_published_places_in_zorder(
+        self, place_factory, snapshot_path
+    ):
+        """The command writes published places sorted by Z-order key"""
+        krakow = place_factory(
+            name="Kraków", location=Point(19.94, 50.06), status=PlaceStatus.PUBLISHED
+        )
+        lisbon = place_factory(
+            name="Lisbon", location=Point(-9.14, 38.72), status=PlaceStatus.PUBLISHED
+        )
+        place_factory(status=PlaceStatus.DRAFT)
+
+        call_command("build_places_snapshot")
+
+        snapshot = PlacesSnapshot(snapshot_path.read_bytes())
+        assert len(snapshot) == 2
+        assert list(snapshot.keys) == sorted(snapshot.keys)
+        position = snapshot.find(krakow.pk)
+        assert snapshot.name(position) == "Kraków"
+        assert snapshot.lons[position] == pytest.approx(19.94)
+        assert snapshot.find(lisbon.pk) != position
+        assert snapshot.find(0) is None
+        assert [snapshot.ids[p] for p in snapshot.within(19, 50, 20, 51)] == [krakow.pk]
+
+    def test_index_applies_changes_made_after_the_snapshot(
+        self, place_factory, snapshot_path
+    ):
+        """Moves, archives, deletes and additions recorded in the change log"""
+        moved, archived, deleted = place_factory.create_batch(
+            3, status=PlaceStatus.PUBLISHED
+        )
+        call_command("build_places_snapshot")
+        index = PlacesIndex()
+        index.refresh()
+
+        moved.location = Point(-9.14, 38.72)
+        moved.save()
+        record_change(moved, PlaceChangeOp.UPDATE, PlaceStatus.PUBLISHED)
+        PlaceService.archive_place(archived)
+        record_deletes([deleted])
+        deleted.delete()
+        added = place_factory(status=PlaceStatus.PUBLISHED)
+        record_change(added, PlaceChangeOp.CREATE)
+        index.refresh()
+
+        assert index.get(moved.pk)[:2] == pytest.approx((-9.14, 38.72))
+        assert index.get(archived.pk) is None
+        assert index.get(deleted.pk) is None
+        assert {pk for pk, *_ in index.within(19, 50, 20, 51)} == {added.pk}
+        assert index.seq == last_seq()
+
+    def test_snapshot_of_another_format_is_rejected(self, snapshot_path):
+        """Files without the magic and version are refused"""
+        with pytest.raises(ValueError, match="places snapshot"):
+            PlacesSnapshot(b"\0" * 64)
+
+    def test_index_needs_a_snapshot(self, snapshot_path):
+        """Refreshing without a snapshot names the command to run"""
+        with pytest.raises(FileNotFoundError, match="build_places_snapshot"):
+            PlacesIndex().refresh()
@@ -0,0 +1,109 @@
+import json
+
+import msgpack
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+LIST_URL = "/api/v1/places/"
+RADIUS_URL = "/api/v1/places/search/radius/"
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+    def test_only_requested_properties_are_returned(self, api_client, places):
+        """Only the requested properties are returned, with id and geometry"""
+        response = api_client.get(LIST_URL, {"fields": "name,city"})
+
+        assert response.status_code == 200
+        feature = response.data["results"]["features"][0]
+        assert set(feature["properties"]) == {"name", "city"}
+        assert feature["id"] in {place.pk for place in places}
+        assert feature["geometry"]["type"] == "Point"
+
+    def test_geometry_can_be_requested(self, api_client, places):
+        """Asking for the always returned geo field is not an error"""
+        response = api_client.get(LIST_URL, {"fields": "location,name"})
+
+        assert response.status_code == 200
+        feature = response.data["results"]["features"][0]
+        assert set(feature["properties"]) == {"name"}
+        assert feature["geometry"]["type"] == "Point"
+
+    def test_unrequested_columns_are_not_loaded(self, api_client, places):
+        """Columns of unrequested fields and joins are not selected"""
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(LIST_URL, {"fields": "name"})
+
+        assert response.status_code == 200
+        select = next(
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith('SELECT "places_place"."id"')
+        )
+        assert '"places_place"."name"' in select
+        assert '"places_place"."description"' not in select
+        assert "accounts_customuser" not in select
+
+    def test_search_keeps_distance(self, api_client, places):
+        """Searches can request the annotated distance"""
+        response = api_client.get(
+            RADIUS_URL,
+            {"lat": 50.06, "lon": 19.94, "radius": 1, "fields": "name,distance"},
+        )
+
+        assert response.status_code == 200
+        features = response.data["results"]["features"]
+        assert len(features) == 7
+        assert set(features[0]["properties"]) == {"name", "distance"}
+        assert features[0]["properties"]["distance"] == 0
+
+    def test_unknown_field_is_rejected(self, api_client, places):
+        """Fields the serializer does not have are a 400"""
+        response = api_client.get(LIST_URL, {"fields": "name,password"})
+
+        assert response.status_code == 400
+        assert "password" in response.data["detail"]
+
+
+@pytest.mark.django_db
+class TestCompactFormats:
+    def test_columnar_json(self, api_client, places):
+        """The columnar format returns one array per field"""
+        response = api_client.get(
+            RADIUS_URL,
+            {"lat": 50.06, "lon": 19.94, "radius": 1, "fields": "name"},
+            HTTP_ACCEPT="application/vnd.geolocation.columnar+json",
+        )
+
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith(
+            "application/vnd.geolocation.columnar+json"
+        )
+        body = json.loads(response.content)
+        assert body["count"] == 7
+        columns = body["results"]
+        assert set(columns) == {"id", "lon", "lat", "name"}
+        assert columns["id"] == [place.pk for place in places]
+        assert columns["lat"] == [50.06] * 7
+        assert columns["name"] == [place.name for place in places]
+
+    def test_columnar_errors_are_plain_json(self, api_client):
+        """Errors of columnar requests are rendered as JSON"""
+        response = api_client.get(RADIUS_URL, {"format": "columnar"})
+
+        assert response.status_code == 400
+        assert "'lat'" in json.loads(response.content)["detail"]
+
+    def test_msgpack(self, api_client, places):
+        """MessagePack responses carry the same structure as JSON"""
+        response = api_client.get(
+            LIST_URL, {"fields": "name,created_at"}, HTTP_ACCEPT="application/msgpack"
+        )
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/msgpack"
+        body = msgpack.unpackb(response.content)
+        feature = body["results"]["features"][0]
+        assert set(feature["properties"]) == {"name", "created_at"}
+        assert isinstance(feature["properties"]["created_at"], str)
@@ -0,0 +1,103 @@
+import gc
+import importlib
+import os
+import subprocess
+import sys
+
+import pytest
+from django.db import connection
+from django.urls import clear_url_caches
+
+from GeolocationAPI import prefork, urls
+from GeolocationAPI.prefork import SharedFile, publish
+from GeolocationAPI.warmup import warm_up
+
+
+# Warm-up runs in autocommit mode, outside of any transaction
+@pytest.mark.django_db(transaction=True)
+def test_warm_up_leaves_connections_usable():
+    """Warm-up opens connections that stay usable"""
+    timings = warm_up()
+
+    assert set(timings) == {"geo", "urls", "database"}
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        assert cursor.fetchone() == (1,)
+
+
+def test_warm_up_without_database():
+    """database=False skips the connection warm-up"""
+    assert set(warm_up(database=False)) == {"geo", "urls"}
+
+
+def test_docs_can_be_disabled(settings):
+    """API_DOCS_ENABLED=False drops the schema and docs routes"""
+    settings.API_DOCS_ENABLED = False
+    try:
+        names = {pattern.name for pattern in importlib.reload(urls).urlpatterns}
+        assert "schema" not in names
+        assert "token_obtain_pair" in names
+    finally:
+        settings.API_DOCS_ENABLED = True
+        importlib.reload(urls)
+        clear_url_caches()
+
+
+def test_pillow_is_imported_lazily():
+    """Workers that never process an upload do not load Pillow"""
+    code = (
+        "import django, sys; django.setup();"
+        "import places.views, places.services;"
+        "print('PIL' in sys.modules)"
+    )
+
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        env=os.environ | {"DJANGO_SETTINGS_MODULE": "GeolocationAPI.settings"},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    assert output.strip() == "False"
+
+
+def test_shared_file_is_remapped_after_a_new_generation(tmp_path, settings):
+    """Readers keep the old mapping until publish() swaps the file"""
+    settings.SHARED_DATA_CHECK_SECONDS = 0
+    path = str(tmp_path / "data.bin")
+    shared = SharedFile(path)
+    assert shared.get() is None
+
+    publish(path, lambda file: file.write(b"first"))
+    first = shared.get()
+    assert first[:] == b"first"
+    assert shared.get() is first
+
+    publish(path, lambda file: file.write(b"second"))
+    assert shared.get()[:] == b"second"
+    # Mapped pages of the old generation stay readable
+    assert first[:] == b"first"
+    assert os.listdir(tmp_path) == ["data.bin"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bootstrap_freezes_the_heap_and_closes_connections(
+    monkeypatch, settings, tmp_path
+):
+    """bootstrap() runs builders, freezes the heap, closes connections"""
+    settings.SHARED_DATA_DIR = tmp_path
+    built = []
+    monkeypatch.setitem(prefork._builders, "test", lambda: built.append(True))
+    connection.ensure_connection()
+
+    try:
+        timings = prefork.bootstrap()
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
+
+    assert built == [True]
+    assert {"geo", "urls", "test"} <= set(timings)
+    assert connection.connection is None
+    assert (tmp_path / "revoked-tokens.bloom").is_file()
@@ -0,0 +1,121 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.http import StreamingHttpResponse
+from django.test import AsyncClient
+from rest_framework.test import APIClient
+
+from accounts.serializers import ClaimsTokenObtainPairSerializer
+from places.models import PlaceStatus
+
+LIST_URL = "/api/v1/places/"
+ARCHIVED_URL = "/api/v1/places/archived/"
+
+
+def body(response) -> dict:
+    if isinstance(response, StreamingHttpResponse):
+        return json.loads(b"".join(response.streaming_content))
+    return json.loads(response.content)
+
+
+@pytest.mark.django_db
+class TestPageSize:
+    def test_page_size_is_capped(self, settings, places):
+        """?page_size= is limited to MAX_PAGE_SIZE for users"""
+        settings.MAX_PAGE_SIZE = 5
+
+        response = APIClient().get(LIST_URL, {"page_size": 100})
+
+        assert response.status_code == 200
+        assert len(response.data["results"]["features"]) == 5
+
+    def test_admins_get_larger_pages(self, settings, admin_client, places):
+        """Admins may request pages up to ADMIN_MAX_PAGE_SIZE"""
+        settings.MAX_PAGE_SIZE = 5
+
+        response = admin_client.get(LIST_URL, {"page_size": 100})
+
+        assert len(body(response)["results"]["features"]) == 7
+
+
+@pytest.mark.django_db
+class TestStreaming:
+    @pytest.fixture(autouse=True)
+    def stream_small_pages(self, settings):
+        settings.STREAMING_MIN_PAGE_SIZE = 3
+        settings.STREAMING_CHUNK_SIZE = 2
+
+    def test_large_page_is_streamed(self, admin_client, places):
+        """Pages from STREAMING_MIN_PAGE_SIZE on are streamed with links"""
+        buffered = admin_client.get(LIST_URL, {"page_size": 2})
+        streamed = admin_client.get(LIST_URL, {"page_size": 4, "page": 2})
+
+        assert not isinstance(buffered, StreamingHttpResponse)
+        assert isinstance(streamed, StreamingHttpResponse)
+        assert streamed["Content-Type"] == "application/json"
+        data = body(streamed)
+        assert data["count"] == 7
+        assert data["next"] is None
+        assert "page_size=4" in data["previous"]
+        assert data["results"]["type"] == "FeatureCollection"
+        assert len(data["results"]["features"]) == 3
+
+    def test_streamed_features_match_buffered_ones(
+        self, settings, admin_client, places
+    ):
+        """Streaming does not change the payload"""
+        streamed = body(admin_client.get(LIST_URL, {"page_size": 10}))
+        settings.STREAMING_MIN_PAGE_SIZE = 1000
+        buffered = body(admin_client.get(LIST_URL, {"page_size": 10}))
+
+        assert streamed == buffered
+
+    def test_sparse_fields_are_applied(self, admin_client, places):
+        """?fields= applies to streamed pages"""
+        data = body(admin_client.get(LIST_URL, {"page_size": 10, "fields": "name"}))
+
+        properties = data["results"]["features"][0]["properties"]
+        assert set(properties) == {"name"}
+
+    def test_archived_places(self, admin_client, place_factory):
+        """The archived places export is streamed"""
+        archived = {place_factory(status=PlaceStatus.ARCHIVED).pk for _ in range(4)}
+        place_factory(status=PlaceStatus.PUBLISHED)
+
+        response = admin_client.get(ARCHIVED_URL, {"page_size": 10})
+
+        assert isinstance(response, StreamingHttpResponse)
+        features = body(response)["results"]["features"]
+        assert {feature["id"] for feature in features} == archived
+
+    def test_other_formats_are_not_streamed(self, admin_client, places):
+        """Only JSON pages are streamed"""
+        response = admin_client.get(
+            LIST_URL, {"page_size": 10}, HTTP_ACCEPT="application/msgpack"
+        )
+
+        assert not isinstance(response, StreamingHttpResponse)
+
+
+# The view runs in a worker thread with its own connection under ASGI, so
+# the test data has to be committed
+@pytest.mark.django_db(transaction=True)
+def test_large_page_is_streamed_asynchronously_under_asgi(settings, admin_user, places):
+    """ASGI servers get an async iterator instead of buffering the page"""
+    settings.STREAMING_MIN_PAGE_SIZE = 3
+    settings.STREAMING_CHUNK_SIZE = 2
+    token = ClaimsTokenObtainPairSerializer.get_token(admin_user).access_token
+
+    async def get_page():
+        response = await AsyncClient().get(
+            LIST_URL, {"page_size": 10}, headers={"Authorization": f"Bearer {token}"}
+        )
+        chunks = [chunk async for chunk in response]
+        return response, chunks
+
+    response, chunks = async_to_sync(get_page)()
+
+    assert response.is_async
+    assert len(chunks) > 1
+    assert len(json.loads(b"".join(chunks))["results"]["features"]) == 7
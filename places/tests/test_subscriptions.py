@@ -0,0 +1,127 @@
+import asyncio
+import json
+
+import pytest
+from django.contrib.gis.geos import Point
+from django.db import transaction
+
+from places.async_db import get_connection
+from places.changes import record_change
+from places.models import PlaceChange, PlaceChangeOp, PlaceStatus
+from places.subscriptions import (
+    RESET,
+    BoxArea,
+    ChangeBroker,
+    RadiusArea,
+    Subscription,
+    SubscriptionIndex,
+    event_type,
+)
+
+
+def parse_event(data: bytes) -> tuple[str, dict]:
+    fields = dict(line.split(": ", 1) for line in data.decode().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+class TestSubscriptionIndex:
+    def test_matching_tests_only_the_subscriptions_of_the_cell(self):
+        """A point is matched against the areas that contain it"""
+        index = SubscriptionIndex(precision=4, max_cells=64)
+        krakow = Subscription(RadiusArea(19.937, 50.0613, 5))
+        warsaw = Subscription(BoxArea(20.9, 52.1, 21.1, 52.3))
+        index.add(krakow)
+        index.add(warsaw)
+
+        assert index.matching(19.945, 50.062) == [krakow]
+        assert index.matching(21.0122, 52.2297) == [warsaw]
+        assert index.matching(19.937, 50.2) == []
+
+        index.remove(krakow)
+        assert index.matching(19.945, 50.062) == []
+        assert index.count == 1
+
+    def test_large_and_antimeridian_areas(self):
+        """Areas with too many cells are kept aside, boxes may wrap around"""
+        index = SubscriptionIndex(precision=4, max_cells=64)
+        world = Subscription(BoxArea(-180, -90, 180, 90))
+        pacific = Subscription(BoxArea(179, -17.1, -179, -16.9))
+        index.add(world)
+        index.add(pacific)
+
+        assert index.wide == {world}
+        assert set(index.matching(179.5, -17)) == {world, pacific}
+        assert set(index.matching(-179.5, -17)) == {world, pacific}
+        assert index.matching(0, 0) == [world]
+
+
+def test_queue_of_a_slow_client_ends_with_a_reset(settings):
+    """Events beyond the queue size are dropped after a reset event"""
+    settings.SUBSCRIPTION_QUEUE_SIZE = 3
+    subscription = Subscription(BoxArea(0, 0, 1, 1))
+    for event in (b"1", b"2", b"3", b"4"):
+        subscription.push(event)
+
+    events = [subscription.queue.get_nowait() for _ in range(3)]
+    assert events == [b"1", b"2", RESET]
+
+
+@pytest.mark.parametrize(
+    "op, before, after, expected",
+    [
+        (PlaceChangeOp.CREATE, "", PlaceStatus.PUBLISHED, "publish"),
+        (PlaceChangeOp.CREATE, "", PlaceStatus.DRAFT, None),
+        (PlaceChangeOp.UPDATE, PlaceStatus.DRAFT, PlaceStatus.PUBLISHED, "publish"),
+        (PlaceChangeOp.UPDATE, PlaceStatus.PUBLISHED, PlaceStatus.PUBLISHED, "update"),
+        (PlaceChangeOp.UPDATE, PlaceStatus.PUBLISHED, PlaceStatus.ARCHIVED, "archive"),
+        (PlaceChangeOp.DELETE, PlaceStatus.PUBLISHED, "", "delete"),
+        (PlaceChangeOp.DELETE, PlaceStatus.DRAFT, "", None),
+    ],
+)
+def test_event_type(op, before, after, expected):
+    """Changes map to the event anonymous clients see, if any"""
+    change = PlaceChange(op=op, status_before=before, status_after=after)
+    assert event_type(change) == expected
+
+
+# The broker polls through its own connection, so the changes have to be
+# committed instead of living in the test transaction
+@pytest.mark.django_db(transaction=True)
+def test_broker_sends_changes_to_subscribers_of_the_area(place_factory):
+    """Only subscribers of the old or new location receive an update"""
+    broker = ChangeBroker()
+    krakow = Subscription(RadiusArea(19.937, 50.0613, 5))
+    warsaw = Subscription(BoxArea(20.9, 52.1, 21.1, 52.3))
+    broker.index.add(krakow)
+    broker.index.add(warsaw)
+
+    async def poll():
+        async with get_connection() as connection:
+            await broker.poll(connection)
+
+    asyncio.run(poll())
+    with transaction.atomic():
+        place = place_factory(
+            status=PlaceStatus.PUBLISHED, location=Point(19.945, 50.062)
+        )
+        record_change(place, PlaceChangeOp.CREATE)
+    with transaction.atomic():
+        place.location = Point(21.0122, 52.2297)
+        place.save()
+        record_change(place, PlaceChangeOp.UPDATE, PlaceStatus.PUBLISHED)
+    asyncio.run(poll())
+
+    krakow_events = [parse_event(krakow.queue.get_nowait()) for _ in range(2)]
+    assert [event for event, _ in krakow_events] == ["publish", "update"]
+    assert krakow_events[0][1]["id"] == place.pk
+    assert krakow_events[0][1]["name"] == place.name
+    assert krakow_events[1][1]["location"]["coordinates"] == [21.0122, 52.2297]
+    assert parse_event(warsaw.queue.get_nowait())[0] == "update"
+    assert warsaw.queue.empty()
+
+
+def test_stream_needs_asgi(client):
+    """The stream is refused instead of being buffered by a WSGI server"""
+    response = client.get("/api/v1/places/async/stream/?lat=50.06&lon=19.93")
+
+    assert response.status_code == 503
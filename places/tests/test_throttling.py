@@ -0,0 +1,100 @@
+import pytest
+from rest_framework.test import APIClient
+
+from GeolocationAPI.throttling import (
+    AnonThrottle,
+    SearchAnonThrottle,
+    SearchUserThrottle,
+    UserThrottle,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def throttle(monkeypatch):
+    """An anonymous throttle of 10 requests per minute on a controlled clock"""
+    monkeypatch.setattr(AnonThrottle, "THROTTLE_RATES", {"anon": "10/min"})
+    clock = FakeClock(600.0)
+    monkeypatch.setattr(AnonThrottle, "timer", clock)
+    return clock
+
+
+def allowed(request) -> bool:
+    return AnonThrottle().allow_request(request, None)
+
+
+class TestSlidingWindowThrottle:
+    def test_limit_applies_within_window(self, throttle, rf):
+        """Requests beyond the rate are refused within the window"""
+        request = rf.get("/")
+        request.user = None
+
+        assert all(allowed(request) for _ in range(10))
+        assert not allowed(request)
+
+    def test_previous_window_is_weighted(self, throttle, rf):
+        """Halfway through the next window half of the previous count remains"""
+        request = rf.get("/")
+        request.user = None
+        for _ in range(10):
+            allowed(request)
+
+        throttle.now += 90
+        results = [allowed(request) for _ in range(10)]
+
+        assert results.count(True) == 5
+
+    def test_wait_is_reported(self, throttle, rf):
+        """A refused request is told how long to wait"""
+        request = rf.get("/")
+        request.user = None
+        for _ in range(10):
+            allowed(request)
+
+        instance = AnonThrottle()
+        assert not instance.allow_request(request, None)
+        assert 0 < instance.wait() <= 60
+
+
+@pytest.mark.django_db
+class TestLoginThrottle:
+    def test_token_endpoint_is_limited_per_address(self, user_factory):
+        """Login attempts are limited per client address"""
+        user = user_factory()
+        client = APIClient()
+        payload = {"email": user.email, "password": "wrong"}
+
+        statuses = [
+            client.post("/api/token/", payload, format="json").status_code
+            for _ in range(6)
+        ]
+
+        assert statuses == [401] * 5 + [429]
+
+
+@pytest.mark.django_db
+class TestSearchThrottle:
+    def test_search_scopes_have_their_own_rates(self):
+        """The search allowances differ from the general ones by default"""
+        assert SearchAnonThrottle().rate != AnonThrottle().rate
+        assert SearchUserThrottle().rate != UserThrottle().rate
+
+    def test_searches_do_not_use_up_the_general_allowance(self, monkeypatch):
+        """Throttled searches leave the other endpoints available"""
+        monkeypatch.setattr(
+            AnonThrottle, "THROTTLE_RATES", {"anon": "5/min", "search_anon": "3/min"}
+        )
+        client = APIClient()
+        url = "/api/v1/places/search/bbox/?in_bbox=19.93,50.06,19.94,50.065"
+
+        statuses = [client.get(url).status_code for _ in range(4)]
+
+        assert statuses == [200] * 3 + [429]
+        assert client.get("/api/v1/places/").status_code == 200
@@ -1,6 +1,15 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from places.views import PlaceBboxSearchViewSet, PlaceRadiusSearchViewSet, PlaceViewSet
+from places import async_views
+from places.views import (
+    PlaceBboxSearchViewSet,
+    PlaceCorridorSearchViewSet,
+    PlaceHeatmapViewSet,
+    PlacePolygonSearchViewSet,
+    PlaceRadiusSearchViewSet,
+    PlaceViewSet,
+)
 
 app_name = "places"
 
@@ -8,5 +17,22 @@ router = DefaultRouter()
 router.register(r"", PlaceViewSet, basename="place")
 router.register(r"search/radius", PlaceRadiusSearchViewSet, basename="search-radius")
 router.register(r"search/bbox", PlaceBboxSearchViewSet, basename="search-bbox")
+router.register(r"search/heatmap", PlaceHeatmapViewSet, basename="search-heatmap")
+router.register(r"search/polygon", PlacePolygonSearchViewSet, basename="search-polygon")
+router.register(
+    r"search/corridor", PlaceCorridorSearchViewSet, basename="search-corridor"
+)
 
-urlpatterns = router.urls
+# Async (ASGI) read endpoints, listed before the router's catch-all detail route
+async_urlpatterns = [
+    path(
+        "async/search/radius/",
+        async_views.radius_search,
+        name="async-search-radius",
+    ),
+    path("async/search/bbox/", async_views.bbox_search, name="async-search-bbox"),
+    path("async/<int:pk>/", async_views.place_detail, name="async-place-detail"),
+    path("async/stream/", async_views.place_stream, name="async-place-stream"),
+]
+
+urlpatterns = async_urlpatterns + router.urls
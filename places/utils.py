@@ -7,3 +7,29 @@ def place_photo_path(_, filename):
     ext = filename.split(".")[-1]
     filename = f"{uuid.uuid4()}.{ext}"
     return os.path.join("places", "photos", filename)
+
+
+def decode_polyline(value: str, precision: int = 5) -> list[tuple[float, float]]:
+    """Decodes an encoded polyline (Google format) into (lon, lat) pairs"""
+    factor = 10**precision
+    coordinates, index, lat, lon = [], 0, 0, 0
+    while index < len(value):
+        deltas = []
+        for _ in range(2):
+            shift, result = 0, 0
+            while True:
+                if index >= len(value):
+                    raise ValueError("Truncated polyline")
+                byte = ord(value[index]) - 63
+                index += 1
+                if not 0 <= byte < 64:
+                    raise ValueError("Invalid polyline character")
+                result |= (byte & 0x1F) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lon += deltas[1]
+        coordinates.append((lon / factor, lat / factor))
+    return coordinates
@@ -1,25 +1,55 @@
+from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Q
+from django.utils.cache import patch_cache_control
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import OpenApiExample, OpenApiParameter, extend_schema
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
-from places.filters import BboxSearchFilter, PlaceRadiusSearchFilter
-from places.models import Place, PlaceStatus
+from GeolocationAPI.db_routers import ReplicaReadMixin
+from GeolocationAPI.throttling import SearchAnonThrottle, SearchUserThrottle
+from monitoring.mixins import InstrumentedViewMixin
+from places.filters import (
+    BboxSearchFilter,
+    PlaceHeatmapFilter,
+    PlaceRadiusSearchFilter,
+)
+from places.mixins import (
+    CoordinatePrecisionMixin,
+    SparseFieldsMixin,
+    StreamingListMixin,
+)
+from places.models import Place, PlaceChange, PlaceStatus
 from places.permissions import IsOwnerOrModerator
-from places.serializers import PlaceSerializer
-from places.services import PlaceService
+from places.serializers import (
+    ChangeFeedQuerySerializer,
+    CorridorSearchSerializer,
+    PlaceChangeSerializer,
+    PlaceSerializer,
+    PolygonSearchSerializer,
+)
+from places.services import (
+    CorridorSearchService,
+    HeatmapService,
+    PlaceService,
+    PolygonSearchService,
+)
 
 
-class PlaceViewSet(viewsets.ModelViewSet):
+class PlaceViewSet(
+    InstrumentedViewMixin,
+    ReplicaReadMixin,
+    CoordinatePrecisionMixin,
+    StreamingListMixin,
+    viewsets.ModelViewSet,
+):
     """ViewSet for place management"""
 
     serializer_class = PlaceSerializer
     permission_classes = [IsOwnerOrModerator]
-    parser_classes = [JSONParser, MultiPartParser, FormParser]
 
     def get_queryset(self):
         user = self.request.user
@@ -35,15 +65,15 @@ class PlaceViewSet(viewsets.ModelViewSet):
             )
 
         return (
-            Place.objects.filter(Q(status=PlaceStatus.PUBLISHED) | Q(created_by=user))
+            Place.objects.filter(
+                Q(status=PlaceStatus.PUBLISHED) | Q(created_by_id=user.pk)
+            )
             .exclude(status=PlaceStatus.ARCHIVED)
             .select_related("created_by")
         )
 
     def destroy(self, request, *args, **kwargs):
-        place = self.get_object()
-        place.status = PlaceStatus.ARCHIVED
-        place.save()
+        PlaceService.archive_place(self.get_object())
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -52,6 +82,9 @@ class PlaceViewSet(viewsets.ModelViewSet):
         place = PlaceService.create_place(serializer=serializer, user=self.request.user)
         return place
 
+    def perform_update(self, serializer):
+        PlaceService.update_place(serializer)
+
     @action(
         detail=False,
         methods=["get"],
@@ -67,13 +100,35 @@ class PlaceViewSet(viewsets.ModelViewSet):
             status=PlaceStatus.ARCHIVED
         ).select_related("created_by")
 
-        page = self.paginate_queryset(archived_queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        return self.list_response(archived_queryset)
 
-        serializer = self.get_serializer(archived_queryset, many=True)
-        return Response(serializer.data)
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="changes",
+        permission_classes=[IsAdminUser],
+    )
+    def changes(self, request):
+        """
+        Place changes after `?since=<seq>`, oldest first.
+        Available for administrators only.
+        """
+        query = ChangeFeedQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        since = query.validated_data["since"]
+        limit = query.validated_data.get("limit", settings.PLACE_CHANGE_MAX_LIMIT)
+
+        changes = list(PlaceChange.objects.filter(seq__gt=since)[:limit])
+        serializer = PlaceChangeSerializer(
+            changes, many=True, context=self.get_serializer_context()
+        )
+        return Response(
+            {
+                "results": serializer.data,
+                "last_seq": changes[-1].seq if changes else since,
+                "more": len(changes) == limit,
+            }
+        )
 
     @action(detail=True, methods=["post"], url_path="upload-photo")
     def upload_photo(self, request, pk=None):
@@ -91,9 +146,17 @@ class PlaceViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class BaseSearchListViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+class BaseSearchListViewSet(
+    InstrumentedViewMixin,
+    ReplicaReadMixin,
+    CoordinatePrecisionMixin,
+    StreamingListMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet,
+):
     serializer_class = PlaceSerializer
     filter_backends = [DjangoFilterBackend]
+    throttle_classes = [SearchAnonThrottle, SearchUserThrottle]
 
     def get_queryset(self):
         return Place.objects.filter(status=PlaceStatus.PUBLISHED).select_related(
@@ -186,3 +249,186 @@ class PlaceBboxSearchViewSet(BaseSearchListViewSet):
     """
 
     filterset_class = BboxSearchFilter
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(
+            name="in_bbox",
+            description="Bounding box of the heatmap."
+            " Format: min_lon,min_lat,max_lon,max_lat",
+            required=True,
+            type=str,
+            location=OpenApiParameter.QUERY,
+            examples=[
+                OpenApiExample(
+                    "Poland (whole country)", value="14.12,49.00,24.14,54.83"
+                ),
+            ],
+        ),
+        OpenApiParameter(
+            name="resolution",
+            description="Approximate number of cells across the box"
+            " (default: 64, max: 256).",
+            required=False,
+            type=int,
+            location=OpenApiParameter.QUERY,
+        ),
+    ]
+)
+class PlaceHeatmapViewSet(
+    InstrumentedViewMixin, ReplicaReadMixin, viewsets.GenericViewSet
+):
+    """
+    Number of published places per grid cell, for density heatmaps.
+    Cells are squares of `cell_size` degrees centered on [lon, lat].
+    """
+
+    throttle_classes = [SearchAnonThrottle, SearchUserThrottle]
+
+    def get_queryset(self):
+        return Place.objects.filter(status=PlaceStatus.PUBLISHED)
+
+    def list(self, request, *args, **kwargs):
+        filterset = PlaceHeatmapFilter(
+            request.query_params, queryset=self.get_queryset(), request=request
+        )
+        queryset = filterset.qs
+        cache_key = "places:heatmap:{}:{}:{}:{}:{}".format(
+            *filterset.bbox, filterset.cell_size
+        )
+
+        data = cache.get(cache_key)
+        if data is None:
+            cells = HeatmapService.aggregate(queryset, filterset.cell_size)
+            data = {
+                "cell_size": filterset.cell_size,
+                "bbox": list(filterset.bbox),
+                "count": sum(cell[2] for cell in cells),
+                "cells": cells,
+            }
+            cache.set(cache_key, data, settings.HEATMAP_CACHE_SECONDS)
+
+        response = Response(data)
+        patch_cache_control(
+            response, public=True, max_age=settings.HEATMAP_CACHE_SECONDS
+        )
+        return response
+
+
+class PlacePolygonSearchViewSet(
+    InstrumentedViewMixin,
+    ReplicaReadMixin,
+    CoordinatePrecisionMixin,
+    SparseFieldsMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Search for places inside a GeoJSON Polygon or MultiPolygon sent in the
+    request body. Results are paginated with ?page= like the other searches.
+    """
+
+    serializer_class = PlaceSerializer
+    throttle_classes = [SearchAnonThrottle, SearchUserThrottle]
+    # POST only carries the polygon, the search does not write
+    replica_read_actions = ("create",)
+    sparse_fields_actions = ("create",)
+
+    def get_queryset(self):
+        return Place.objects.filter(status=PlaceStatus.PUBLISHED).select_related(
+            "created_by"
+        )
+
+    @extend_schema(
+        request=PolygonSearchSerializer,
+        responses=PlaceSerializer(many=True),
+        examples=[
+            OpenApiExample(
+                "Kraków Old Town",
+                value={
+                    "geometry": {
+                        "type": "Polygon",
+                        "coordinates": [
+                            [
+                                [19.93, 50.055],
+                                [19.945, 50.055],
+                                [19.945, 50.066],
+                                [19.93, 50.066],
+                                [19.93, 50.055],
+                            ]
+                        ],
+                    }
+                },
+                request_only=True,
+            )
+        ],
+    )
+    def create(self, request, *args, **kwargs):
+        params = PolygonSearchSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        queryset = PolygonSearchService.filter(
+            self.get_queryset(), params.validated_data["geometry"]
+        )
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class PlaceCorridorSearchViewSet(
+    InstrumentedViewMixin,
+    ReplicaReadMixin,
+    CoordinatePrecisionMixin,
+    SparseFieldsMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Search for places within `distance` meters of a route, ordered by their
+    position along it. `distance` in the results is meters from the route.
+    """
+
+    serializer_class = PlaceSerializer
+    throttle_classes = [SearchAnonThrottle, SearchUserThrottle]
+    # POST only carries the route, the search does not write
+    replica_read_actions = ("create",)
+    sparse_fields_actions = ("create",)
+
+    def get_queryset(self):
+        return Place.objects.filter(status=PlaceStatus.PUBLISHED).select_related(
+            "created_by"
+        )
+
+    @extend_schema(
+        request=CorridorSearchSerializer,
+        responses=PlaceSerializer(many=True),
+        examples=[
+            OpenApiExample(
+                "Encoded polyline, 200 m",
+                value={"polyline": "_p~iF~ps|U_ulLnnqC_mqNvxq`@", "distance": 200},
+                request_only=True,
+            ),
+            OpenApiExample(
+                "GeoJSON LineString",
+                value={
+                    "line": {
+                        "type": "LineString",
+                        "coordinates": [[19.93, 50.06], [19.95, 50.05]],
+                    },
+                    "distance": 100,
+                },
+                request_only=True,
+            ),
+        ],
+    )
+    def create(self, request, *args, **kwargs):
+        params = CorridorSearchSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        queryset = CorridorSearchService.filter(
+            self.get_queryset(),
+            params.validated_data["route"],
+            params.validated_data["distance"],
+        )
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)